@@ -16,8 +16,12 @@ from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
 
+from octavia_lib.api.drivers import exceptions as driver_exceptions
+
 from octavia.api.drivers import provider_base as driver_base
 from octavia.common import constants
+from octavia.db import api as db_apis
+from octavia.db import repositories
 
 CONF = cfg.CONF
 CONF.import_group('oslo_messaging', 'octavia.common.config')
@@ -35,6 +39,7 @@ class A10ProviderDriver(driver_base.ProviderDriver):
         self._args['version'] = '1.0'
         self.target = messaging.Target(**self._args)
         self.client = messaging.RPCClient(self.transport, target=self.target)
+        self.repositories = repositories.Repositories()
 
     # Load Balancer
     def loadbalancer_create(self, loadbalancer):
@@ -142,6 +147,40 @@ class A10ProviderDriver(driver_base.ProviderDriver):
                    constants.MEMBER_UPDATES: member_dict}
         self.client.cast({}, 'update_member', **payload)
 
+    def member_batch_update(self, members):
+        if not members:
+            # The members carry the only reference to the pool, an empty
+            # batch can't tell which pool to empty.
+            msg = ('A batch member update must list at least one member, '
+                   'delete the members of the pool one by one instead.')
+            raise driver_exceptions.UnsupportedOptionError(
+                user_fault_string=msg, operator_fault_string=msg)
+        pool_id = members[0].pool_id
+        # The DB is not updated yet, the pool still holds the current members
+        db_pool = self.repositories.pool.get(db_apis.get_session(), id=pool_id)
+        old_member_ids = [m.id for m in db_pool.members]
+        member_ids = [m.member_id for m in members]
+
+        new_member_ids = []
+        updated_members = []
+        for m in members:
+            if m.member_id not in old_member_ids:
+                new_member_ids.append(m.member_id)
+            else:
+                member_dict = m.to_dict(render_unsets=False)
+                member_dict['id'] = member_dict.pop('member_id')
+                if 'address' in member_dict:
+                    member_dict['ip_address'] = member_dict.pop('address')
+                if 'admin_state_up' in member_dict:
+                    member_dict['enabled'] = member_dict.pop('admin_state_up')
+                updated_members.append(member_dict)
+
+        payload = {'old_member_ids': [mid for mid in old_member_ids
+                                      if mid not in member_ids],
+                   'new_member_ids': new_member_ids,
+                   'updated_members': updated_members}
+        self.client.cast({}, 'batch_update_members', **payload)
+
     # Health Monitor
     def health_monitor_create(self, healthmonitor):
         payload = {constants.HEALTH_MONITOR_ID: healthmonitor.healthmonitor_id}
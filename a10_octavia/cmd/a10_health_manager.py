@@ -16,6 +16,7 @@
 import multiprocessing
 import os
 import signal
+import socket
 import sys
 
 from functools import partial
@@ -31,6 +32,7 @@ from octavia import version
 from a10_octavia.cmd import service
 from a10_octavia.cmd import vthunder_heartbeat_udp as heartbeat_udp
 from a10_octavia.controller.healthmanager import a10_health_manager
+from a10_octavia.controller.healthmanager import stats_collector
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -39,6 +41,12 @@ LOG = logging.getLogger(__name__)
 def hm_listener(exit_event):
     signal.signal(signal.SIGINT, signal.SIG_IGN)
     signal.signal(signal.SIGHUP, health_manager._mutate_config)
+    if CONF.a10_health_manager.heartbeat_listener_mode == 'asyncio':
+        # Imported here as asyncio is not available on python 2
+        from a10_octavia.cmd import vthunder_heartbeat_async as heartbeat_async
+        heartbeat_async.VThunderAsyncUDPStatusGetter().run(exit_event)
+        return
+
     udp_getter = heartbeat_udp.VThunderUDPStatusGetter()
     while not exit_event.is_set():
         try:
@@ -46,6 +54,7 @@ def hm_listener(exit_event):
         except Exception as ex:
             LOG.error('A10 Health Manager listener experienced unknown error: %s',
                       ex)
+    udp_getter.flush()
 
 
 def hm_health_check(exit_event):
@@ -70,6 +79,49 @@ def hm_health_check(exit_event):
     health_check.start()
 
 
+def hm_stats_collector(exit_event):
+    collector = stats_collector.A10StatsCollector(exit_event)
+    signal.signal(signal.SIGHUP, health_manager._mutate_config)
+
+    @periodics.periodic(CONF.a10_health_manager.stats_update_interval,
+                        run_immediately=True)
+    def periodic_stats_collection():
+        try:
+            collector.collect_stats()
+        except Exception as ex:
+            LOG.error('A10 Health Manager stats collection experienced '
+                      'unknown error: %s', ex)
+
+    stats_collection = periodics.PeriodicWorker(
+        [(periodic_stats_collection, None, None)],
+        schedule_strategy='aligned_last_finished')
+
+    def hm_exit(*args, **kwargs):
+        stats_collection.stop()
+        collector.executor.shutdown()
+    signal.signal(signal.SIGINT, hm_exit)
+    stats_collection.start()
+
+
+def _handle_mutate_config(listener_proc_pids, check_proc_pids, *args, **kwargs):
+    LOG.info("A10 Health Manager received HUP signal, mutating config.")
+    health_manager._mutate_config()
+    for listener_proc_pid in listener_proc_pids:
+        os.kill(listener_proc_pid, signal.SIGHUP)
+    for check_proc_pid in check_proc_pids:
+        os.kill(check_proc_pid, signal.SIGHUP)
+
+
+def _get_listener_workers():
+    workers = CONF.a10_health_manager.heartbeat_listener_workers
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        LOG.warning("SO_REUSEPORT is not supported on this platform, "
+                    "starting a single heartbeat listener instead of %s.", workers)
+        CONF.set_override('heartbeat_listener_workers', 1, group='a10_health_manager')
+        workers = 1
+    return workers
+
+
 def main():
     service.prepare_service(sys.argv)
 
@@ -78,31 +130,45 @@ def main():
     processes = []
     exit_event = multiprocessing.Event()
 
-    hm_listener_proc = multiprocessing.Process(name='HM_listener',
-                                               target=hm_listener,
-                                               args=(exit_event,))
-    processes.append(hm_listener_proc)
+    hm_listener_procs = []
+    for worker_id in range(_get_listener_workers()):
+        hm_listener_proc = multiprocessing.Process(name='HM_listener_%s' % worker_id,
+                                                   target=hm_listener,
+                                                   args=(exit_event,))
+        hm_listener_procs.append(hm_listener_proc)
+        processes.append(hm_listener_proc)
     hm_health_check_proc = multiprocessing.Process(name='HM_health_check',
                                                    target=hm_health_check,
                                                    args=(exit_event,))
     processes.append(hm_health_check_proc)
+    check_procs = [hm_health_check_proc]
+    if CONF.a10_health_manager.stats_update_interval > 0:
+        hm_stats_proc = multiprocessing.Process(name='HM_stats_collector',
+                                                target=hm_stats_collector,
+                                                args=(exit_event,))
+        processes.append(hm_stats_proc)
+        check_procs.append(hm_stats_proc)
 
     LOG.info("A10 Health Manager listener process starts:")
-    hm_listener_proc.start()
+    for hm_listener_proc in hm_listener_procs:
+        hm_listener_proc.start()
     LOG.info("A10 Health manager check process starts:")
-    hm_health_check_proc.start()
+    for check_proc in check_procs:
+        check_proc.start()
 
     def process_cleanup(*args, **kwargs):
         LOG.info("A10 Health Manager exiting due to signal")
         exit_event.set()
-        os.kill(hm_health_check_proc.pid, signal.SIGINT)
-        hm_health_check_proc.join()
-        hm_listener_proc.join()
+        for check_proc in check_procs:
+            os.kill(check_proc.pid, signal.SIGINT)
+            check_proc.join()
+        for hm_listener_proc in hm_listener_procs:
+            hm_listener_proc.join()
 
     signal.signal(signal.SIGTERM, process_cleanup)
     signal.signal(signal.SIGHUP, partial(
-        health_manager._handle_mutate_config, hm_listener_proc.pid,
-        hm_health_check_proc.pid))
+        _handle_mutate_config, [proc.pid for proc in hm_listener_procs],
+        [check_proc.pid for check_proc in check_procs]))
 
     try:
         for process in processes:
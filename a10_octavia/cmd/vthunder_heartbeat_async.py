@@ -0,0 +1,124 @@
+# Copyright 2020 A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""asyncio based heartbeat listener, only available on python 3
+
+"""
+import asyncio
+import datetime
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from a10_octavia.cmd import vthunder_heartbeat_udp as heartbeat_udp
+
+# Upper bound of datagrams read from the socket per event loop wakeup, so a
+# flood of heartbeats cannot starve the flush timer.
+MAX_DATAGRAMS_PER_WAKEUP = 512
+# Number of full batches that may wait in memory while a flush is running
+MAX_PENDING_BATCHES = 4
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+
+class VThunderAsyncUDPStatusGetter(heartbeat_udp.VThunderUDPStatusGetter):
+    """Heartbeat listener driven by an asyncio event loop.
+
+    The socket is drained with recvfrom_into() into a single preallocated
+    buffer, reading up to MAX_DATAGRAMS_PER_WAKEUP datagrams every time it
+    becomes readable. Heartbeats are coalesced into the pending batch, which
+    is bounded to `heartbeat_batch_size` addresses, and written by a
+    background flusher running in the loop's default executor so database
+    latency never blocks packet intake. Heartbeats from new addresses that
+    arrive while MAX_PENDING_BATCHES batches are already waiting are dropped
+    and counted.
+    """
+
+    def __init__(self):
+        super(VThunderAsyncUDPStatusGetter, self).__init__()
+        if self.batch_interval <= 0:
+            self.batch_interval = 1
+        self.sock.setblocking(False)
+        self.buffer = bytearray(heartbeat_udp.UDP_MAX_SIZE)
+        self.max_pending = self.batch_size * MAX_PENDING_BATCHES
+        self.packets_dropped = 0
+        self.loop = None
+        self.flushing = None
+
+    def on_readable(self):
+        received_at = datetime.datetime.utcnow()
+        for i in range(MAX_DATAGRAMS_PER_WAKEUP):
+            try:
+                nbytes, srcaddr = self.sock.recvfrom_into(self.buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as ex:
+                LOG.warning('Health Manager experienced an exception reading '
+                            'heartbeat packets. Exception: %s', ex)
+                break
+            ip = srcaddr[0]
+            if len(self.pending) >= self.max_pending and ip not in self.pending:
+                self.packets_dropped += 1
+                continue
+            self.add_heartbeat(ip, received_at)
+
+        if self.is_flush_due():
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.flushing is not None and not self.flushing.done():
+            return
+        pending = self.take_pending()
+        if pending:
+            self.flushing = self.loop.run_in_executor(None, self.write_batches, pending)
+            self.flushing.add_done_callback(self._on_flushed)
+
+    def write_batches(self, pending):
+        """Write the pending heartbeats in bulk updates of `batch_size` addresses"""
+        ips = list(pending)
+        for start in range(0, len(ips), self.batch_size):
+            self.write_batch(dict((ip, pending[ip])
+                                  for ip in ips[start:start + self.batch_size]))
+
+    def flush(self):
+        self.write_batches(self.take_pending())
+
+    def _on_flushed(self, future):
+        if self.is_flush_due():
+            self.schedule_flush()
+
+    def _tick(self, exit_event):
+        if exit_event.is_set():
+            self.loop.stop()
+            return
+        if self.is_flush_due():
+            self.schedule_flush()
+        self.loop.call_later(min(1, self.batch_interval), self._tick, exit_event)
+
+    def run(self, exit_event):
+        """Serve heartbeats until exit_event is set"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.add_reader(self.sock.fileno(), self.on_readable)
+        self.loop.call_soon(self._tick, exit_event)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.remove_reader(self.sock.fileno())
+            if self.flushing is not None:
+                self.loop.run_until_complete(self.flushing)
+            self.flush()
+            self.loop.close()
+            LOG.info('Heartbeat listener stopped. Dropped %s heartbeats '
+                     'received while the batch was full.', self.packets_dropped)
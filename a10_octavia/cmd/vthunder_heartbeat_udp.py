@@ -14,6 +14,7 @@
 
 import datetime
 import socket
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -24,24 +25,108 @@ from octavia.db import api as db_api
 from a10_octavia.db import repositories as a10repo
 
 UDP_MAX_SIZE = 64 * 1024
+# Seconds between full reloads of the ip address index, which also drops
+# vThunders removed from the database
+INDEX_FULL_RELOAD_INTERVAL = 600
+# Minimum seconds between index refreshes triggered by an unknown address
+INDEX_MISS_REFRESH_HOLDOFF = 5
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
+class VThunderAddressIndex(object):
+    """In-memory ip_address -> vThunder record ids index.
+
+    The index is bulk loaded on first use and refreshed incrementally from
+    vThunders whose updated_at moved forward, so resolving the source address
+    of a heartbeat does not need a database round trip.
+    """
+
+    def __init__(self, vthunder_repo):
+        self.vthunder_repo = vthunder_repo
+        self.refresh_interval = CONF.a10_health_manager.heartbeat_index_refresh_interval
+        self.ids_by_ip = {}
+        self.ip_by_id = {}
+        self.high_watermark = None
+        self.loaded_at = None
+        self.refreshed_at = None
+
+    def _add(self, record_id, ip_address):
+        old_ip = self.ip_by_id.get(record_id)
+        if old_ip == ip_address:
+            return
+        if old_ip is not None:
+            self.ids_by_ip[old_ip].discard(record_id)
+            if not self.ids_by_ip[old_ip]:
+                del self.ids_by_ip[old_ip]
+        self.ip_by_id[record_id] = ip_address
+        self.ids_by_ip.setdefault(ip_address, set()).add(record_id)
+
+    def load(self):
+        """Rebuild the whole index from the database"""
+        rows = self.vthunder_repo.get_ip_address_ids(db_api.get_session())
+        self.ids_by_ip = {}
+        self.ip_by_id = {}
+        self.high_watermark = None
+        self._apply(rows)
+        self.loaded_at = self.refreshed_at = time.time()
+        LOG.debug("Loaded %s vThunder ip addresses into heartbeat index", len(self.ids_by_ip))
+
+    def refresh(self):
+        """Pick up vThunders created or updated since the last refresh"""
+        if self.loaded_at is None or time.time() - self.loaded_at >= INDEX_FULL_RELOAD_INTERVAL:
+            self.load()
+            return
+        rows = self.vthunder_repo.get_ip_address_ids(db_api.get_session(),
+                                                     updated_since=self.high_watermark)
+        self._apply(rows)
+        self.refreshed_at = time.time()
+
+    def _apply(self, rows):
+        for record_id, ip_address, updated_at in rows:
+            self._add(record_id, ip_address)
+            if updated_at and (self.high_watermark is None or updated_at > self.high_watermark):
+                self.high_watermark = updated_at
+
+    def lookup(self, ip_address):
+        """Return the set of vThunder record ids using ip_address"""
+        now = time.time()
+        if self.refreshed_at is None or now - self.refreshed_at >= self.refresh_interval:
+            self.refresh()
+        ids = self.ids_by_ip.get(ip_address)
+        if not ids and now - self.refreshed_at >= INDEX_MISS_REFRESH_HOLDOFF:
+            self.refresh()
+            ids = self.ids_by_ip.get(ip_address)
+        return ids or set()
+
+
 class VThunderUDPStatusGetter(object):
     """This class defines methods that will gather heatbeats.
+
+    When `heartbeat_batch_interval` is set, heartbeats are not written one
+    by one. The latest receive time of each source address is kept in memory
+    and written with a single bulk update once the batch is full or its
+    oldest heartbeat has waited `heartbeat_batch_interval` seconds.
     """
 
     def __init__(self):
         self.key = CONF.a10_health_manager.heartbeat_key
         self.ip = CONF.a10_health_manager.bind_ip
         self.port = CONF.a10_health_manager.bind_port
+        self.batch_interval = CONF.a10_health_manager.heartbeat_batch_interval
+        self.batch_size = CONF.a10_health_manager.heartbeat_batch_size
         self.sockaddr = None
         LOG.info('attempting to listen on %(ip)s port %(port)s',
                  {'ip': self.ip, 'port': self.port})
         self.sock = None
         self.update(self.key, self.ip, self.port)
         self.vthunder_repo = a10repo.VThunderRepository()
+        self.address_index = VThunderAddressIndex(self.vthunder_repo)
+        self.pending = {}
+        self.pending_since = None
+        self.packets_received = 0
+        self.packets_deduplicated = 0
+        self.vthunders_flushed = 0
 
     def update(self, key, ip, port):
         """Update the running config for the udp socket server
@@ -58,7 +143,9 @@ class VThunderUDPStatusGetter(object):
             if self.sock is not None:
                 self.sock.close()
             self.sock = socket.socket(ai_family, socket.SOCK_DGRAM)
-            self.sock.settimeout(1)
+            self.sock.settimeout(self._socket_timeout())
+            if CONF.a10_health_manager.heartbeat_listener_workers > 1:
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             self.sock.bind(self.sockaddr)
             if CONF.a10_health_manager.sock_rlimit > 0:
                 rlimit = CONF.a10_health_manager.sock_rlimit
@@ -69,21 +156,47 @@ class VThunderUDPStatusGetter(object):
         if self.sock is None:
             raise exceptions.NetworkConfig("Unable to find suitable socket")
 
+    def _socket_timeout(self):
+        if self.batch_interval > 0:
+            return min(1, self.batch_interval)
+        return 1
+
     def check(self):
         """Wait and obtain the source address of UDP packet and updates its time in
            vThunder repositories.
         """
+        if self.batch_interval <= 0:
+            self._check_single()
+            return
+
+        try:
+            data, srcaddr = self.sock.recvfrom(UDP_MAX_SIZE)
+            self.add_heartbeat(srcaddr[0], datetime.datetime.utcnow())
+        except socket.timeout:
+            # Pass here as this is an expected cycling of the listen socket
+            pass
+        except exceptions.InvalidHMACException:
+            # Pass here as the packet was dropped and logged already
+            pass
+        except Exception as ex:
+            LOG.warning('Health Manager experienced an exception processing a'
+                        'heartbeat packet. Ignoring this packet. '
+                        'Exception: %s', ex)
+
+        if self.is_flush_due():
+            self.flush()
+
+    def _check_single(self):
         try:
             data, srcaddr = self.sock.recvfrom(UDP_MAX_SIZE)
             ip, port = srcaddr
-            LOG.warning('Received packet from %s', ip)
-            # get record id of first vThunder from srcaddr
-            record_id = self.vthunder_repo.get_vthunder_from_src_addr(db_api.get_session(), ip)
+            LOG.debug('Received packet from %s', ip)
+            record_ids = self.address_index.lookup(ip)
 
-            if record_id:
+            if record_ids:
                 last_udp_update = datetime.datetime.utcnow()
-                self.vthunder_repo.update(db_api.get_session(), record_id,
-                                          last_udp_update=last_udp_update)
+                self.vthunder_repo.update_last_udp_update(db_api.get_session(), record_ids,
+                                                          last_udp_update)
         except socket.timeout:
             # Pass here as this is an expected cycling of the listen socket
             pass
@@ -94,3 +207,58 @@ class VThunderUDPStatusGetter(object):
             LOG.warning('Health Manager experienced an exception processing a'
                         'heartbeat packet. Ignoring this packet. '
                         'Exception: %s', ex)
+
+    def add_heartbeat(self, ip, received_at):
+        """Record a heartbeat, keeping only the latest one per source address"""
+        LOG.debug('Received packet from %s', ip)
+        self.packets_received += 1
+        if ip in self.pending:
+            self.packets_deduplicated += 1
+        elif not self.pending:
+            self.pending_since = time.time()
+        self.pending[ip] = received_at
+
+    def is_flush_due(self):
+        if not self.pending:
+            return False
+        return (len(self.pending) >= self.batch_size or
+                time.time() - self.pending_since >= self.batch_interval)
+
+    def take_pending(self):
+        """Detach and return the pending heartbeats, starting a new batch"""
+        pending = self.pending
+        self.pending = {}
+        self.pending_since = None
+        return pending
+
+    def flush(self):
+        """Write all pending heartbeats with a single bulk update."""
+        self.write_batch(self.take_pending())
+
+    def write_batch(self, pending):
+        """Write a batch of heartbeats with a single bulk update.
+
+        The oldest heartbeat time of the batch is written so that a vThunder
+        is never reported alive later than it actually was.
+        """
+        if not pending:
+            return
+        last_udp_update = min(pending.values())
+        try:
+            record_ids = set()
+            for ip in pending:
+                ids = self.address_index.lookup(ip)
+                if not ids:
+                    LOG.debug('Ignoring heartbeat from unknown address %s', ip)
+                record_ids.update(ids)
+            self.vthunder_repo.update_last_udp_update(db_api.get_session(), record_ids,
+                                                      last_udp_update)
+            self.vthunders_flushed += len(pending)
+        except Exception as ex:
+            LOG.warning('Health Manager failed to write a batch of %s '
+                        'heartbeats. Exception: %s', len(pending), ex)
+        LOG.debug('Heartbeats received: %(received)s, deduplicated: %(dedup)s, '
+                  'vThunders flushed: %(flushed)s',
+                  {'received': self.packets_received,
+                   'dedup': self.packets_deduplicated,
+                   'flushed': self.vthunders_flushed})
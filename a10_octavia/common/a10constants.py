@@ -46,6 +46,7 @@ NO_DEST_NAT_SUPPORTED_PROTOCOL = ['tcp', 'udp']
 PORT = 'port'
 MEMBER_COUNT = 'member_count'
 DELETE_VRID = 'delete_vrid'
+DELETED_MEMBERS = 'deleted_members'
 
 SUBNET_ID = "subnet_id"
 VLAN_ID = "vlan_id"
@@ -56,6 +57,7 @@ VLAN = "vlan"
 FLAT = "flat"
 SUPPORTED_NETWORK_TYPE = [FLAT, VLAN]
 SSL_TEMPLATE = "ssl_template"
+SSL_CERT_USAGE_COUNT = "ssl_cert_usage_count"
 
 # Taskflow flow and task names
 
@@ -90,6 +92,7 @@ VTHUNDER_BY_LB = 'vthunder-by-loadbalancer'
 CHANGE_PARTITION = 'change-partition'
 CREATE_SSL_CERT_FLOW = 'create-ssl-cert-flow'
 DELETE_SSL_CERT_FLOW = 'delete-ssl-cert-flow'
+DELETE_SSL_CERT_SUBFLOW = 'delete-ssl-cert-subflow'
 LISTENER_TYPE_DECIDER_FLOW = 'listener_type_decider_flow'
 DELETE_MEMBER_VTHUNDER_INTERNAL_SUBFLOW = 'delete-member-vthunder-internal-subflow'
 DELETE_MEMBER_VRID_SUBFLOW = 'delete-member-vrid-subflow'
@@ -99,5 +102,24 @@ DELETE_HEALTH_MONITOR_SUBFLOW_WITH_POOL_DELETE_FLOW = 'delete-health-monitor-sub
     '-with-pool-delete-flow'
 DELETE_MEMBERS_SUBFLOW_WITH_POOL_DELETE_FLOW = 'delete-members-subflow-with-pool-delete-flow'
 HANDLE_VRID_MEMBER_SUBFLOW = 'handle-vrid-member-subflow'
+MEMBER_NETWORK_PLUG_SUBFLOW = 'member-network-plug-subflow'
+MASTER_MEMBER_NETWORK_PLUG_SUBFLOW = 'master-member-network-plug-subflow'
+BACKUP_MEMBER_NETWORK_PLUG_SUBFLOW = 'backup-member-network-plug-subflow'
+UNORDERED_MEMBER_NETWORK_PLUG_FLOW = 'unordered-member-network-plug-flow'
+MASTER_LB_NETWORKING_SUBFLOW = 'master-lb-networking-subflow'
+BACKUP_LB_NETWORKING_SUBFLOW = 'backup-lb-networking-subflow'
+UNORDERED_LB_NETWORKING_FLOW = 'unordered-lb-networking-flow'
+UNORDERED_GET_VTHUNDERS_FLOW = 'unordered-get-vthunders-flow'
+UNORDERED_CONFIGURE_VRRP_FLOW = 'unordered-configure-vrrp-flow'
+UNORDERED_CONFIGURE_VRID_FLOW = 'unordered-configure-vrid-flow'
+UNORDERED_WAIT_FOR_SYNC_FLOW = 'unordered-wait-for-sync-flow'
+UNORDERED_MEMBER_DEVICE_FLOW = 'unordered-member-device-flow'
+BATCH_MEMBER_PREPARE_SUBFLOW = 'batch-member-prepare-subflow'
+BATCH_MEMBER_COMPLETE_SUBFLOW = 'batch-member-complete-subflow'
+MEMBER_CREATE = 'member-create'
+MEMBER_UPDATE = 'member-update'
+MEMBER_DELETE = 'member-delete'
+TAG_INTERFACE_FOR_MEMBER = 'tag-interface-for-member'
+DELETE_INTERFACE_TAG_FOR_MEMBER = 'delete-interface-tag-for-member'
 SPARE_VTHUNDER_CREATE = 'spare-vthunder-create'
 LB_TO_VTHUNDER_SUBFLOW = 'lb-to-vthunder-subflow'
@@ -0,0 +1,178 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Process wide pool of authenticated aXAPI clients
+
+"""
+import collections
+import threading
+import time
+
+import acos_client
+from acos_client import errors as acos_errors
+from oslo_config import cfg
+from oslo_log import log as logging
+from requests import exceptions as req_exceptions
+
+from a10_octavia.common import device_scheduler
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+_PooledClient = collections.namedtuple('_PooledClient', ['client', 'password', 'last_used'])
+
+
+def _pool_key(vthunder):
+    partition_name = vthunder.partition_name or "shared"
+    return (vthunder.ip_address, vthunder.axapi_version, vthunder.username, partition_name)
+
+
+def _new_client(vthunder):
+    api_ver = acos_client.AXAPI_21 if vthunder.axapi_version == 21 else acos_client.AXAPI_30
+    client = acos_client.Client(vthunder.ip_address, api_ver,
+                                vthunder.username, vthunder.password,
+                                timeout=30)
+    return device_scheduler.get_scheduler().install(client, vthunder.ip_address)
+
+
+def _close_client(client):
+    try:
+        client.session.close()
+    except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
+        LOG.debug("Failed to close the vThunder session: %s", str(e))
+    except AttributeError:
+        pass
+
+
+class AXAPISessionPool(object):
+    """Keeps authenticated aXAPI clients for reuse across tasks and flows.
+
+    Clients are keyed by (ip_address, axapi_version, username, partition).
+    A client is handed out to a single caller at a time and returned to the
+    pool once the caller is done with it. Clients left idle for longer than
+    `idle_timeout` seconds are logged off and dropped, so an expired device
+    token is never handed out. Tokens invalidated on the device side are
+    re-authenticated by acos_client on the next request.
+    """
+
+    def __init__(self, idle_timeout, max_idle):
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def _is_expired(self, entry, now):
+        return now - entry.last_used > self.idle_timeout
+
+    def acquire(self, vthunder):
+        key = _pool_key(vthunder)
+        now = time.time()
+        client = None
+        stale = []
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                entry = idle.pop()
+                if entry.password != vthunder.password or self._is_expired(entry, now):
+                    stale.append(entry.client)
+                else:
+                    client = entry.client
+                    break
+
+        for stale_client in stale:
+            _close_client(stale_client)
+
+        if client is None:
+            LOG.debug("Creating new aXAPI session for vThunder %s", vthunder.ip_address)
+            client = _new_client(vthunder)
+        return client
+
+    def release(self, client, vthunder, discard=False):
+        if discard:
+            _close_client(client)
+            return
+
+        key = _pool_key(vthunder)
+        entry = _PooledClient(client, vthunder.password, time.time())
+        overflow = None
+        with self._lock:
+            idle = self._idle.setdefault(key, collections.deque())
+            if len(idle) >= self.max_idle:
+                overflow = client
+            else:
+                idle.append(entry)
+
+        if overflow is not None:
+            _close_client(overflow)
+        self.evict_idle()
+
+    def evict_idle(self):
+        now = time.time()
+        stale = []
+        with self._lock:
+            for key in list(self._idle):
+                idle = self._idle[key]
+                while idle and self._is_expired(idle[0], now):
+                    stale.append(idle.popleft().client)
+                if not idle:
+                    del self._idle[key]
+
+        for stale_client in stale:
+            _close_client(stale_client)
+
+    def close_all(self):
+        with self._lock:
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle = {}
+
+        for entry in entries:
+            _close_client(entry.client)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AXAPISessionPool(
+                CONF.a10_controller_worker.axapi_session_idle_timeout,
+                CONF.a10_controller_worker.axapi_session_max_idle)
+    return _pool
+
+
+def acquire_client(vthunder):
+    """Get an aXAPI client for the vThunder, reusing a pooled session if possible"""
+    if not CONF.a10_controller_worker.axapi_session_pool:
+        return _new_client(vthunder)
+    return get_pool().acquire(vthunder)
+
+
+def release_client(client, vthunder, discard=False):
+    """Hand back a client obtained from acquire_client"""
+    if client is None:
+        return
+    if not CONF.a10_controller_worker.axapi_session_pool:
+        _close_client(client)
+        return
+    get_pool().release(client, vthunder, discard=discard)
+
+
+def close_all():
+    """Log off every pooled session, used on service shutdown"""
+    if _pool is not None:
+        _pool.close_all()
@@ -108,6 +108,12 @@ A10_LISTENER_OPTS = [
     cfg.BoolOpt('use_rcv_hop_for_resp',
                 default=False,
                 help=_('Use receive hop for response to client')),
+    cfg.BoolOpt('consolidate_l7policies',
+                default=False,
+                help=_('Compile all the L7 policies of a listener, ordered by '
+                       'position, into one aFlex program named after the '
+                       'listener, instead of binding one aFlex script per '
+                       'policy to the virtual port')),
 ]
 
 A10_SERVICE_GROUP_OPTS = [
@@ -177,8 +183,14 @@ A10_HEALTH_MANAGER_OPTS = [
                default=None,
                help=_('Number of processes for vthunder health update.')),
     cfg.IntOpt('stats_update_threads',
-               default=None,
-               help=_('Number of processes for vthunder stats update.')),
+               default=10, min=1,
+               help=_('Number of threads reading listener statistics from '
+                      'vThunders in parallel.')),
+    cfg.IntOpt('stats_update_interval',
+               default=30, min=0,
+               help=_('Interval(in seconds) between collections of the '
+                      'listener statistics of the vThunders. Set to 0 to '
+                      'disable the statistics collection.')),
     cfg.StrOpt('heartbeat_key',
                help=_('key used to validate vthunder sending'
                       'the message'), secret=True),
@@ -199,6 +211,36 @@ A10_HEALTH_MANAGER_OPTS = [
     cfg.IntOpt('heartbeat_interval',
                default=10,
                help=_('Sleep time between sending heartbeats.')),
+    cfg.FloatOpt('heartbeat_batch_interval',
+                 default=1.0, min=0,
+                 help=_('Maximum time(in seconds) a received heartbeat is '
+                        'held before it is written to the database. '
+                        'Heartbeats received within this window are written '
+                        'with a single bulk update. Set to 0 to write every '
+                        'heartbeat as it arrives.')),
+    cfg.IntOpt('heartbeat_batch_size',
+               default=500, min=1,
+               help=_('Maximum number of distinct vThunders written to the '
+                      'database in one heartbeat batch.')),
+    cfg.StrOpt('heartbeat_listener_mode',
+               default='socket',
+               choices=['socket', 'asyncio'],
+               help=_('Implementation of the heartbeat listener. socket '
+                      'reads one heartbeat per blocking recvfrom call. '
+                      'asyncio drains many heartbeats per event loop wakeup '
+                      'into a preallocated buffer and writes batches from a '
+                      'background flusher. asyncio requires python 3.')),
+    cfg.IntOpt('heartbeat_listener_workers',
+               default=1, min=1,
+               help=_('Number of heartbeat listener processes. When more '
+                      'than one is configured the listeners share bind_port '
+                      'through SO_REUSEPORT and the kernel spreads the '
+                      'heartbeats across them.')),
+    cfg.IntOpt('heartbeat_index_refresh_interval',
+               default=30, min=1,
+               help=_('Interval(in seconds) between refreshes of the '
+                      'heartbeat listener\'s in-memory index of vThunder '
+                      'ip addresses.')),
 
 ]
 
@@ -254,7 +296,120 @@ A10_CONTROLLER_WORKER_OPTS = [
                choices=constants.SUPPORTED_LB_TOPOLOGIES,
                help=_('Load balancer topology configuration. '
                       'SINGLE - One vthunder per load balancer. '
-                      'ACTIVE_STANDBY - Two vthunder per load balancer.'))
+                      'ACTIVE_STANDBY - Two vthunder per load balancer.')),
+    cfg.BoolOpt('axapi_session_pool',
+                default=True,
+                help=_('Reuse authenticated aXAPI sessions across tasks and '
+                       'flows instead of logging in to the device for every task.')),
+    cfg.IntOpt('axapi_session_idle_timeout',
+               default=300, min=1,
+               help=_('Seconds a pooled aXAPI session may stay idle before it '
+                      'is logged off. Keep this lower than the session '
+                      'timeout configured on the Thunder devices.')),
+    cfg.IntOpt('axapi_session_max_idle',
+               default=4, min=1,
+               help=_('Maximum number of idle aXAPI sessions kept per device '
+                      'and partition.')),
+    cfg.IntOpt('partition_cache_ttl',
+               default=300, min=0,
+               help=_('Seconds to cache that a partition exists on a '
+                      'Thunder device before checking again. Missing '
+                      'partitions are checked every time.')),
+    cfg.FloatOpt('write_memory_coalesce_window',
+                 default=0, min=0,
+                 help=_('Seconds to collect write memory requests for the '
+                        'same Thunder device partition into a single write '
+                        'memory. Flows only mark the partition dirty, and a '
+                        'background writer persists it, so a configuration '
+                        'change is not durable yet when its flow finishes. '
+                        '0 writes memory at the end of every flow.')),
+    cfg.FloatOpt('vthunder_ready_poll_min_interval',
+                 default=1, min=0.1,
+                 help=_('Initial seconds between polls of a vThunder that is '
+                        'booting, rebooting or syncing its configuration. '
+                        'The interval doubles after every poll.')),
+    cfg.FloatOpt('vthunder_ready_poll_max_interval',
+                 default=20, min=0.1,
+                 help=_('Maximum seconds between polls of a vThunder that '
+                        'is not ready yet.')),
+    cfg.IntOpt('vthunder_ready_timeout',
+               default=600, min=1,
+               help=_('Seconds to wait for a vThunder to answer before the '
+                      'flow fails.')),
+    cfg.IntOpt('vthunder_reboot_shutdown_timeout',
+               default=30, min=0,
+               help=_('Seconds to wait for a vThunder to stop answering '
+                      'after a reboot was requested before polling it for '
+                      'readiness.')),
+    cfg.StrOpt('task_flow_engine',
+               choices=['serial', 'parallel'],
+               help=_('TaskFlow engine running the controller worker flows. '
+                      'parallel runs independent branches of a flow, such '
+                      'as the master and backup vThunder steps, '
+                      'concurrently. Defaults to the engine option of the '
+                      '[task_flow] section.')),
+    cfg.IntOpt('task_flow_max_workers',
+               min=1,
+               help=_('Size of the thread pool shared by all flows when '
+                      'task_flow_engine is parallel. Defaults to the '
+                      'max_workers option of the [task_flow] section.')),
+    cfg.IntOpt('device_write_concurrency',
+               default=1, min=0,
+               help=_('Maximum number of mutating aXAPI requests in flight to '
+                      'the same Thunder device. 0 means unlimited.')),
+    cfg.IntOpt('device_read_concurrency',
+               default=4, min=0,
+               help=_('Maximum number of read-only aXAPI requests in flight '
+                      'to the same Thunder device. 0 means unlimited.')),
+    cfg.IntOpt('device_busy_retry_timeout',
+               default=300, min=0,
+               help=_('Seconds an aXAPI request is retried for while the '
+                      'Thunder device reports it is busy or not ready.')),
+    cfg.FloatOpt('device_busy_backoff_min',
+                 default=0.5, min=0,
+                 help=_('Initial delay in seconds before retrying an aXAPI '
+                        'request the Thunder device reported busy. The delay '
+                        'doubles on each retry.')),
+    cfg.FloatOpt('device_busy_backoff_max',
+                 default=16, min=0,
+                 help=_('Maximum delay in seconds between two retries of an '
+                        'aXAPI request the Thunder device reported busy.')),
+    cfg.IntOpt('network_cache_ttl',
+               default=60, min=0,
+               help=_('Seconds neutron networks and subnets looked up by the '
+                      'network driver are cached for. 0 disables the cache.')),
+    cfg.IntOpt('network_cache_max_size',
+               default=1024, min=1,
+               help=_('Maximum number of neutron networks, and of subnets, '
+                      'kept in the network driver cache.')),
+    cfg.IntOpt('address_index_ttl',
+               default=600, min=0,
+               help=_('Seconds the server and virtual server addresses of a '
+                      'Thunder partition are trusted for, when checking '
+                      'whether a VLAN is still in use, before they are '
+                      'listed from the device again. 0 lists them on every '
+                      'check.')),
+    cfg.IntOpt('cert_sync_ttl',
+               default=300, min=0,
+               help=_('Seconds an SSL certificate or key uploaded to a Thunder '
+                      'partition by this process is trusted to be unchanged '
+                      'there. Uploads of the same content are skipped meanwhile '
+                      'while the file still exists on the partition. 0 uploads '
+                      'on every sync.')),
+    cfg.IntOpt('barbican_cache_ttl',
+               default=300, min=0,
+               help=_('Seconds the certificate data of a Barbican container is '
+                      'cached for. 0 disables the cache.')),
+    cfg.IntOpt('l7policy_cache_size',
+               default=1024, min=0,
+               help=_('Number of compiled aFlex scripts of L7 policies kept in '
+                      'memory')),
+    cfg.IntOpt('aflex_sync_ttl',
+               default=3600, min=0,
+               help=_('Seconds an aFlex script uploaded to a Thunder partition, '
+                      'and the aFlex scripts bound to a listener virtual port, '
+                      'are trusted to be unchanged there. 0 uploads and reads '
+                      'the virtual port on every sync.')),
 ]
 
 A10_HOUSE_KEEPING_OPTS = [
@@ -139,7 +139,7 @@ class Thunder(BaseDataModel):
                  topology="STANDALONE", role="MASTER", last_udp_update=None, status="ACTIVE",
                  created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
                  partition_name="shared", hierarchical_multitenancy=None,
-                 vrid_floating_ip=None, device_network_map=None):
+                 vrid_floating_ip=None, device_network_map=None, claimed_at=None):
         self.id = id
         self.vthunder_id = vthunder_id
         self.amphora_id = amphora_id
@@ -161,6 +161,7 @@ class Thunder(BaseDataModel):
         self.partition_name = partition_name
         self.hierarchical_multitenancy = hierarchical_multitenancy
         self.vrid_floating_ip = vrid_floating_ip
+        self.claimed_at = claimed_at
         self.device_network_map = device_network_map or []
 
 
@@ -0,0 +1,194 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Per device queues of the aXAPI requests sent to Thunder devices
+
+"""
+import contextlib
+import functools
+import random
+import threading
+import time
+
+from acos_client import errors as acos_errors
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from a10_octavia.common import exceptions
+from a10_octavia.common import stats
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+BUSY_ERRORS = (acos_errors.ACOSSystemIsBusy, acos_errors.ACOSSystemNotReady)
+
+READ_METHODS = ('GET', 'HEAD')
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class _DeviceQueue(object):
+
+    def __init__(self, read_limit, write_limit):
+        self.read_slots = threading.BoundedSemaphore(read_limit) if read_limit else None
+        self.write_slots = threading.BoundedSemaphore(write_limit) if write_limit else None
+        self.wait_latency = stats.LatencyStats()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.running = 0
+        self.busy_retries = 0
+
+
+class DeviceScheduler(object):
+    """Queues the aXAPI requests of every device, keyed by the device ip address.
+
+    Read-only requests and mutating requests of a device are bounded by
+    separate concurrency limits, typically many readers and a single
+    writer. Requests the device rejects as busy or not ready are retried
+    with an exponential, jittered backoff, without holding a slot while
+    sleeping, until `busy_timeout` seconds passed.
+    """
+
+    def __init__(self, read_limit, write_limit, busy_timeout,
+                 backoff_min, backoff_max):
+        self.read_limit = read_limit
+        self.write_limit = write_limit
+        self.busy_timeout = busy_timeout
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._held = threading.local()
+
+    def _queue(self, key):
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = _DeviceQueue(self.read_limit, self.write_limit)
+                self._queues[key] = queue
+            return queue
+
+    @contextlib.contextmanager
+    def slot(self, key, write=True):
+        """Hold a read or write slot of the device while in the block"""
+        held = self._held.__dict__.setdefault('keys', set())
+        queue = self._queue(key)
+        semaphore = queue.write_slots if write else queue.read_slots
+        if semaphore is None or key in held:
+            yield
+            return
+
+        waited = 0.0
+        if not semaphore.acquire(False):
+            with self._lock:
+                queue.waiting += 1
+                queue.max_waiting = max(queue.max_waiting, queue.waiting)
+            started_at = time.time()
+            try:
+                semaphore.acquire()
+            finally:
+                waited = time.time() - started_at
+                with self._lock:
+                    queue.waiting -= 1
+        queue.wait_latency.record(waited)
+        if waited > 1:
+            LOG.debug("aXAPI request waited %.2f seconds in the queue of Thunder device %s",
+                      waited, key)
+
+        with self._lock:
+            queue.running += 1
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            with self._lock:
+                queue.running -= 1
+            semaphore.release()
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_min * (2 ** attempt))
+        return random.uniform(delay / 2.0, delay)
+
+    def call(self, key, method, func, *args, **kwargs):
+        """Run func(*args, **kwargs) as an aXAPI request of the device"""
+        write = method.upper() not in READ_METHODS
+        deadline = time.time() + self.busy_timeout
+        attempt = 0
+        while True:
+            with self.slot(key, write=write):
+                try:
+                    return func(*args, **kwargs)
+                except BUSY_ERRORS as e:
+                    error = e
+            delay = self._backoff(attempt)
+            if time.time() + delay > deadline:
+                raise exceptions.DeviceBusyTimeout(
+                    getattr(error, 'code', 1),
+                    "Thunder device {0} stayed busy for {1} seconds: {2}".format(
+                        key, self.busy_timeout, str(error)))
+            queue = self._queue(key)
+            with self._lock:
+                queue.busy_retries += 1
+            LOG.warning("Thunder device %s is busy, retrying %s %s in %.2f seconds: %s",
+                        key, method, args[0] if args else '', delay, str(error))
+            time.sleep(delay)
+            attempt += 1
+
+    def install(self, client, key):
+        """Route the requests of an acos_client Client through the device queue
+
+        The scheduled request replaces the HttpClient's request_impl, below
+        acos_client's own busy retry loop, which is therefore never reached
+        by busy errors.
+        """
+        http = getattr(client, 'http', None)
+        request_impl = getattr(http, 'request_impl', None)
+        if request_impl is None:
+            return client
+
+        def scheduled_request_impl(method, *args, **kwargs):
+            return self.call(key, method, functools.partial(request_impl, method),
+                             *args, **kwargs)
+
+        http.request_impl = scheduled_request_impl
+        return client
+
+    def stats(self):
+        """Return the queue depth and wait times of every device"""
+        with self._lock:
+            queues = dict(self._queues)
+            depths = dict((key, (queue.waiting, queue.max_waiting, queue.running))
+                          for key, queue in queues.items())
+        return dict((key, {'waiting': depths[key][0],
+                           'max_waiting': depths[key][1],
+                           'running': depths[key][2],
+                           'busy_retries': queue.busy_retries,
+                           'wait': queue.wait_latency.summary()})
+                    for key, queue in queues.items())
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            conf = CONF.a10_controller_worker
+            _scheduler = DeviceScheduler(conf.device_read_concurrency,
+                                         conf.device_write_concurrency,
+                                         conf.device_busy_retry_timeout,
+                                         conf.device_busy_backoff_min,
+                                         conf.device_busy_backoff_max)
+        return _scheduler
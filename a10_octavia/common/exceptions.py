@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from acos_client import errors as acos_errors
 from oslo_config import cfg
 
 from octavia.common import exceptions
@@ -24,6 +25,10 @@ class NoDatabaseURL(exceptions.OctaviaException):
     message = _("Must set db connection url in configuration file.")
 
 
+class DeviceBusyTimeout(acos_errors.ACOSException):
+    pass
+
+
 class PortCreationFailedException(base.NetworkException):
     pass
 
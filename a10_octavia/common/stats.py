@@ -0,0 +1,62 @@
+# Copyright 2020 A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process metrics of the a10-octavia services
+
+"""
+import collections
+import threading
+
+
+def _percentile(samples, percent):
+    return samples[int(round(percent / 100.0 * (len(samples) - 1)))]
+
+
+class LatencyStats(object):
+    """Thread safe latency distribution over the last `window` samples."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self._samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, percent):
+        """Return the latency below which `percent` of the recent samples fall"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return _percentile(samples, percent)
+
+    def summary(self):
+        """Return count, mean, p50, p95, p99 and max of the recent samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.count
+            total = self.total
+        if not samples:
+            return {'count': 0}
+        return {'count': count,
+                'mean': total / count,
+                'p50': _percentile(samples, 50),
+                'p95': _percentile(samples, 95),
+                'p99': _percentile(samples, 99),
+                'max': samples[-1]}
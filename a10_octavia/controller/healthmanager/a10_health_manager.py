@@ -15,6 +15,7 @@
 
 from concurrent import futures
 import datetime
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -23,6 +24,7 @@ from oslo_utils import excutils
 from octavia.controller.healthmanager import health_manager
 from octavia.db import api as db_apis
 
+from a10_octavia.common import stats
 from a10_octavia.controller.worker import controller_worker as cw
 from a10_octavia.db import repositories as a10repo
 
@@ -38,36 +40,86 @@ class A10HealthManager(health_manager.HealthManager):
         self.executor = futures.ThreadPoolExecutor(max_workers=self.threads)
         self.vthunder_repo = a10repo.VThunderRepository()
         self.dead = exit_event
+        # vthunder_id -> (future, monotonic start time) of running failovers
+        self.in_flight = {}
+        self.failover_latency = stats.LatencyStats()
 
     def health_check(self):
-        futs = []
+        """Keep up to failover_threads failovers running until none are left.
+
+        Stale vThunders are admitted whenever a failover finishes and frees a
+        slot, and rescanned every health_check_interval while all slots are
+        busy, so one slow failover does not delay the detection of others.
+        """
         while not self.dead.is_set():
-            lock_session = None
-            try:
-                lock_session = db_apis.get_session()
-                failover_wait_time = datetime.datetime.utcnow() - datetime.timedelta(
-                    seconds=CONF.a10_health_manager.heartbeat_timeout)
-                initial_setup_wait_time = datetime.datetime.utcnow() - datetime.timedelta(
-                    seconds=CONF.a10_health_manager.failover_timeout)
-                vthunder = self.vthunder_repo.get_stale_vthunders(
-                    lock_session, initial_setup_wait_time, failover_wait_time)
+            self._admit_stale_vthunders()
+            if not self.in_flight:
+                break
+            futures.wait(
+                [fut for fut, started_at in self.in_flight.values()],
+                timeout=CONF.a10_health_manager.health_check_interval,
+                return_when=futures.FIRST_COMPLETED)
+            self._reap_failovers()
 
-            except Exception:
-                with excutils.save_and_reraise_exception():
-                    if lock_session:
-                        lock_session.rollback()
+        if self.dead.is_set():
+            for fut, started_at in self.in_flight.values():
+                # This may not actually be able to cancel, but try to
+                # if we can.
+                fut.cancel()
 
-            if vthunder is None:
-                break
+    def _admit_stale_vthunders(self):
+        free_slots = self.threads - len(self.in_flight)
+        if free_slots <= 0:
+            return
 
+        lock_session = None
+        try:
+            lock_session = db_apis.get_session()
+            failover_wait_time = datetime.datetime.utcnow() - datetime.timedelta(
+                seconds=CONF.a10_health_manager.heartbeat_timeout)
+            initial_setup_wait_time = datetime.datetime.utcnow() - datetime.timedelta(
+                seconds=CONF.a10_health_manager.failover_timeout)
+            # A claim still held after failover_timeout was left by a health
+            # manager that stopped before finishing the failover
+            vthunders = self.vthunder_repo.claim_stale_vthunders(
+                lock_session, initial_setup_wait_time, failover_wait_time,
+                initial_setup_wait_time, free_slots)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                if lock_session:
+                    lock_session.rollback()
+
+        for vthunder in vthunders:
+            if vthunder.vthunder_id in self.in_flight:
+                continue
             LOG.info("Stale vThunder's id is: %s", vthunder.vthunder_id)
             fut = self.executor.submit(self.cw.failover_amphora, vthunder.vthunder_id)
-            futs.append(fut)
-            if len(futs) == self.threads:
-                break
+            self.in_flight[vthunder.vthunder_id] = (fut, time.time())
+
+    def _reap_failovers(self):
+        for vthunder_id, (fut, started_at) in list(self.in_flight.items()):
+            if not fut.done():
+                continue
+            del self.in_flight[vthunder_id]
+            latency = time.time() - started_at
+            self.failover_latency.record(latency)
+            if fut.exception() is not None:
+                # The claim is kept, the failover is retried once it expires
+                # after failover_timeout
+                LOG.warning("Failover of vThunder %s failed after %.1f seconds, "
+                            "retrying in %s seconds", vthunder_id, latency,
+                            CONF.a10_health_manager.failover_timeout)
+            else:
+                LOG.info("Successfully completed failover for vThunder %s in %.1f seconds",
+                         vthunder_id, latency)
+                self._release_claim(vthunder_id)
+            LOG.info("Failover latency over %(count)s failovers: p50 %(p50).1fs, "
+                     "p95 %(p95).1fs, p99 %(p99).1fs, max %(max).1fs",
+                     self.failover_latency.summary())
 
-        if futs:
-            LOG.info("Waiting for %s failovers to finish",
-                     len(futs))
-            health_manager.wait_done_or_dead(futs, self.dead)
-            LOG.info("Successfully completed failover for VThunders.")
+    def _release_claim(self, vthunder_id):
+        try:
+            self.vthunder_repo.release_vthunder_claim(db_apis.get_session(), vthunder_id)
+        except Exception:
+            LOG.exception("Failed to release the failover claim of vThunder %s",
+                          vthunder_id)
@@ -0,0 +1,229 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Collection of the listener statistics of vThunders for the driver agent
+
+"""
+import collections
+from concurrent import futures
+import threading
+
+import acos_client.errors as acos_errors
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from octavia.common import constants
+from octavia.db import api as db_apis
+from octavia_lib.api.drivers import driver_lib
+from octavia_lib.api.drivers import exceptions as driver_exceptions
+
+from a10_octavia.common import openstack_mappings
+from a10_octavia.controller.worker.tasks import decorators
+from a10_octavia.db import repositories as a10repo
+
+CONF = cfg.CONF
+CONF.import_group('a10_health_manager', 'a10_octavia.common.config_options')
+CONF.import_group('driver_agent', 'octavia.common.config')
+LOG = logging.getLogger(__name__)
+
+VIRTUAL_SERVER_STATS_URL = "/axapi/v3/slb/virtual-server/stats"
+
+# Cumulative listener statistics and the vport stats counters they are read from
+COUNTERS = ((constants.TOTAL_CONNECTIONS, 'total_conn'),
+            (constants.BYTES_IN, 'total_fwd_bytes'),
+            (constants.BYTES_OUT, 'total_rev_bytes'))
+
+
+def _port_key(protocol, port):
+    return (str(protocol).lower(), int(port))
+
+
+def vport_sample(stats):
+    """Return the listener statistics of the counters of a vport"""
+    sample = {constants.ACTIVE_CONNECTIONS: int(stats.get('curr_conn', 0))}
+    for name, counter in COUNTERS:
+        sample[name] = int(stats.get(counter, 0))
+    sample[constants.REQUEST_ERRORS] = max(
+        int(stats.get('total_req', 0)) - int(stats.get('total_req_succ', 0)), 0)
+    return sample
+
+
+class VportStatsReader(object):
+    """Reads the vport stats of the listeners of a vThunder partition"""
+
+    @decorators.axapi_client_decorator
+    def read(self, listeners, vthunder):
+        """Return the vport stats of the listeners, by listener id.
+
+        The stats of every port of every virtual server of the partition
+        are read with a single request.
+
+        :param listeners: list of (listener id, load balancer id, protocol,
+                          protocol port) tuples of the partition
+        """
+        listener_ids = {}
+        for listener_id, lb_id, protocol, protocol_port in listeners:
+            vport_protocol = openstack_mappings.virtual_port_protocol(
+                self.axapi_client, protocol)
+            listener_ids.setdefault(lb_id, {})[
+                _port_key(vport_protocol, protocol_port)] = listener_id
+
+        try:
+            resp = self.axapi_client.http.request(
+                "GET", VIRTUAL_SERVER_STATS_URL, {},
+                {'Authorization': "A10 %s" % self.axapi_client.session.id})
+        except acos_errors.NotFound:
+            LOG.debug("No virtual server found on vThunder %s partition %s",
+                      vthunder.ip_address, vthunder.partition_name)
+            return {}
+
+        samples = {}
+        for virtual_server in (resp or {}).get('virtual-server-list', []):
+            ports = listener_ids.get(virtual_server.get('name'), {})
+            for port in virtual_server.get('port-list', []):
+                listener_id = ports.get(_port_key(port.get('protocol'),
+                                                  port.get('port-number')))
+                if listener_id is not None:
+                    samples[listener_id] = vport_sample(port.get('stats', {}))
+        return samples
+
+
+class ListenerCounters(object):
+    """Running totals of the listener statistics across vport counter resets.
+
+    The totals grow by the increase of the vport counters between two
+    samples. A counter lower than in the previous sample was reset, e.g.
+    by a failover or a reload of the vThunder, and all of it is new.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}
+
+    def __contains__(self, listener_id):
+        with self._lock:
+            return listener_id in self._listeners
+
+    def update(self, listener_id, sample, stored=None):
+        """Add a sample of the vport counters, return the listener statistics.
+
+        :param stored: statistics stored for the listener before its first
+                       sample, the totals start from these instead of the
+                       counters of the first sample.
+        """
+        with self._lock:
+            previous, totals = self._listeners.get(listener_id, (None, None))
+            if totals is None:
+                totals = dict((name, 0) for name, counter in COUNTERS)
+                totals[constants.REQUEST_ERRORS] = 0
+                if stored:
+                    totals.update((name, stored.get(name) or 0) for name in totals)
+                    previous = sample
+            totals = dict(totals)
+            for name in totals:
+                value = sample[name]
+                last = previous.get(name, 0) if previous else 0
+                totals[name] += value - last if value >= last else value
+            self._listeners[listener_id] = (sample, totals)
+
+        stats = {'id': listener_id,
+                 constants.ACTIVE_CONNECTIONS: sample[constants.ACTIVE_CONNECTIONS]}
+        stats.update(totals)
+        return stats
+
+    def retain(self, listener_ids):
+        """Forget the listeners not in listener_ids"""
+        listener_ids = set(listener_ids)
+        with self._lock:
+            for listener_id in [listener_id for listener_id in self._listeners
+                                if listener_id not in listener_ids]:
+                del self._listeners[listener_id]
+
+
+class A10StatsCollector(object):
+    """Pushes the listener statistics of the vThunders to the driver agent.
+
+    Each collection reads the vport stats of every vThunder partition in
+    parallel, on up to stats_update_threads threads, and sends the
+    statistics that changed since the last collection in one update.
+    """
+
+    def __init__(self, exit_event):
+        self.dead = exit_event
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=CONF.a10_health_manager.stats_update_threads)
+        self.listener_repo = a10repo.ListenerRepository()
+        self.counters = ListenerCounters()
+        self.pushed = {}
+        self._driver_lib = None
+
+    @property
+    def driver_lib(self):
+        if self._driver_lib is None:
+            self._driver_lib = driver_lib.DriverLibrary(
+                status_socket=CONF.driver_agent.status_socket_path,
+                stats_socket=CONF.driver_agent.stats_socket_path)
+        return self._driver_lib
+
+    def collect_stats(self):
+        session = db_apis.get_session()
+        partitions = collections.OrderedDict()
+        listener_ids = []
+        for row in self.listener_repo.get_listeners_with_vthunder(session):
+            vthunder, listener = row[0], row[1:]
+            key = (vthunder.ip_address, vthunder.partition_name or "shared")
+            partitions.setdefault(key, (vthunder, []))[1].append(listener)
+            listener_ids.append(listener[0])
+        self.counters.retain(listener_ids)
+        self.pushed = dict((listener_id, self.pushed[listener_id])
+                           for listener_id in listener_ids if listener_id in self.pushed)
+
+        reads = dict((self.executor.submit(VportStatsReader().read, listeners,
+                                           vthunder=vthunder), key)
+                     for key, (vthunder, listeners) in partitions.items())
+        samples = {}
+        for fut in futures.as_completed(reads):
+            if self.dead.is_set():
+                break
+            try:
+                samples.update(fut.result())
+            except Exception as e:
+                LOG.warning("Failed to read the listener statistics of vThunder %s "
+                            "partition %s: %s", reads[fut][0], reads[fut][1], str(e))
+        if self.dead.is_set():
+            for fut in reads:
+                fut.cancel()
+            return
+
+        stored = self.listener_repo.get_statistics(
+            session, [listener_id for listener_id in samples
+                      if listener_id not in self.counters])
+        changed = []
+        for listener_id, sample in samples.items():
+            stats = self.counters.update(listener_id, sample, stored.get(listener_id))
+            if self.pushed.get(listener_id) != stats:
+                changed.append(stats)
+        if not changed:
+            return
+
+        try:
+            self.driver_lib.update_listener_statistics(
+                {constants.LISTENERS: [dict(stats) for stats in changed]})
+        except driver_exceptions.UpdateStatisticsError as e:
+            LOG.warning("Failed to update the statistics of %s listeners: %s",
+                        len(changed), e.fault_string)
+            return
+        for stats in changed:
+            self.pushed[stats['id']] = stats
+        LOG.debug("Updated the statistics of %s listeners", len(changed))
@@ -20,7 +20,9 @@ from oslo_messaging.rpc import dispatcher
 
 from octavia.common import rpc
 
+from a10_octavia.common import axapi_session_pool
 from a10_octavia.controller.queue import endpoint
+from a10_octavia.controller.worker.tasks import write_memory
 
 LOG = logging.getLogger(__name__)
 
@@ -64,4 +66,8 @@ class ConsumerService(cotyledon.Service):
                     e.worker.executor.shutdown()
                 except AttributeError:
                     pass
+        LOG.info('Writing memory of dirty Thunder partitions...')
+        write_memory.close()
+        LOG.info('Closing pooled aXAPI sessions...')
+        axapi_session_pool.close_all()
         super(ConsumerService, self).terminate()
@@ -12,13 +12,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
 from sqlalchemy.orm import exc as db_exceptions
 import tenacity
+import time
 import urllib3
 
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
+from taskflow import engines as tf_engines
 from taskflow.listeners import logging as tf_logging
 
 from octavia.common import base_taskflow
@@ -28,6 +31,7 @@ from octavia.db import api as db_apis
 from octavia.db import repositories as repo
 
 from a10_octavia.common import a10constants
+from a10_octavia.controller.worker import flow_cache
 from a10_octavia.controller.worker.flows import a10_health_monitor_flows
 from a10_octavia.controller.worker.flows import a10_l7policy_flows
 from a10_octavia.controller.worker.flows import a10_l7rule_flows
@@ -36,6 +40,7 @@ from a10_octavia.controller.worker.flows import a10_load_balancer_flows
 from a10_octavia.controller.worker.flows import a10_member_flows
 from a10_octavia.controller.worker.flows import a10_pool_flows
 from a10_octavia.controller.worker.flows import vthunder_flows
+from a10_octavia.controller.worker.tasks import readiness
 from a10_octavia.db import repositories as a10repo
 
 
@@ -50,6 +55,14 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
+class FlowExecutor(futures.ThreadPoolExecutor):
+    """Thread pool shared by the flows of the parallel engine"""
+
+    def submit(self, fn, *args, **kwargs):
+        return super(FlowExecutor, self).submit(
+            readiness.bind_report(fn), *args, **kwargs)
+
+
 class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
 
     def __init__(self):
@@ -70,7 +83,51 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         self._vthunder_flows = vthunder_flows.VThunderFlows()
         self._vthunder_repo = a10repo.VThunderRepository()
         self._exclude_result_logging_tasks = ()
+        self._flow_cache = flow_cache.FlowCache()
         super(A10ControllerWorker, self).__init__()
+        # Replaces the thread pool of the base engine, to attribute the
+        # readiness waits of the tasks run on it to their flow
+        self.executor.shutdown(wait=False)
+        self.executor = FlowExecutor(
+            max_workers=(CONF.a10_controller_worker.task_flow_max_workers or
+                         CONF.task_flow.max_workers))
+
+    def _taskflow_load(self, flow, **kwargs):
+        started_at = time.time()
+        try:
+            engine = tf_engines.load(
+                flow,
+                engine=(CONF.a10_controller_worker.task_flow_engine or
+                        CONF.task_flow.engine),
+                executor=self.executor,
+                never_resolve=CONF.task_flow.disable_revert,
+                **kwargs)
+            engine.compile()
+            engine.prepare()
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._flow_cache.checkin(flow)
+        compile_time = time.time() - started_at
+        self._flow_cache.record_compile(flow, compile_time)
+        LOG.debug("Compiled flow %(flow)s in %(ms).1f ms, %(hits)s of %(loads)s "
+                  "flows were reused",
+                  {'flow': flow.name, 'ms': compile_time * 1000,
+                   'hits': self._flow_cache.hits,
+                   'loads': self._flow_cache.hits + self._flow_cache.misses})
+        readiness.WaitReportListener(engine).register()
+        flow_cache.FlowCheckinListener(engine, self._flow_cache, flow).register()
+        return engine
+
+    def _get_flow(self, get_flow, *args):
+        """Returns the flow built by get_flow(*args).
+
+        Flows are reused between requests of the same operation, the request
+        data is only bound by the store when the flow is loaded.
+        """
+        key = ((get_flow.__name__,) + args +
+               (CONF.a10_controller_worker.loadbalancer_topology,
+                CONF.a10_global.network_type))
+        return self._flow_cache.checkout(key, lambda: get_flow(*args))
 
     def create_amphora(self):
         """Creates an Amphora.
@@ -80,7 +137,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         :returns: amphora_id
         """
         create_vthunder_tf = self._taskflow_load(
-            self._vthunder_flows.get_create_vthunder_flow(),
+            self._get_flow(self._vthunder_flows.get_create_vthunder_flow),
             store={constants.BUILD_TYPE_PRIORITY:
                    constants.LB_CREATE_SPARES_POOL_PRIORITY}
         )
@@ -110,7 +167,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = pool.load_balancer
 
         create_hm_tf = self._taskflow_load(
-            self._health_monitor_flows.get_create_health_monitor_flow(),
+            self._get_flow(self._health_monitor_flows.get_create_health_monitor_flow),
             store={constants.HEALTH_MON: health_mon,
                    constants.POOL: pool,
                    constants.LISTENERS: listeners,
@@ -134,7 +191,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = pool.load_balancer
 
         delete_hm_tf = self._taskflow_load(
-            self._health_monitor_flows.get_delete_health_monitor_flow(),
+            self._get_flow(self._health_monitor_flows.get_delete_health_monitor_flow),
             store={constants.HEALTH_MON: health_mon,
                    constants.POOL: pool,
                    constants.LISTENERS: listeners,
@@ -169,7 +226,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = pool.load_balancer
 
         update_hm_tf = self._taskflow_load(
-            self._health_monitor_flows.get_update_health_monitor_flow(),
+            self._get_flow(self._health_monitor_flows.get_update_health_monitor_flow),
             store={constants.HEALTH_MON: health_mon,
                    constants.POOL: pool,
                    constants.LISTENERS: listeners,
@@ -191,20 +248,16 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
 
         load_balancer = listener.load_balancer
         if listener.project_id in CONF.hardware_thunder.devices:
-            create_listener_tf = self._taskflow_load(self._listener_flows.
-                                                     get_rack_vthunder_create_listener_flow(
-                                                         listener.project_id),
-                                                     store={constants.LOADBALANCER:
-                                                            load_balancer,
-                                                            constants.LISTENER:
-                                                                listener})
+            create_listener_tf = self._taskflow_load(
+                self._get_flow(self._listener_flows.get_rack_vthunder_create_listener_flow,
+                               listener.project_id),
+                store={constants.LOADBALANCER: load_balancer,
+                       constants.LISTENER: listener})
         else:
-            create_listener_tf = self._taskflow_load(self._listener_flows.
-                                                     get_create_listener_flow(),
-                                                     store={constants.LOADBALANCER:
-                                                            load_balancer,
-                                                            constants.LISTENER:
-                                                                listener})
+            create_listener_tf = self._taskflow_load(
+                self._get_flow(self._listener_flows.get_create_listener_flow),
+                store={constants.LOADBALANCER: load_balancer,
+                       constants.LISTENER: listener})
 
         with tf_logging.DynamicLoggingListener(create_listener_tf,
                                                log=LOG):
@@ -218,12 +271,12 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = listener.load_balancer
         if listener.project_id in CONF.hardware_thunder.devices:
             delete_listener_tf = self._taskflow_load(
-                self._listener_flows.get_delete_rack_listener_flow(),
+                self._get_flow(self._listener_flows.get_delete_rack_listener_flow),
                 store={constants.LOADBALANCER: load_balancer,
                        constants.LISTENER: listener})
         else:
             delete_listener_tf = self._taskflow_load(
-                self._listener_flows.get_delete_listener_flow(),
+                self._get_flow(self._listener_flows.get_delete_listener_flow),
                 store={constants.LOADBALANCER: load_balancer,
                        constants.LISTENER: listener})
         with tf_logging.DynamicLoggingListener(delete_listener_tf,
@@ -247,15 +300,11 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
 
         load_balancer = listener.load_balancer
 
-        update_listener_tf = self._taskflow_load(self._listener_flows.
-                                                 get_update_listener_flow(),
-                                                 store={constants.LISTENER:
-                                                        listener,
-                                                        constants.LOADBALANCER:
-                                                            load_balancer,
-                                                        constants.UPDATE_DICT:
-                                                            listener_updates
-                                                        })
+        update_listener_tf = self._taskflow_load(
+            self._get_flow(self._listener_flows.get_update_listener_flow),
+            store={constants.LISTENER: listener,
+                   constants.LOADBALANCER: load_balancer,
+                   constants.UPDATE_DICT: listener_updates})
         with tf_logging.DynamicLoggingListener(update_listener_tf, log=LOG):
             update_listener_tf.run()
 
@@ -338,7 +387,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
             load_balancer_id=load_balancer_id)
 
         update_lb_tf = self._taskflow_load(
-            self._lb_flows.get_update_load_balancer_flow(),
+            self._get_flow(self._lb_flows.get_update_load_balancer_flow),
             store={constants.LOADBALANCER: lb,
                    constants.LISTENERS: listeners,
                    constants.UPDATE_DICT: load_balancer_updates})
@@ -374,21 +423,19 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         topology = CONF.a10_controller_worker.loadbalancer_topology
         if member.project_id in CONF.hardware_thunder.devices:
             create_member_tf = self._taskflow_load(
-                self._member_flows.get_rack_vthunder_create_member_flow(),
+                self._get_flow(self._member_flows.get_rack_vthunder_create_member_flow),
                 store={
                     constants.MEMBER: member,
                     constants.LISTENERS: listeners,
                     constants.LOADBALANCER: load_balancer,
                     constants.POOL: pool})
         else:
-            create_member_tf = self._taskflow_load(self._member_flows.
-                                                   get_create_member_flow(topology=topology),
-                                                   store={constants.MEMBER: member,
-                                                          constants.LISTENERS:
-                                                          listeners,
-                                                          constants.LOADBALANCER:
-                                                          load_balancer,
-                                                          constants.POOL: pool})
+            create_member_tf = self._taskflow_load(
+                self._get_flow(self._member_flows.get_create_member_flow, topology),
+                store={constants.MEMBER: member,
+                       constants.LISTENERS: listeners,
+                       constants.LOADBALANCER: load_balancer,
+                       constants.POOL: pool})
 
         with tf_logging.DynamicLoggingListener(create_member_tf,
                                                log=LOG):
@@ -409,13 +456,13 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
 
         if member.project_id in CONF.hardware_thunder.devices:
             delete_member_tf = self._taskflow_load(
-                self._member_flows.get_rack_vthunder_delete_member_flow(),
+                self._get_flow(self._member_flows.get_rack_vthunder_delete_member_flow),
                 store={constants.MEMBER: member, constants.LISTENERS: listeners,
                        constants.LOADBALANCER: load_balancer, constants.POOL: pool}
             )
         else:
             delete_member_tf = self._taskflow_load(
-                self._member_flows.get_delete_member_flow(),
+                self._get_flow(self._member_flows.get_delete_member_flow),
                 store={constants.MEMBER: member, constants.LISTENERS: listeners,
                        constants.LOADBALANCER: load_balancer, constants.POOL: pool}
             )
@@ -423,12 +470,72 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
                                                log=LOG):
             delete_member_tf.run()
 
+    @tenacity.retry(
+        retry=tenacity.retry_if_exception_type(db_exceptions.NoResultFound),
+        wait=tenacity.wait_incrementing(
+            RETRY_INITIAL_DELAY, RETRY_BACKOFF, RETRY_MAX),
+        stop=tenacity.stop_after_attempt(RETRY_ATTEMPTS))
     def batch_update_members(self, old_member_ids, new_member_ids,
                              updated_members):
+        """Deletes, creates and updates the members of a pool in one flow.
 
-        raise exceptions.NotImplementedError(
-            user_fault_string='This provider does not support members yet',
-            operator_fault_string='This provider does not support members yet')
+        :param old_member_ids: IDs of the members to delete
+        :param new_member_ids: IDs of the members to create
+        :param updated_members: Dicts of the updated member attributes,
+                                including the member id
+        :returns: None
+        :raises NoResultFound: Unable to find a new member
+        """
+        new_members = [self._member_repo.get(db_apis.get_session(), id=mid)
+                       for mid in new_member_ids]
+        # The API may not have commited all of the new member records yet.
+        if None in new_members:
+            LOG.warning('Failed to fetch one of the new members from DB. '
+                        'Retrying for up to 60 seconds.')
+            raise db_exceptions.NoResultFound
+        old_members = []
+        for mid in old_member_ids:
+            member = self._member_repo.get(db_apis.get_session(), id=mid)
+            if member is None:
+                LOG.warning('Member %s to delete is already gone, skipping it.', mid)
+                continue
+            old_members.append(member)
+        member_updates = updated_members
+        updated_members = []
+        for m in member_updates:
+            member = self._member_repo.get(db_apis.get_session(), id=m['id'])
+            if member is None:
+                LOG.warning('Member %s to update is gone, skipping it.', m['id'])
+                continue
+            updated_members.append(
+                (member, {k: v for k, v in m.items() if k != 'id'}))
+        members = old_members + new_members + [m for m, _ in updated_members]
+        if not members:
+            return
+
+        pool = members[0].pool
+        listeners = pool.listeners
+        load_balancer = pool.load_balancer
+
+        topology = CONF.a10_controller_worker.loadbalancer_topology
+        if members[0].project_id in CONF.hardware_thunder.devices:
+            batch_update_members_tf = self._taskflow_load(
+                self._member_flows.get_rack_vthunder_batch_update_members_flow(
+                    old_members, new_members, updated_members),
+                store={constants.LISTENERS: listeners,
+                       constants.LOADBALANCER: load_balancer,
+                       constants.POOL: pool})
+        else:
+            batch_update_members_tf = self._taskflow_load(
+                self._member_flows.get_batch_update_members_flow(
+                    old_members, new_members, updated_members, topology),
+                store={constants.LISTENERS: listeners,
+                       constants.LOADBALANCER: load_balancer,
+                       constants.POOL: pool})
+
+        with tf_logging.DynamicLoggingListener(batch_update_members_tf,
+                                               log=LOG):
+            batch_update_members_tf.run()
 
     def update_member(self, member_id, member_updates):
         """Updates a pool member.
@@ -455,26 +562,21 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = pool.load_balancer
 
         if member.project_id in CONF.hardware_thunder.devices:
-            update_member_tf = self._taskflow_load(self._member_flows.
-                                                   get_rack_vthunder_update_member_flow(),
-                                                   store={constants.MEMBER: member,
-                                                          constants.LISTENERS:
-                                                              listeners,
-                                                          constants.LOADBALANCER:
-                                                              load_balancer,
-                                                          constants.POOL: pool,
-                                                          constants.UPDATE_DICT: member_updates})
+            update_member_tf = self._taskflow_load(
+                self._get_flow(self._member_flows.get_rack_vthunder_update_member_flow),
+                store={constants.MEMBER: member,
+                       constants.LISTENERS: listeners,
+                       constants.LOADBALANCER: load_balancer,
+                       constants.POOL: pool,
+                       constants.UPDATE_DICT: member_updates})
         else:
-            update_member_tf = self._taskflow_load(self._member_flows.get_update_member_flow(),
-                                                   store={constants.MEMBER: member,
-                                                          constants.LISTENERS:
-                                                          listeners,
-                                                          constants.LOADBALANCER:
-                                                          load_balancer,
-                                                          constants.POOL:
-                                                          pool,
-                                                          constants.UPDATE_DICT:
-                                                          member_updates})
+            update_member_tf = self._taskflow_load(
+                self._get_flow(self._member_flows.get_update_member_flow),
+                store={constants.MEMBER: member,
+                       constants.LISTENERS: listeners,
+                       constants.LOADBALANCER: load_balancer,
+                       constants.POOL: pool,
+                       constants.UPDATE_DICT: member_updates})
 
         with tf_logging.DynamicLoggingListener(update_member_tf,
                                                log=LOG):
@@ -505,14 +607,12 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
             default_listener = pool.listeners[0]
         load_balancer = pool.load_balancer
 
-        create_pool_tf = self._taskflow_load(self._pool_flows.
-                                             get_create_pool_flow(),
-                                             store={constants.POOL: pool,
-                                                    constants.LISTENERS:
-                                                        listeners,
-                                                    constants.LISTENER: default_listener,
-                                                    constants.LOADBALANCER:
-                                                        load_balancer})
+        create_pool_tf = self._taskflow_load(
+            self._get_flow(self._pool_flows.get_create_pool_flow),
+            store={constants.POOL: pool,
+                   constants.LISTENERS: listeners,
+                   constants.LISTENER: default_listener,
+                   constants.LOADBALANCER: load_balancer})
         with tf_logging.DynamicLoggingListener(create_pool_tf,
                                                log=LOG):
             create_pool_tf.run()
@@ -579,17 +679,13 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
             default_listener = pool.listeners[0]
         load_balancer = pool.load_balancer
 
-        update_pool_tf = self._taskflow_load(self._pool_flows.
-                                             get_update_pool_flow(),
-                                             store={constants.POOL: pool,
-                                                    constants.LISTENERS:
-                                                        listeners,
-                                                    constants.LISTENER: default_listener,
-                                                    constants.LOADBALANCER:
-                                                        load_balancer,
-
-                                                    constants.UPDATE_DICT:
-                                                        pool_updates})
+        update_pool_tf = self._taskflow_load(
+            self._get_flow(self._pool_flows.get_update_pool_flow),
+            store={constants.POOL: pool,
+                   constants.LISTENERS: listeners,
+                   constants.LISTENER: default_listener,
+                   constants.LOADBALANCER: load_balancer,
+                   constants.UPDATE_DICT: pool_updates})
         with tf_logging.DynamicLoggingListener(update_pool_tf,
                                                log=LOG):
             update_pool_tf.run()
@@ -617,7 +713,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = l7policy.listener.load_balancer
 
         create_l7policy_tf = self._taskflow_load(
-            self._l7policy_flows.get_create_l7policy_flow(),
+            self._get_flow(self._l7policy_flows.get_create_l7policy_flow),
             store={constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
                    constants.LOADBALANCER: load_balancer})
@@ -638,7 +734,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         listeners = [l7policy.listener]
 
         delete_l7policy_tf = self._taskflow_load(
-            self._l7policy_flows.get_delete_l7policy_flow(),
+            self._get_flow(self._l7policy_flows.get_delete_l7policy_flow),
             store={constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
                    constants.LOADBALANCER: load_balancer})
@@ -671,7 +767,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = l7policy.listener.load_balancer
 
         update_l7policy_tf = self._taskflow_load(
-            self._l7policy_flows.get_update_l7policy_flow(),
+            self._get_flow(self._l7policy_flows.get_update_l7policy_flow),
             store={constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
                    constants.LOADBALANCER: load_balancer,
@@ -704,7 +800,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = l7policy.listener.load_balancer
 
         create_l7rule_tf = self._taskflow_load(
-            self._l7rule_flows.get_create_l7rule_flow(),
+            self._get_flow(self._l7rule_flows.get_create_l7rule_flow),
             store={constants.L7RULE: l7rule,
                    constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
@@ -726,7 +822,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         listeners = [l7policy.listener]
 
         delete_l7rule_tf = self._taskflow_load(
-            self._l7rule_flows.get_delete_l7rule_flow(),
+            self._get_flow(self._l7rule_flows.get_delete_l7rule_flow),
             store={constants.L7RULE: l7rule,
                    constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
@@ -760,7 +856,7 @@ class A10ControllerWorker(base_taskflow.BaseTaskFlowEngine):
         load_balancer = l7policy.listener.load_balancer
 
         update_l7rule_tf = self._taskflow_load(
-            self._l7rule_flows.get_update_l7rule_flow(),
+            self._get_flow(self._l7rule_flows.get_update_l7rule_flow),
             store={constants.L7RULE: l7rule,
                    constants.L7POLICY: l7policy,
                    constants.LISTENERS: listeners,
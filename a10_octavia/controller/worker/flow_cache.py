@@ -0,0 +1,97 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Reuse of built taskflow flows between controller worker requests
+
+"""
+import collections
+import threading
+import time
+
+from oslo_log import log as logging
+from taskflow import states
+from taskflow.listeners import base as tf_listeners
+
+from a10_octavia.common import stats
+
+LOG = logging.getLogger(__name__)
+
+# Idle flows kept per flow shape, bounds the memory held by bursts
+MAX_IDLE_FLOWS = 16
+
+FINISHED_STATES = (states.SUCCESS, states.REVERTED, states.FAILURE, states.SUSPENDED)
+
+
+class FlowCache(object):
+    """Pool of built flows keyed by flow shape.
+
+    Building a flow instantiates every task of it, which is wasted work when
+    the next request of the same operation needs an identical graph. Flows
+    are checked out for the duration of one engine run, so a task instance
+    is never shared by two engines running at the same time, and are handed
+    back by a FlowCheckinListener once the engine finished.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE_FLOWS):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = collections.defaultdict(list)
+        self._checked_out = {}
+        self.build_latency = collections.defaultdict(stats.LatencyStats)
+        self.compile_latency = collections.defaultdict(stats.LatencyStats)
+        self.hits = 0
+        self.misses = 0
+
+    def checkout(self, key, get_flow):
+        """Return an idle flow of the shape `key`, or build one with get_flow()"""
+        with self._lock:
+            idle = self._idle.get(key)
+            flow = idle.pop() if idle else None
+            if flow is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if flow is None:
+            started_at = time.time()
+            flow = get_flow()
+            self.build_latency[key[0]].record(time.time() - started_at)
+        with self._lock:
+            self._checked_out[id(flow)] = (key, flow)
+        return flow
+
+    def checkin(self, flow):
+        """Make a checked out flow available again, other flows are ignored"""
+        with self._lock:
+            key, flow = self._checked_out.pop(id(flow), (None, flow))
+            if key is not None and len(self._idle[key]) < self.max_idle:
+                self._idle[key].append(flow)
+
+    def record_compile(self, flow, seconds):
+        with self._lock:
+            key, _ = self._checked_out.get(id(flow), ((flow.name,), flow))
+        self.compile_latency[key[0]].record(seconds)
+
+
+class FlowCheckinListener(tf_listeners.Listener):
+    """Hands the flow of an engine back to the FlowCache when it finished"""
+
+    def __init__(self, engine, flow_cache, flow):
+        super(FlowCheckinListener, self).__init__(
+            engine, task_listen_for=(), retry_listen_for=())
+        self.flow_cache = flow_cache
+        self.flow = flow
+
+    def _flow_receiver(self, state, details):
+        if state in FINISHED_STATES:
+            self.flow_cache.checkin(self.flow)
@@ -174,19 +174,37 @@ class ListenerFlows(object):
         return create_ssl_cert_flow
 
     def get_ssl_certificate_delete_flow(self):
-        delete_ssl_cert_flow = linear_flow.Flow(
-            a10constants.DELETE_SSL_CERT_FLOW)
-        delete_ssl_cert_flow.add(cert_tasks.GetSSLCertData(
+        """Delete the SSL objects once no other listener of the vThunder uses them"""
+        delete_ssl_cert_subflow = linear_flow.Flow(
+            a10constants.DELETE_SSL_CERT_SUBFLOW)
+        delete_ssl_cert_subflow.add(cert_tasks.GetSSLCertData(
             requires=[constants.LOADBALANCER, constants.LISTENER],
             provides=a10constants.CERT_DATA))
-        delete_ssl_cert_flow.add(cert_tasks.ClientSSLTemplateDelete(
+        delete_ssl_cert_subflow.add(cert_tasks.ClientSSLTemplateDelete(
             requires=[a10constants.CERT_DATA, a10constants.VTHUNDER]))
-        delete_ssl_cert_flow.add(cert_tasks.SSLCertDelete(
+        delete_ssl_cert_subflow.add(cert_tasks.SSLCertDelete(
             requires=[a10constants.CERT_DATA, a10constants.VTHUNDER]))
-        delete_ssl_cert_flow.add(cert_tasks.SSLKeyDelete(
+        delete_ssl_cert_subflow.add(cert_tasks.SSLKeyDelete(
             requires=[a10constants.CERT_DATA, a10constants.VTHUNDER]))
+
+        delete_ssl_cert_flow = graph_flow.Flow(
+            a10constants.DELETE_SSL_CERT_FLOW)
+        count_listeners = a10_database_tasks.CountListenersWithCertificate(
+            requires=[constants.LISTENER, a10constants.VTHUNDER],
+            provides=a10constants.SSL_CERT_USAGE_COUNT)
+        # Not gated on the usage count, the template is the listener's own
+        delete_listener_template = cert_tasks.ListenerClientSSLTemplateDelete(
+            requires=[a10constants.VTHUNDER, constants.LISTENER])
+        delete_ssl_cert_flow.add(count_listeners, delete_ssl_cert_subflow,
+                                 delete_listener_template)
+        delete_ssl_cert_flow.link(count_listeners, delete_ssl_cert_subflow,
+                                  decider=self._check_ssl_cert_unused,
+                                  decider_depth='flow')
         return delete_ssl_cert_flow
 
+    def _check_ssl_cert_unused(self, history):
+        return list(history.values())[0] == 0
+
     def get_ssl_certificate_update_flow(self):
         update_ssl_cert_flow = linear_flow.Flow(
             a10constants.DELETE_SSL_CERT_FLOW)
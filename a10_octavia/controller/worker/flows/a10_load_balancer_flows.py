@@ -217,35 +217,44 @@ class LoadBalancerFlows(object):
         new_LB_net_subflow.add(database_tasks.GetAmphoraeFromLoadbalancer(
             requires=constants.LOADBALANCER,
             provides=constants.AMPHORA))
-        new_LB_net_subflow.add(
+        master_net_subflow = linear_flow.Flow(a10constants.MASTER_LB_NETWORKING_SUBFLOW)
+        master_net_subflow.add(
             vthunder_tasks.VThunderComputeConnectivityWait(
                 name=a10constants.MASTER_CONNECTIVITY_WAIT,
                 requires=(a10constants.VTHUNDER, constants.AMPHORA)))
-        new_LB_net_subflow.add(vthunder_tasks.EnableInterface(
+        master_net_subflow.add(vthunder_tasks.EnableInterface(
             requires=a10constants.VTHUNDER))
-        new_LB_net_subflow.add(a10_database_tasks.MarkVThunderStatusInDB(
+        master_net_subflow.add(a10_database_tasks.MarkVThunderStatusInDB(
             name=a10constants.MARK_VTHUNDER_MASTER_ACTIVE_IN_DB,
             requires=a10constants.VTHUNDER,
             inject={a10constants.STATUS: constants.ACTIVE}))
-        if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
-            new_LB_net_subflow.add(vthunder_tasks.CreateHealthMonitorOnVThunder(
-                name=a10constants.CREATE_HEALTH_MONITOR_ON_VTHUNDER_MASTER,
-                requires=a10constants.VTHUNDER))
-            new_LB_net_subflow.add(a10_database_tasks.GetBackupVThunderByLoadBalancer(
-                name=a10constants.GET_BACKUP_VTHUNDER_BY_LB,
-                requires=constants.LOADBALANCER,
-                provides=a10constants.BACKUP_VTHUNDER))
-            new_LB_net_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-                name=a10constants.BACKUP_CONNECTIVITY_WAIT,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
-                requires=constants.AMPHORA))
-            new_LB_net_subflow.add(vthunder_tasks.EnableInterface(
-                name=a10constants.BACKUP_ENABLE_INTERFACE,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
-            new_LB_net_subflow.add(a10_database_tasks.MarkVThunderStatusInDB(
-                name=a10constants.MARK_VTHUNDER_BACKUP_ACTIVE_IN_DB,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
-                inject={a10constants.STATUS: constants.ACTIVE}))
+        if topology != constants.TOPOLOGY_ACTIVE_STANDBY:
+            new_LB_net_subflow.add(master_net_subflow)
+            return new_LB_net_subflow
+
+        master_net_subflow.add(vthunder_tasks.CreateHealthMonitorOnVThunder(
+            name=a10constants.CREATE_HEALTH_MONITOR_ON_VTHUNDER_MASTER,
+            requires=a10constants.VTHUNDER))
+        # The backup vThunder is brought up concurrently with the master
+        backup_net_subflow = linear_flow.Flow(a10constants.BACKUP_LB_NETWORKING_SUBFLOW)
+        backup_net_subflow.add(a10_database_tasks.GetBackupVThunderByLoadBalancer(
+            name=a10constants.GET_BACKUP_VTHUNDER_BY_LB,
+            requires=constants.LOADBALANCER,
+            provides=a10constants.BACKUP_VTHUNDER))
+        backup_net_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+            name=a10constants.BACKUP_CONNECTIVITY_WAIT,
+            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
+            requires=constants.AMPHORA))
+        backup_net_subflow.add(vthunder_tasks.EnableInterface(
+            name=a10constants.BACKUP_ENABLE_INTERFACE,
+            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        backup_net_subflow.add(a10_database_tasks.MarkVThunderStatusInDB(
+            name=a10constants.MARK_VTHUNDER_BACKUP_ACTIVE_IN_DB,
+            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
+            inject={a10constants.STATUS: constants.ACTIVE}))
+        new_LB_net_subflow.add(
+            unordered_flow.Flow(a10constants.UNORDERED_LB_NETWORKING_FLOW).add(
+                master_net_subflow, backup_net_subflow))
         return new_LB_net_subflow
 
     def get_update_load_balancer_flow(self):
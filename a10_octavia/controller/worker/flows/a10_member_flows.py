@@ -12,9 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 
 from oslo_config import cfg
 from taskflow.patterns import linear_flow
+from taskflow.patterns import unordered_flow
 
 from octavia.common import constants
 from octavia.controller.worker.tasks import database_tasks
@@ -45,45 +47,10 @@ class MemberFlows(object):
                       constants.POOL]))
         create_member_flow.add(database_tasks.MarkMemberPendingCreateInDB(
             requires=constants.MEMBER))
-        create_member_flow.add(a10_network_tasks.CalculateDelta(
-            requires=constants.LOADBALANCER,
-            provides=constants.DELTAS))
-        create_member_flow.add(a10_network_tasks.HandleNetworkDeltas(
-            requires=constants.DELTAS, provides=constants.ADDED_PORTS))
-        create_member_flow.add(database_tasks.GetAmphoraeFromLoadbalancer(
-            requires=constants.LOADBALANCER,
-            provides=constants.AMPHORA))
         create_member_flow.add(a10_database_tasks.GetVThunderByLoadBalancer(
             requires=constants.LOADBALANCER,
             provides=a10constants.VTHUNDER))
-        # managing interface additions here
-        create_member_flow.add(vthunder_tasks.AmphoraePostMemberNetworkPlug(
-            requires=(constants.LOADBALANCER, constants.ADDED_PORTS, a10constants.VTHUNDER)))
-        create_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
-        create_member_flow.add(vthunder_tasks.EnableInterfaceForMembers(
-            requires=[constants.ADDED_PORTS, constants.LOADBALANCER, a10constants.VTHUNDER]))
-        # configure member flow for HA
-        if topology == constants.TOPOLOGY_ACTIVE_STANDBY:
-            create_member_flow.add(a10_database_tasks.GetBackupVThunderByLoadBalancer(
-                name="get_backup_vThunder",
-                requires=constants.LOADBALANCER,
-                provides=a10constants.BACKUP_VTHUNDER))
-            create_member_flow.add(
-                vthunder_tasks.AmphoraePostMemberNetworkPlug(
-                    name="backup_amphora_network_plug",
-                    requires=[constants.ADDED_PORTS, constants.LOADBALANCER],
-                    rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
-            create_member_flow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-                name="backup_compute_conn_wait",
-                requires=constants.AMPHORA,
-                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
-            create_member_flow.add(
-                vthunder_tasks.EnableInterfaceForMembers(
-                    name="backup_enable_interface",
-                    requires=[constants.ADDED_PORTS, constants.LOADBALANCER],
-                    rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
-
+        create_member_flow.add(self.get_member_network_plug_subflow(topology))
         create_member_flow.add(server_tasks.MemberCreate(
             requires=(constants.MEMBER, a10constants.VTHUNDER, constants.POOL)))
         create_member_flow.add(database_tasks.MarkMemberActiveInDB(
@@ -98,6 +65,67 @@ class MemberFlows(object):
             requires=a10constants.VTHUNDER))
         return create_member_flow
 
+    def get_member_network_plug_subflow(self, topology):
+        """Plug the networks of new members into the vThunders of the loadbalancer
+
+        In ACTIVE_STANDBY topology the vThunders are rebooted one after the
+        other, backup first, so the pair never goes down at once. Only the
+        interfaces are then enabled concurrently when the flow runs on a
+        parallel engine.
+        """
+        network_plug_subflow = linear_flow.Flow(a10constants.MEMBER_NETWORK_PLUG_SUBFLOW)
+        network_plug_subflow.add(a10_network_tasks.CalculateDelta(
+            requires=constants.LOADBALANCER,
+            provides=constants.DELTAS))
+        network_plug_subflow.add(a10_network_tasks.HandleNetworkDeltas(
+            requires=constants.DELTAS, provides=constants.ADDED_PORTS))
+        network_plug_subflow.add(database_tasks.GetAmphoraeFromLoadbalancer(
+            requires=constants.LOADBALANCER,
+            provides=constants.AMPHORA))
+
+        # managing interface additions here
+        master_plug_subflow = linear_flow.Flow(a10constants.MASTER_MEMBER_NETWORK_PLUG_SUBFLOW)
+        master_plug_subflow.add(vthunder_tasks.EnableInterfaceForMembers(
+            requires=[constants.ADDED_PORTS, constants.LOADBALANCER, a10constants.VTHUNDER]))
+        if topology != constants.TOPOLOGY_ACTIVE_STANDBY:
+            network_plug_subflow.add(vthunder_tasks.AmphoraePostMemberNetworkPlug(
+                requires=(constants.LOADBALANCER, constants.ADDED_PORTS,
+                          a10constants.VTHUNDER)))
+            network_plug_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+                requires=(a10constants.VTHUNDER, constants.AMPHORA)))
+            network_plug_subflow.add(master_plug_subflow)
+            return network_plug_subflow
+
+        # configure member flow for HA
+        network_plug_subflow.add(a10_database_tasks.GetBackupVThunderByLoadBalancer(
+            name="get_backup_vThunder",
+            requires=constants.LOADBALANCER,
+            provides=a10constants.BACKUP_VTHUNDER))
+        network_plug_subflow.add(
+            vthunder_tasks.AmphoraePostMemberNetworkPlug(
+                name="backup_amphora_network_plug",
+                requires=[constants.ADDED_PORTS, constants.LOADBALANCER],
+                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        network_plug_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+            name="backup_compute_conn_wait",
+            requires=constants.AMPHORA,
+            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        network_plug_subflow.add(vthunder_tasks.AmphoraePostMemberNetworkPlug(
+            requires=(constants.LOADBALANCER, constants.ADDED_PORTS, a10constants.VTHUNDER)))
+        network_plug_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
+            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
+
+        backup_plug_subflow = linear_flow.Flow(a10constants.BACKUP_MEMBER_NETWORK_PLUG_SUBFLOW)
+        backup_plug_subflow.add(
+            vthunder_tasks.EnableInterfaceForMembers(
+                name="backup_enable_interface",
+                requires=[constants.ADDED_PORTS, constants.LOADBALANCER],
+                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        network_plug_subflow.add(
+            unordered_flow.Flow(a10constants.UNORDERED_MEMBER_NETWORK_PLUG_FLOW).add(
+                master_plug_subflow, backup_plug_subflow))
+        return network_plug_subflow
+
     def get_delete_member_flow(self):
         """Flow to delete a member on VThunder
 
@@ -351,3 +379,188 @@ class MemberFlows(object):
         create_member_flow.add(vthunder_tasks.WriteMemory(
             requires=a10constants.VTHUNDER))
         return create_member_flow
+
+    def get_batch_update_members_flow(self, old_members, new_members, updated_members,
+                                      topology):
+        """Flow to delete, create and update the members of a pool at once
+
+        :param updated_members: list of (member, update_dict) tuples
+        :returns: The flow for batch updating members
+        """
+        batch_update_members_flow = linear_flow.Flow(constants.BATCH_UPDATE_MEMBERS_FLOW)
+        batch_update_members_flow.add(
+            self._get_batch_member_prepare_subflow(old_members, new_members, updated_members))
+        if new_members:
+            batch_update_members_flow.add(self.get_member_network_plug_subflow(topology))
+        batch_update_members_flow.add(
+            self.get_batch_member_device_subflow(old_members, new_members, updated_members))
+        batch_update_members_flow.add(
+            self._get_batch_member_db_subflow(old_members, new_members, updated_members))
+        return batch_update_members_flow
+
+    def get_rack_vthunder_batch_update_members_flow(self, old_members, new_members,
+                                                    updated_members):
+        """Flow to delete, create and update the members of a pool in Thunder devices
+
+        VRID and VLAN settings are evaluated once per batch and member subnet
+        rather than once per member.
+
+        :param updated_members: list of (member, update_dict) tuples
+        :returns: The flow for batch updating members
+        """
+        batch_update_members_flow = linear_flow.Flow(constants.BATCH_UPDATE_MEMBERS_FLOW)
+        batch_update_members_flow.add(
+            self._get_batch_member_prepare_subflow(old_members, new_members, updated_members))
+        batch_update_members_flow.add(vthunder_tasks.SetupDeviceNetworkMap(
+            requires=a10constants.VTHUNDER,
+            provides=a10constants.VTHUNDER))
+
+        remaining_members = new_members + [m for m, _ in updated_members]
+        remaining_subnets = _members_by_subnet(remaining_members)
+        if remaining_members:
+            # The VRID is shared by the project, it ends up in the subnet of
+            # the last member just like with one flow per member
+            batch_update_members_flow.add(
+                self.get_batch_member_vrid_subflow(remaining_members[-1]))
+        if CONF.a10_global.network_type == 'vlan':
+            for subnet_id, member in remaining_subnets.items():
+                batch_update_members_flow.add(vthunder_tasks.TagInterfaceForMember(
+                    name='{task}-{subnet}'.format(
+                        task=a10constants.TAG_INTERFACE_FOR_MEMBER, subnet=subnet_id),
+                    requires=a10constants.VTHUNDER,
+                    inject={constants.MEMBER: member}))
+
+        batch_update_members_flow.add(
+            self.get_batch_member_device_subflow(old_members, new_members, updated_members))
+
+        if CONF.a10_global.network_type == 'vlan':
+            for subnet_id, member in _members_by_subnet(old_members).items():
+                if subnet_id in remaining_subnets:
+                    continue
+                batch_update_members_flow.add(
+                    vthunder_tasks.DeleteInterfaceTagIfNotInUseForMember(
+                        name='{task}-{subnet}'.format(
+                            task=a10constants.DELETE_INTERFACE_TAG_FOR_MEMBER,
+                            subnet=subnet_id),
+                        requires=a10constants.VTHUNDER,
+                        inject={constants.MEMBER: member}))
+        if old_members and not remaining_members:
+            batch_update_members_flow.add(
+                self.get_batch_delete_member_vrid_subflow(old_members))
+
+        batch_update_members_flow.add(
+            self._get_batch_member_db_subflow(old_members, new_members, updated_members))
+        return batch_update_members_flow
+
+    def _get_batch_member_prepare_subflow(self, old_members, new_members, updated_members):
+        prepare_subflow = linear_flow.Flow(a10constants.BATCH_MEMBER_PREPARE_SUBFLOW)
+        prepare_subflow.add(lifecycle_tasks.MembersToErrorOnRevertTask(
+            requires=[constants.LISTENERS,
+                      constants.LOADBALANCER,
+                      constants.POOL],
+            inject={constants.MEMBERS: (old_members + new_members +
+                                        [m for m, _ in updated_members])}))
+        for member in old_members:
+            prepare_subflow.add(model_tasks.DeleteModelObject(
+                name='{flow}-{id}'.format(
+                    flow=constants.DELETE_MODEL_OBJECT_FLOW, id=member.id),
+                inject={constants.OBJECT: member}))
+        prepare_subflow.add(a10_database_tasks.GetVThunderByLoadBalancer(
+            requires=constants.LOADBALANCER,
+            provides=a10constants.VTHUNDER))
+        return prepare_subflow
+
+    def get_batch_member_vrid_subflow(self, member):
+        """Handle the project VRID floating IP once for a batch of members"""
+        batch_member_vrid_subflow = linear_flow.Flow(a10constants.HANDLE_VRID_MEMBER_SUBFLOW)
+        batch_member_vrid_subflow.add(a10_database_tasks.GetVRIDForProjectMember(
+            provides=a10constants.VRID,
+            inject={constants.MEMBER: member}))
+        batch_member_vrid_subflow.add(a10_network_tasks.HandleVRIDFloatingIP(
+            requires=[a10constants.VTHUNDER, a10constants.VRID],
+            provides=a10constants.PORT,
+            inject={constants.MEMBER: member}))
+        batch_member_vrid_subflow.add(a10_database_tasks.UpdateVRIDForProjectMember(
+            requires=[a10constants.VRID, a10constants.PORT],
+            inject={constants.MEMBER: member}))
+        return batch_member_vrid_subflow
+
+    def get_batch_delete_member_vrid_subflow(self, old_members):
+        """Release the project VRID when a batch deletes its last members"""
+        delete_member_vrid_subflow = linear_flow.Flow(
+            a10constants.DELETE_MEMBER_VRID_SUBFLOW)
+        delete_member_vrid_subflow.add(a10_database_tasks.CountMembersInProject(
+            provides=a10constants.MEMBER_COUNT,
+            inject={constants.MEMBER: old_members[0]}))
+        delete_member_vrid_subflow.add(a10_database_tasks.GetVRIDForProjectMember(
+            provides=a10constants.VRID,
+            inject={constants.MEMBER: old_members[0]}))
+        delete_member_vrid_subflow.add(a10_network_tasks.DeleteMemberVRIDPort(
+            requires=[a10constants.VTHUNDER, a10constants.VRID, a10constants.MEMBER_COUNT],
+            provides=a10constants.DELETE_VRID,
+            inject={a10constants.DELETED_MEMBERS: len(old_members)}))
+        delete_member_vrid_subflow.add(a10_database_tasks.DeleteVRIDEntry(
+            requires=[a10constants.VRID, a10constants.DELETE_VRID]))
+        return delete_member_vrid_subflow
+
+    def get_batch_member_device_subflow(self, old_members, new_members, updated_members):
+        """Configure every member of a batch on the vThunder, in no particular order"""
+        member_device_subflow = unordered_flow.Flow(a10constants.UNORDERED_MEMBER_DEVICE_FLOW)
+        for member in old_members:
+            member_device_subflow.add(server_tasks.MemberDelete(
+                name='{task}-{id}'.format(task=a10constants.MEMBER_DELETE, id=member.id),
+                requires=(a10constants.VTHUNDER, constants.POOL),
+                inject={constants.MEMBER: member}))
+        for member in new_members:
+            member_device_subflow.add(server_tasks.MemberCreate(
+                name='{task}-{id}'.format(task=a10constants.MEMBER_CREATE, id=member.id),
+                requires=(a10constants.VTHUNDER, constants.POOL),
+                inject={constants.MEMBER: member}))
+        for member, _ in updated_members:
+            member_device_subflow.add(server_tasks.MemberUpdate(
+                name='{task}-{id}'.format(task=a10constants.MEMBER_UPDATE, id=member.id),
+                requires=a10constants.VTHUNDER,
+                inject={constants.MEMBER: member}))
+        return member_device_subflow
+
+    def _get_batch_member_db_subflow(self, old_members, new_members, updated_members):
+        member_db_subflow = linear_flow.Flow(a10constants.BATCH_MEMBER_COMPLETE_SUBFLOW)
+        unordered_members_flow = unordered_flow.Flow(constants.UNORDERED_MEMBER_UPDATES_FLOW)
+        for member in old_members:
+            unordered_members_flow.add(database_tasks.DeleteMemberInDB(
+                name='{flow}-{id}'.format(flow=constants.DELETE_MEMBER_INDB, id=member.id),
+                inject={constants.MEMBER: member}))
+            unordered_members_flow.add(database_tasks.DecrementMemberQuota(
+                name='{flow}-{id}'.format(
+                    flow=constants.DECREMENT_MEMBER_QUOTA_FLOW, id=member.id),
+                inject={constants.MEMBER: member}))
+        for member in new_members:
+            unordered_members_flow.add(database_tasks.MarkMemberActiveInDB(
+                name='{flow}-{id}'.format(flow=constants.MARK_MEMBER_ACTIVE_INDB, id=member.id),
+                inject={constants.MEMBER: member}))
+        for member, member_updates in updated_members:
+            member_db_subflow.add(database_tasks.UpdateMemberInDB(
+                name='{flow}-{id}'.format(flow=constants.UPDATE_MEMBER_INDB, id=member.id),
+                inject={constants.MEMBER: member, constants.UPDATE_DICT: member_updates}))
+            unordered_members_flow.add(database_tasks.MarkMemberActiveInDB(
+                name='{flow}-{id}'.format(flow=constants.MARK_MEMBER_ACTIVE_INDB, id=member.id),
+                inject={constants.MEMBER: member}))
+        member_db_subflow.add(unordered_members_flow)
+        member_db_subflow.add(database_tasks.MarkPoolActiveInDB(
+            requires=constants.POOL))
+        member_db_subflow.add(database_tasks.
+                              MarkLBAndListenersActiveInDB(
+                                  requires=[constants.LOADBALANCER,
+                                            constants.LISTENERS]))
+        member_db_subflow.add(vthunder_tasks.WriteMemory(
+            requires=a10constants.VTHUNDER))
+        return member_db_subflow
+
+
+def _members_by_subnet(members):
+    """Map each member subnet to the first member in it"""
+    subnets = collections.OrderedDict()
+    for member in members:
+        if member.subnet_id:
+            subnets.setdefault(member.subnet_id, member)
+    return subnets
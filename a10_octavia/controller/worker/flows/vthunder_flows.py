@@ -17,6 +17,7 @@ import logging
 from oslo_config import cfg
 from taskflow.patterns import graph_flow
 from taskflow.patterns import linear_flow
+from taskflow.patterns import unordered_flow
 
 from octavia.common import constants
 from octavia.controller.worker.tasks import database_tasks
@@ -278,21 +279,25 @@ class VThunderFlows(object):
         sf_name = prefix + '-' + constants.GET_VRRP_SUBFLOW
         vrrp_subflow = linear_flow.Flow(sf_name)
         # TODO(omkartelee01) Need HA variables here
-        vrrp_subflow.add(a10_database_tasks.GetVThunderByLoadBalancer(
-            name=sf_name + '-' + a10constants.GET_LOADBALANCER_FROM_DB,
-            requires=constants.LOADBALANCER,
-            provides=a10constants.VTHUNDER))
-        vrrp_subflow.add(a10_database_tasks.GetBackupVThunderByLoadBalancer(
-            name=sf_name + '-' + a10constants.GET_BACKUP_LOADBALANCER_FROM_DB,
-            requires=constants.LOADBALANCER,
-            provides=a10constants.BACKUP_VTHUNDER))
+        vrrp_subflow.add(unordered_flow.Flow(
+            sf_name + '-' + a10constants.UNORDERED_GET_VTHUNDERS_FLOW).add(
+            a10_database_tasks.GetVThunderByLoadBalancer(
+                name=sf_name + '-' + a10constants.GET_LOADBALANCER_FROM_DB,
+                requires=constants.LOADBALANCER,
+                provides=a10constants.VTHUNDER),
+            a10_database_tasks.GetBackupVThunderByLoadBalancer(
+                name=sf_name + '-' + a10constants.GET_BACKUP_LOADBALANCER_FROM_DB,
+                requires=constants.LOADBALANCER,
+                provides=a10constants.BACKUP_VTHUNDER)))
         # VRRP Configuration
-        vrrp_subflow.add(vthunder_tasks.ConfigureVRRPMaster(
-            name=sf_name + '-' + a10constants.CONFIGURE_VRRP_FOR_MASTER_VTHUNDER,
-            requires=(a10constants.VTHUNDER)))
-        vrrp_subflow.add(vthunder_tasks.ConfigureVRRPBackup(
-            name=sf_name + '-' + a10constants.CONFIGURE_VRRP_FOR_BACKUP_VTHUNDER,
-            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        vrrp_subflow.add(unordered_flow.Flow(
+            sf_name + '-' + a10constants.UNORDERED_CONFIGURE_VRRP_FLOW).add(
+            vthunder_tasks.ConfigureVRRPMaster(
+                name=sf_name + '-' + a10constants.CONFIGURE_VRRP_FOR_MASTER_VTHUNDER,
+                requires=(a10constants.VTHUNDER)),
+            vthunder_tasks.ConfigureVRRPBackup(
+                name=sf_name + '-' + a10constants.CONFIGURE_VRRP_FOR_BACKUP_VTHUNDER,
+                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER})))
         vrrp_subflow.add(self._get_vrrp_status_subflow(sf_name))
 
         return vrrp_subflow
@@ -320,25 +325,29 @@ class VThunderFlows(object):
     def _configure_vrrp_subflow(self, sf_name):
         configure_vrrp_subflow = linear_flow.Flow(sf_name)
         # VRID Configuration
-        configure_vrrp_subflow.add(vthunder_tasks.ConfigureVRID(
-            name=sf_name + '-' + a10constants.CONFIGURE_VRID_FOR_MASTER_VTHUNDER,
-            requires=(a10constants.VTHUNDER)))
-        configure_vrrp_subflow.add(vthunder_tasks.ConfigureVRID(
-            name=sf_name + '-' + a10constants.CONFIGURE_VRID_FOR_BACKUP_VTHUNDER,
-            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER}))
+        configure_vrrp_subflow.add(unordered_flow.Flow(
+            sf_name + '-' + a10constants.UNORDERED_CONFIGURE_VRID_FLOW).add(
+            vthunder_tasks.ConfigureVRID(
+                name=sf_name + '-' + a10constants.CONFIGURE_VRID_FOR_MASTER_VTHUNDER,
+                requires=(a10constants.VTHUNDER)),
+            vthunder_tasks.ConfigureVRID(
+                name=sf_name + '-' + a10constants.CONFIGURE_VRID_FOR_BACKUP_VTHUNDER,
+                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER})))
         # VRRP synch
         configure_vrrp_subflow.add(vthunder_tasks.ConfigureVRRPSync(
             name=sf_name + '-' + a10constants.CONFIGURE_VRRP_SYNC,
             requires=(a10constants.VTHUNDER, a10constants.BACKUP_VTHUNDER)))
         # Wait for VRRP synch
-        configure_vrrp_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=sf_name + '-' + a10constants.WAIT_FOR_MASTER_SYNC,
-            requires=(a10constants.VTHUNDER, constants.AMPHORA)))
-        configure_vrrp_subflow.add(vthunder_tasks.VThunderComputeConnectivityWait(
-            name=sf_name + '-' + a10constants.WAIT_FOR_BACKUP_SYNC,
-            rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
-            requires=(constants.AMPHORA)))
-        # Configure aVCS
+        configure_vrrp_subflow.add(unordered_flow.Flow(
+            sf_name + '-' + a10constants.UNORDERED_WAIT_FOR_SYNC_FLOW).add(
+            vthunder_tasks.VThunderComputeConnectivityWait(
+                name=sf_name + '-' + a10constants.WAIT_FOR_MASTER_SYNC,
+                requires=(a10constants.VTHUNDER, constants.AMPHORA)),
+            vthunder_tasks.VThunderComputeConnectivityWait(
+                name=sf_name + '-' + a10constants.WAIT_FOR_BACKUP_SYNC,
+                rebind={a10constants.VTHUNDER: a10constants.BACKUP_VTHUNDER},
+                requires=(constants.AMPHORA))))
+        # Configure aVCS, the backup joins the cluster of the master
         configure_vrrp_subflow.add(vthunder_tasks.ConfigureaVCSMaster(
             name=sf_name + '-' + a10constants.CONFIGURE_AVCS_SYNC_FOR_MASTER,
             requires=(a10constants.VTHUNDER)))
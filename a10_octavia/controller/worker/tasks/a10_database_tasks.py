@@ -46,7 +46,7 @@ class BaseDatabaseTask(task.Task):
         self.member_repo = a10_repo.MemberRepository()
         self.loadbalancer_repo = repo.LoadBalancerRepository()
         self.vip_repo = repo.VipRepository()
-        self.listener_repo = repo.ListenerRepository()
+        self.listener_repo = a10_repo.ListenerRepository()
         super(BaseDatabaseTask, self).__init__(**kwargs)
 
 
@@ -357,6 +357,20 @@ class CountMembersInProject(BaseDatabaseTask):
             raise e
 
 
+class CountListenersWithCertificate(BaseDatabaseTask):
+    """Count the other listeners sharing the listener SSL objects on the vThunder"""
+
+    def execute(self, listener, vthunder):
+        try:
+            return self.listener_repo.get_certificate_usage_count(
+                db_apis.get_session(), listener.id, listener.tls_certificate_id,
+                vthunder.ip_address, vthunder.partition_name)
+        except Exception as e:
+            LOG.exception("Failed to count listeners using certificate %s: %s",
+                          listener.tls_certificate_id, str(e))
+            raise e
+
+
 class DeleteVRIDEntry(BaseDatabaseTask):
     def execute(self, vrid, delete_vrid):
         if vrid and delete_vrid:
@@ -372,25 +386,11 @@ class CheckVLANCanBeDeletedParent(object):
     """ Checks all vip and member subnet_ids for project ID"""
 
     def is_vlan_deletable(self, project_id, subnet_id, is_vip):
-        if project_id not in CONF.rack_vthunder.devices:
+        if project_id not in CONF.hardware_thunder.devices:
             return False
 
-        subnet_usage_count = 0
-
-        lbs = db_apis.get_session().query(self.loadbalancer_repo.model_class).filter(
-            self.loadbalancer_repo.model_class.project_id == project_id).all()
-        for lb in lbs:
-            vips = db_apis.get_session().query(self.vip_repo.model_class).filter(
-                self.vip_repo.model_class.load_balancer_id == lb.id).all()
-            for vip in vips:
-                if vip.subnet_id == subnet_id:
-                    subnet_usage_count += 1
-
-        members = db_apis.get_session().query(self.member_repo.model_class).filter(
-            self.member_repo.model_class.project_id == project_id).all()
-        for member in members:
-            if member.subnet_id == subnet_id:
-                subnet_usage_count += 1
+        subnet_usage_count = self.member_repo.get_subnet_usage_count(
+            db_apis.get_session(), project_id, subnet_id)
 
         if is_vip and subnet_usage_count == 1:
             return True
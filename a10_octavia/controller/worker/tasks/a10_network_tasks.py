@@ -676,6 +676,7 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
 
     @axapi_client_decorator
     def execute(self, vthunder, member, vrid):
+        self.fip_port = None
         device_vrid_ip = None
         if vrid:
             device_vrid_ip = vrid.vrid_floating_ip
@@ -765,11 +766,11 @@ class HandleVRIDFloatingIP(BaseNetworkTask):
 
 
 class DeleteMemberVRIDPort(BaseNetworkTask):
-    """Delete VRID Port if the last member associated with it is deleted
+    """Delete VRID Port if the last members associated with it are deleted
     """
     @axapi_client_decorator
-    def execute(self, vthunder, vrid, member_count):
-        if vrid and member_count == 1:
+    def execute(self, vthunder, vrid, member_count, deleted_members=1):
+        if vrid and member_count == deleted_members:
             try:
                 self.network_driver.delete_port(vrid.vrid_port_id)
                 self.axapi_client.vrrpa.delete(vrid.vrid)
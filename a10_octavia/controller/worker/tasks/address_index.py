@@ -0,0 +1,165 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Index of the server and virtual server addresses configured on Thunder devices
+
+"""
+import bisect
+import socket
+import struct
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+SERVER = 'server'
+VIRTUAL_SERVER = 'virtual-server'
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _int_ip(ip):
+    try:
+        return struct.unpack('>L', socket.inet_aton(ip))[0]
+    except (socket.error, TypeError):
+        # Not an IPv4 address, never inside a VLAN subnet
+        return None
+
+
+def _index_key(vthunder):
+    return (vthunder.ip_address, vthunder.partition_name or "shared")
+
+
+class _PartitionAddresses(object):
+
+    def __init__(self, servers, virtual_servers):
+        self.loaded_at = time.time()
+        self.names = {SERVER: {}, VIRTUAL_SERVER: {}}
+        self.sorted_ips = []
+        for name, ip in servers:
+            self.add(SERVER, name, ip)
+        for name, ip in virtual_servers:
+            self.add(VIRTUAL_SERVER, name, ip)
+
+    def add(self, kind, name, ip):
+        self.remove(kind, name)
+        int_ip = _int_ip(ip)
+        if int_ip is not None:
+            self.names[kind][name] = int_ip
+            bisect.insort(self.sorted_ips, int_ip)
+
+    def remove(self, kind, name):
+        int_ip = self.names[kind].pop(name, None)
+        if int_ip is not None:
+            del self.sorted_ips[bisect.bisect_left(self.sorted_ips, int_ip)]
+
+    def has_address_in(self, subnet_ip, netmask):
+        int_netmask = _int_ip(netmask)
+        first = _int_ip(subnet_ip) & int_netmask
+        last = first | (~int_netmask & 0xFFFFFFFF)
+        position = bisect.bisect_left(self.sorted_ips, first)
+        return position < len(self.sorted_ips) and self.sorted_ips[position] <= last
+
+
+class AddressIndex(object):
+    """Sorted IPv4 addresses of the servers and virtual servers of a device partition.
+
+    A partition is loaded from one listing of its servers and virtual
+    servers the first time it is looked up, then kept up to date by the
+    tasks creating and deleting them. Loaded partitions are reloaded after
+    `ttl` seconds, to pick up changes made outside of this process, or on
+    demand with refresh().
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._partitions = {}
+
+    def refresh(self, axapi_client, vthunder):
+        """Reload the addresses of the vThunder partition from the device"""
+        server_list = axapi_client.slb.server.get(name="") or {}
+        vs_list = axapi_client.slb.virtual_server.get(name="") or {}
+        addresses = _PartitionAddresses(
+            [(server.get('name'), server.get('host'))
+             for server in server_list.get('server-list', [])],
+            [(vs.get('name'), vs.get('ip-address'))
+             for vs in vs_list.get('virtual-server-list', [])])
+        with self._lock:
+            self._partitions[_index_key(vthunder)] = addresses
+        return addresses
+
+    def _get(self, axapi_client, vthunder):
+        with self._lock:
+            addresses = self._partitions.get(_index_key(vthunder))
+        if addresses is None or time.time() - addresses.loaded_at > self.ttl:
+            addresses = self.refresh(axapi_client, vthunder)
+        return addresses
+
+    def has_address_in(self, axapi_client, vthunder, subnet_ip, netmask):
+        """Whether a server or virtual server of the partition is in the subnet"""
+        addresses = self._get(axapi_client, vthunder)
+        with self._lock:
+            return addresses.has_address_in(subnet_ip, netmask)
+
+    def is_subnet_free(self, axapi_client, vthunder, subnet_ip, netmask):
+        """Whether no server or virtual server of the partition is in the subnet.
+
+        Other workers and controllers do not update this index, so only an
+        address found in the subnet is trusted. A free subnet is confirmed
+        by reloading the partition.
+        """
+        with self._lock:
+            addresses = self._partitions.get(_index_key(vthunder))
+            if (addresses is not None and time.time() - addresses.loaded_at <= self.ttl and
+                    addresses.has_address_in(subnet_ip, netmask)):
+                return False
+        addresses = self.refresh(axapi_client, vthunder)
+        with self._lock:
+            return not addresses.has_address_in(subnet_ip, netmask)
+
+    def add(self, vthunder, kind, name, ip):
+        """Record a server or virtual server created on a loaded partition"""
+        with self._lock:
+            addresses = self._partitions.get(_index_key(vthunder))
+            if addresses is not None:
+                addresses.add(kind, name, ip)
+
+    def remove(self, vthunder, kind, name):
+        with self._lock:
+            addresses = self._partitions.get(_index_key(vthunder))
+            if addresses is not None:
+                addresses.remove(kind, name)
+
+    def invalidate(self, vthunder=None):
+        """Forget the vThunder partition, or every partition"""
+        with self._lock:
+            if vthunder is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop(_index_key(vthunder), None)
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AddressIndex(CONF.a10_controller_worker.address_index_ttl)
+        return _index
@@ -0,0 +1,176 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Sync of compiled L7 policy aFlex scripts and their vport bindings to Thunder devices
+
+"""
+import threading
+import time
+
+import acos_client.errors as acos_errors
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from a10_octavia.controller.worker.tasks import cert_sync
+from a10_octavia.controller.worker.tasks import policy
+from a10_octavia.controller.worker.tasks import utils
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+AFLEX = 'aflex'
+
+_uploads = None
+_bindings = None
+_singleton_lock = threading.Lock()
+
+
+def _vport_key(vthunder, listener):
+    return (vthunder.ip_address, vthunder.partition_name or "shared", listener.id)
+
+
+class VportBindings(object):
+    """aFlex scripts bound to listener vports, as last read or set by this process.
+
+    Other processes may change the bindings, so they are only trusted to
+    skip updates that change nothing, and for at most `ttl` seconds.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._scripts = {}
+
+    def get(self, vthunder, listener):
+        with self._lock:
+            entry = self._scripts.get(_vport_key(vthunder, listener))
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return list(entry[0])
+
+    def set(self, vthunder, listener, scripts):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._scripts[_vport_key(vthunder, listener)] = (list(scripts), time.time())
+
+    def invalidate(self, vthunder=None, listener=None):
+        with self._lock:
+            if vthunder is None:
+                self._scripts.clear()
+            elif listener is not None:
+                self._scripts.pop(_vport_key(vthunder, listener), None)
+            else:
+                partition = (vthunder.ip_address, vthunder.partition_name or "shared")
+                for key in [key for key in self._scripts if key[:2] == partition]:
+                    del self._scripts[key]
+
+
+def get_uploads():
+    global _uploads
+    with _singleton_lock:
+        if _uploads is None:
+            _uploads = cert_sync.UploadedFiles(CONF.a10_controller_worker.aflex_sync_ttl)
+        return _uploads
+
+
+def get_bindings():
+    global _bindings
+    with _singleton_lock:
+        if _bindings is None:
+            _bindings = VportBindings(CONF.a10_controller_worker.aflex_sync_ttl)
+        return _bindings
+
+
+def upload_script(axapi_client, vthunder, filename, script):
+    """Upload the aFlex script unless the partition already has this content"""
+    uploads = get_uploads()
+    script_digest = cert_sync.digest(script)
+    # The record is kept per process, the script may have been deleted by
+    # another worker or lost by a reload since
+    if (uploads.is_current(vthunder, AFLEX, filename, script_digest) and
+            axapi_client.slb.aflex_policy.exists(filename)):
+        LOG.debug("aFlex policy %s is up to date, skipping upload", filename)
+        return False
+    uploads.forget(vthunder, AFLEX, filename)
+    axapi_client.slb.aflex_policy.create(
+        file=filename, script=script, size=len(script.encode('utf-8')), action="import")
+    uploads.record(vthunder, AFLEX, filename, script_digest)
+    return True
+
+
+def delete_script(axapi_client, vthunder, filename):
+    get_uploads().forget(vthunder, AFLEX, filename)
+    axapi_client.slb.aflex_policy.delete(filename)
+
+
+def _apply(scripts, add, remove):
+    new_scripts = [name for name in scripts if name not in remove]
+    new_scripts.extend(name for name in add if name not in new_scripts)
+    return new_scripts
+
+
+def bind_scripts(axapi_client, vthunder, listener, add=(), remove=()):
+    """Bind and unbind aFlex scripts on the listener vport with one update.
+
+    Known bindings only skip updates that would not change them. Any
+    other update reads the vport first, so scripts bound by other workers
+    or controllers are kept.
+    """
+    bindings = get_bindings()
+    scripts = bindings.get(vthunder, listener)
+    if scripts is not None and _apply(scripts, add, remove) == scripts:
+        return False
+
+    vport = axapi_client.slb.virtual_server.vport.get(
+        listener.load_balancer_id, listener.name,
+        listener.protocol, listener.protocol_port)
+    scripts = [aflex['aflex'] for aflex in vport['port'].get('aflex-scripts', [])]
+    new_scripts = _apply(scripts, add, remove)
+    if new_scripts == scripts:
+        bindings.set(vthunder, listener, scripts)
+        return False
+
+    c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
+    kargs = {"aflex-scripts": [{"aflex": name} for name in new_scripts]}
+    bindings.invalidate(vthunder, listener)
+    axapi_client.slb.virtual_server.vport.update(
+        listener.load_balancer_id, listener.name,
+        listener.protocol, listener.protocol_port,
+        listener.default_pool_id, s_pers, c_pers, 1, **kargs)
+    bindings.set(vthunder, listener, new_scripts)
+    return True
+
+
+def sync_listener_policies(axapi_client, vthunder, listener, unbind=()):
+    """Upload and bind the consolidated aFlex program of the listener L7 policies.
+
+    The program is named after the listener and replaces the scripts of
+    single policies on the vport, as well as the `unbind` ones. It is
+    removed once the listener has no enabled policy left.
+    """
+    l7policies = [l7policy for l7policy in listener.l7policies if l7policy.enabled is not False]
+    policy_scripts = [l7policy.id for l7policy in listener.l7policies] + list(unbind)
+    if not l7policies:
+        bind_scripts(axapi_client, vthunder, listener, remove=policy_scripts + [listener.id])
+        try:
+            delete_script(axapi_client, vthunder, listener.id)
+        except acos_errors.NotFound:
+            pass
+        return
+
+    script = policy.get_compiler().createListenerPolicy(l7policies)
+    upload_script(axapi_client, vthunder, listener.id, script)
+    bind_scripts(axapi_client, vthunder, listener, add=[listener.id], remove=policy_scripts)
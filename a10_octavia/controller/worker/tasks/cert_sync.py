@@ -0,0 +1,152 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Content addressed sync of SSL certificates and keys to Thunder devices
+
+"""
+import copy
+import hashlib
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+SSL_CERT = 'ssl-cert'
+SSL_KEY = 'ssl-key'
+
+_uploads = None
+_barbican_cache = None
+_singleton_lock = threading.Lock()
+
+
+def digest(content):
+    """Return the sha256 hex digest of PEM content"""
+    if content is None:
+        return None
+    if not isinstance(content, bytes):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def _partition_key(vthunder):
+    return (vthunder.ip_address, vthunder.partition_name or "shared")
+
+
+def _file_key(vthunder, kind, filename):
+    return _partition_key(vthunder) + (kind, filename)
+
+
+class UploadedFiles(object):
+    """Digests of the files this process uploaded to each device partition.
+
+    An upload is skipped while the file holds the same content. The
+    records are kept per process, so callers also check that the file
+    still exists on the device before skipping. Records older than `ttl`
+    seconds are not trusted anymore, so files changed on the device are
+    uploaded again on the next sync.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._digests = {}
+
+    def is_current(self, vthunder, kind, filename, content_digest):
+        with self._lock:
+            record = self._digests.get(_file_key(vthunder, kind, filename))
+        if record is None or content_digest is None:
+            return False
+        recorded_digest, recorded_at = record
+        return recorded_digest == content_digest and time.time() - recorded_at <= self.ttl
+
+    def record(self, vthunder, kind, filename, content_digest):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._digests[_file_key(vthunder, kind, filename)] = (content_digest, time.time())
+
+    def forget(self, vthunder, kind, filename):
+        with self._lock:
+            self._digests.pop(_file_key(vthunder, kind, filename), None)
+
+    def invalidate(self, vthunder=None):
+        with self._lock:
+            if vthunder is None:
+                self._digests.clear()
+                return
+            partition = _partition_key(vthunder)
+            for key in [key for key in self._digests if key[:2] == partition]:
+                del self._digests[key]
+
+
+class BarbicanCache(object):
+    """Certificate data of Barbican containers, kept for `ttl` seconds.
+
+    Barbican containers and secrets are immutable, a rotated certificate
+    comes with a new container ref, so the ttl only bounds how long a
+    deleted container or a revoked ACL goes unnoticed.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _evict_expired(self, now):
+        for key in [key for key, entry in self._entries.items()
+                    if now - entry[1] > self.ttl]:
+            del self._entries[key]
+
+    def get(self, project_id, container_ref, fetch):
+        """Return a copy of the cached certificate data, fetch() it on a miss"""
+        key = (project_id, container_ref)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.time() - entry[1] > self.ttl:
+            entry = (fetch(), time.time())
+            if self.ttl > 0:
+                with self._lock:
+                    self._evict_expired(entry[1])
+                    self._entries[key] = entry
+        else:
+            LOG.debug("Using cached barbican data of container %s", container_ref)
+        return copy.copy(entry[0])
+
+    def invalidate(self, project_id=None, container_ref=None):
+        with self._lock:
+            if container_ref is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((project_id, container_ref), None)
+
+
+def get_uploads():
+    global _uploads
+    with _singleton_lock:
+        if _uploads is None:
+            _uploads = UploadedFiles(CONF.a10_controller_worker.cert_sync_ttl)
+        return _uploads
+
+
+def get_barbican_cache():
+    global _barbican_cache
+    with _singleton_lock:
+        if _barbican_cache is None:
+            _barbican_cache = BarbicanCache(CONF.a10_controller_worker.barbican_cache_ttl)
+        return _barbican_cache
@@ -20,6 +20,7 @@ from taskflow import task
 
 from octavia.certificates.common.auth.barbican_acl import BarbicanACLAuth
 
+from a10_octavia.controller.worker.tasks import cert_sync
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks import utils
 
@@ -42,23 +43,37 @@ class GetSSLCertData(task.Task):
     def execute(self, loadbalancer, listener):
         cert_data = None
         try:
-            barbican_client = BarbicanACLAuth().get_barbican_client(loadbalancer.project_id)
-            cert_data = utils.get_cert_data(barbican_client, listener)
-            cert_data.template_name = listener.id
+            cert_data = cert_sync.get_barbican_cache().get(
+                loadbalancer.project_id, listener.tls_certificate_id,
+                lambda: self._fetch_cert_data(loadbalancer, listener))
+            cert_data.template_name = utils.get_ssl_template_name(listener)
             LOG.debug("Successfully received barbican data for listener: %s", listener.id)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to get barbican data for listener: %s", listener.id)
             raise e
         return cert_data
 
+    def _fetch_cert_data(self, loadbalancer, listener):
+        barbican_client = BarbicanACLAuth().get_barbican_client(loadbalancer.project_id)
+        return utils.get_cert_data(barbican_client, listener)
+
 
 class SSLCertCreate(task.Task):
     """Task to create an SSL certificate"""
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder, certificate_type="pem"):
+        uploads = cert_sync.get_uploads()
+        cert_digest = cert_sync.digest(cert_data.cert_content)
         try:
-            if self.axapi_client.file.ssl_cert.exists(file=cert_data.cert_filename):
+            # The certificate may already be in use by listeners sharing it
+            created = not self.axapi_client.file.ssl_cert.exists(file=cert_data.cert_filename)
+            if not created and uploads.is_current(vthunder, cert_sync.SSL_CERT,
+                                                  cert_data.cert_filename, cert_digest):
+                LOG.debug("SSL certificate %s is up to date, skipping upload",
+                          cert_data.cert_filename)
+                return False
+            if not created:
                 self.axapi_client.file.ssl_cert.update(file=cert_data.cert_filename,
                                                        cert=cert_data.cert_content,
                                                        size=len(cert_data.cert_content),
@@ -70,15 +85,21 @@ class SSLCertCreate(task.Task):
                                                        size=len(cert_data.cert_content),
                                                        action="import",
                                                        certificate_type=certificate_type)
+            uploads.record(vthunder, cert_sync.SSL_CERT, cert_data.cert_filename, cert_digest)
             LOG.debug("Successfully created SSL certificate: %s", cert_data.cert_filename)
+            return created
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to create SSL certificate: %s", cert_data.cert_filename)
             raise e
 
     @axapi_client_decorator
-    def revert(self, cert_data, vthunder, *args, **kwargs):
+    def revert(self, result, cert_data, vthunder, *args, **kwargs):
+        if result is not True:
+            # Not created by this task, other listeners may use it
+            return
         try:
             LOG.warning("Reverting creation of SSL certificate: %s", cert_data.cert_filename)
+            cert_sync.get_uploads().forget(vthunder, cert_sync.SSL_CERT, cert_data.cert_filename)
             self.axapi_client.file.ssl_cert.delete(private_key=cert_data.key_filename,
                                                    cert_name=cert_data.cert_filename)
         except ConnectionError:
@@ -94,8 +115,15 @@ class SSLKeyCreate(task.Task):
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder):
+        uploads = cert_sync.get_uploads()
+        key_digest = cert_sync.digest(cert_data.key_content)
         try:
-            if self.axapi_client.file.ssl_key.exists(file=cert_data.key_filename):
+            created = not self.axapi_client.file.ssl_key.exists(file=cert_data.key_filename)
+            if not created and uploads.is_current(vthunder, cert_sync.SSL_KEY,
+                                                  cert_data.key_filename, key_digest):
+                LOG.debug("SSL key %s is up to date, skipping upload", cert_data.key_filename)
+                return False
+            if not created:
                 self.axapi_client.file.ssl_key.update(file=cert_data.key_filename,
                                                       cert=cert_data.key_content,
                                                       size=len(cert_data.key_content),
@@ -105,15 +133,20 @@ class SSLKeyCreate(task.Task):
                                                       cert=cert_data.key_content,
                                                       size=len(cert_data.key_content),
                                                       action="import")
+            uploads.record(vthunder, cert_sync.SSL_KEY, cert_data.key_filename, key_digest)
             LOG.debug("Successfully created SSL key: %s", cert_data.key_filename)
+            return created
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to create SSL key: %s", cert_data.key_filename)
             raise e
 
     @axapi_client_decorator
-    def revert(self, cert_data, vthunder, *args, **kwargs):
+    def revert(self, result, cert_data, vthunder, *args, **kwargs):
+        if result is not True:
+            return
         try:
             LOG.warning("Reverting creation of SSL key: %s", cert_data.key_filename)
+            cert_sync.get_uploads().forget(vthunder, cert_sync.SSL_KEY, cert_data.key_filename)
             self.axapi_client.file.ssl_key.delete(private_key=cert_data.key_filename)
         except ConnectionError:
             LOG.exception(
@@ -124,12 +157,14 @@ class SSLKeyCreate(task.Task):
 
 
 class ClientSSLTemplateCreate(task.Task):
-    """Task to create a client ssl template for a listener"""
+    """Task to create the client ssl template shared by the listeners of a certificate"""
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder):
         try:
-            if self.axapi_client.slb.template.client_ssl.exists(name=cert_data.template_name):
+            created = not self.axapi_client.slb.template.client_ssl.exists(
+                name=cert_data.template_name)
+            if not created:
                 self.axapi_client.slb.template.client_ssl.update(name=cert_data.template_name,
                                                                  cert=cert_data.cert_filename,
                                                                  key=cert_data.key_filename,
@@ -140,12 +175,15 @@ class ClientSSLTemplateCreate(task.Task):
                                                                  key=cert_data.key_filename,
                                                                  passphrase=cert_data.key_pass)
             LOG.debug("Successfully created SSL template: %s", cert_data.template_name)
+            return created
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to create SSL template: %s", cert_data.template_name)
             raise e
 
     @axapi_client_decorator
-    def revert(self, cert_data, vthunder, *args, **kwargs):
+    def revert(self, result, cert_data, vthunder, *args, **kwargs):
+        if result is not True:
+            return
         try:
             LOG.warning("Reverting creation of SSL template: %s", cert_data.template_name)
             self.axapi_client.slb.template.client_ssl.delete(name=cert_data.template_name)
@@ -162,13 +200,22 @@ class SSLCertUpdate(task.Task):
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder, action="import", certificate_type="pem"):
+        uploads = cert_sync.get_uploads()
+        cert_digest = cert_sync.digest(cert_data.cert_content)
         try:
             if self.axapi_client.file.ssl_cert.exists(file=cert_data.cert_filename):
+                if uploads.is_current(vthunder, cert_sync.SSL_CERT, cert_data.cert_filename,
+                                      cert_digest):
+                    LOG.debug("SSL certificate %s is up to date, skipping upload",
+                              cert_data.cert_filename)
+                    return
                 self.axapi_client.file.ssl_cert.update(file=cert_data.cert_filename,
                                                        cert=cert_data.cert_content,
                                                        size=len(cert_data.cert_content),
                                                        action=action,
                                                        certificate_type=certificate_type)
+                uploads.record(vthunder, cert_sync.SSL_CERT, cert_data.cert_filename,
+                               cert_digest)
                 LOG.debug("Successfully updated SSL certificate: %s", cert_data.cert_filename)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to update SSL certificate: %s", cert_data.cert_filename)
@@ -180,12 +227,20 @@ class SSLKeyUpdate(task.Task):
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder, action="import"):
+        uploads = cert_sync.get_uploads()
+        key_digest = cert_sync.digest(cert_data.key_content)
         try:
             if self.axapi_client.file.ssl_key.exists(file=cert_data.key_filename):
+                if uploads.is_current(vthunder, cert_sync.SSL_KEY, cert_data.key_filename,
+                                      key_digest):
+                    LOG.debug("SSL key %s is up to date, skipping upload",
+                              cert_data.key_filename)
+                    return
                 self.axapi_client.file.ssl_key.update(file=cert_data.key_filename,
                                                       cert=cert_data.key_content,
                                                       size=len(cert_data.key_content),
                                                       action=action)
+                uploads.record(vthunder, cert_sync.SSL_KEY, cert_data.key_filename, key_digest)
                 LOG.debug("Successfully updated SSL key: %s", cert_data.key_filename)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to update SSL key: %s", cert_data.key_filename)
@@ -204,6 +259,13 @@ class ClientSSLTemplateUpdate(task.Task):
                                                                  key=cert_data.key_filename,
                                                                  passphrase=cert_data.key_pass)
                 LOG.debug("Successfully updated SSL template: %s", cert_data.template_name)
+            else:
+                # Listeners created with a template of their own move to the shared one
+                self.axapi_client.slb.template.client_ssl.create(name=cert_data.template_name,
+                                                                 cert=cert_data.cert_filename,
+                                                                 key=cert_data.key_filename,
+                                                                 passphrase=cert_data.key_pass)
+                LOG.debug("Successfully created SSL template: %s", cert_data.template_name)
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to update SSL template: %s", cert_data.template_name)
             raise e
@@ -214,6 +276,7 @@ class SSLCertDelete(task.Task):
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder):
+        cert_sync.get_uploads().forget(vthunder, cert_sync.SSL_CERT, cert_data.cert_filename)
         try:
             if self.axapi_client.file.ssl_cert.exists(file=cert_data.cert_filename):
                 self.axapi_client.file.ssl_cert.delete(private_key=cert_data.key_filename,
@@ -232,6 +295,7 @@ class SSLKeyDelete(task.Task):
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder):
+        cert_sync.get_uploads().forget(vthunder, cert_sync.SSL_KEY, cert_data.key_filename)
         try:
             if self.axapi_client.file.ssl_key.exists(file=cert_data.key_filename):
                 self.axapi_client.file.ssl_key.delete(private_key=cert_data.key_filename)
@@ -245,7 +309,7 @@ class SSLKeyDelete(task.Task):
 
 
 class ClientSSLTemplateDelete(task.Task):
-    """Task to delete a client ssl template for a listener"""
+    """Task to delete the client ssl template of a certificate"""
 
     @axapi_client_decorator
     def execute(self, cert_data, vthunder):
@@ -256,3 +320,22 @@ class ClientSSLTemplateDelete(task.Task):
         except (acos_errors.ACOSException, ConnectionError) as e:
             LOG.exception("Failed to delete SSL template: %s", cert_data.template_name)
             raise e
+
+
+class ListenerClientSSLTemplateDelete(task.Task):
+    """Task to delete the client ssl template named after a listener
+
+    Templates created before they were shared between listeners are named
+    after their listener, nothing else uses them.
+    """
+
+    @axapi_client_decorator
+    def execute(self, vthunder, listener):
+        try:
+            self.axapi_client.slb.template.client_ssl.delete(name=listener.id)
+            LOG.debug("Successfully deleted SSL template: %s", listener.id)
+        except acos_errors.NotFound:
+            pass
+        except (acos_errors.ACOSException, ConnectionError) as e:
+            LOG.exception("Failed to delete SSL template: %s", listener.id)
+            raise e
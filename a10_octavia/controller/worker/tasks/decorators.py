@@ -12,20 +12,65 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import weakref
 
-import acos_client
 from oslo_config import cfg
 from oslo_log import log as logging
 from requests.exceptions import ConnectionError
 
+from a10_octavia.common import axapi_session_pool
+from a10_octavia.common import cache
+
 CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
 LOG = logging.getLogger(__name__)
 
 
+_partition_exists_cache = None
+_active_partition_sessions = weakref.WeakKeyDictionary()
+# Clients switched to another aVCS device context by a call still running,
+# or by a call that failed and left the context unknown
+_switched_clients = weakref.WeakSet()
+
+
+def _get_partition_exists_cache():
+    global _partition_exists_cache
+    if _partition_exists_cache is None:
+        _partition_exists_cache = cache.TTLCache(
+            CONF.a10_controller_worker.partition_cache_ttl)
+    return _partition_exists_cache
+
+
+def invalidate_partition_cache(ip_address, partition):
+    _get_partition_exists_cache().invalidate((ip_address, partition))
+
+
+def partition_exists(vthunder_client, partition):
+    partition_cache = _get_partition_exists_cache()
+    key = (vthunder_client.host, partition)
+    if partition_cache.get(key):
+        return True
+    # Missing partitions are not cached, another worker may create them
+    exists = vthunder_client.system.partition.exists(partition)
+    if exists:
+        partition_cache.set(key, True)
+    return exists
+
+
 def activate_partition(vthunder_client, partition):
+    session_id = vthunder_client.session.session_id
+    activated_session_id = _active_partition_sessions.get(vthunder_client)
+    if session_id is not None and activated_session_id != session_id:
+        # The session was re-authenticated since the partition was last
+        # activated, and a fresh aXAPI session always starts in shared.
+        vthunder_client.current_partition = "shared"
+    elif session_id is not None and vthunder_client.current_partition == partition:
+        return
+
     try:
-        if vthunder_client.system.partition.exists(partition):
+        if partition_exists(vthunder_client, partition):
             vthunder_client.system.partition.active(partition)
+            _active_partition_sessions[vthunder_client] = vthunder_client.session.session_id
     except Exception as e:
         LOG.exception("Failed to activate partition: %s", str(e))
         raise
@@ -33,40 +78,59 @@ def activate_partition(vthunder_client, partition):
 
 def axapi_client_decorator(func):
     def wrapper(self, *args, **kwargs):
-        vthunder = kwargs.get('vthunder')
-        if vthunder:
-            api_ver = acos_client.AXAPI_21 if vthunder.axapi_version == 21 else acos_client.AXAPI_30
-            self.axapi_client = acos_client.Client(vthunder.ip_address, api_ver,
-                                                   vthunder.username, vthunder.password,
-                                                   timeout=30)
+        return _call_with_client(func, kwargs.get('vthunder'), self, *args, **kwargs)
 
-            if vthunder.partition_name != "shared":
-                activate_partition(self.axapi_client, vthunder.partition_name)
+    return wrapper
 
-        else:
-            self.axapi_client = None
-        result = func(self, *args, **kwargs)
 
-        try:
-            self.axapi_client.session.close()
-        except ConnectionError as e:
-            LOG.debug("Failed to close the vThunder session: %s", str(e))
-        except AttributeError:
-            pass
+def _call_with_client(func, device, self, *args, **kwargs):
+    if device:
+        self.axapi_client = axapi_session_pool.acquire_client(device)
+        if device.partition_name != "shared":
+            try:
+                activate_partition(self.axapi_client, device.partition_name)
+            except Exception:
+                axapi_session_pool.release_client(self.axapi_client, device,
+                                                  discard=True)
+                raise
+    else:
+        self.axapi_client = None
 
-        return result
-
-    return wrapper
+    discard = False
+    try:
+        return func(self, *args, **kwargs)
+    except ConnectionError:
+        discard = True
+        raise
+    except Exception:
+        # The partition of the client may not be the expected one anymore
+        discard = bool(device) and device.partition_name != "shared"
+        raise
+    finally:
+        if device:
+            if self.axapi_client in _switched_clients:
+                _switched_clients.discard(self.axapi_client)
+                discard = True
+            axapi_session_pool.release_client(self.axapi_client, device,
+                                              discard=discard)
 
 
 def device_context_switch_decorator(func):
     def wrapper(self, *args, **kwargs):
         master_device_id = kwargs.get('master_device_id')
         device_id = kwargs.get('device_id')
-        if master_device_id and device_id and device_id != master_device_id:
-            self.axapi_client.device_context.switch(device_id, None)
-        result = func(self, *args, **kwargs)
-        if master_device_id and device_id and device_id != master_device_id:
-            self.axapi_client.device_context.switch(master_device_id, None)
+        if not (master_device_id and device_id and device_id != master_device_id):
+            return func(self, *args, **kwargs)
+
+        # The client stays marked, and is discarded instead of going back
+        # to the pool, unless the call succeeds and the context is restored
+        client = self.axapi_client
+        _switched_clients.add(client)
+        client.device_context.switch(device_id, None)
+        try:
+            result = func(self, *args, **kwargs)
+        finally:
+            client.device_context.switch(master_device_id, None)
+        _switched_clients.discard(client)
         return result
     return wrapper
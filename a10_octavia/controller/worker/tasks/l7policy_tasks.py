@@ -13,13 +13,14 @@
 #    under the License.
 
 
+import acos_client.errors as acos_errors
 from oslo_config import cfg
 from oslo_log import log as logging
 from taskflow import task
 
+from a10_octavia.controller.worker.tasks import aflex_sync
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
-from a10_octavia.controller.worker.tasks.policy import PolicyUtil
-from a10_octavia.controller.worker.tasks import utils
+from a10_octavia.controller.worker.tasks import policy
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -27,45 +28,28 @@ LOG = logging.getLogger(__name__)
 
 class L7PolicyParent(object):
 
-    def set(self, l7policy, listeners):
-        filename = l7policy.id
-        p = PolicyUtil()
-        script = p.createPolicy(l7policy)
-        size = len(script.encode('utf-8'))
+    def set(self, l7policy, listeners, vthunder):
         listener = listeners[0]
-        c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
-        kargs = {}
-        get_listener = None
+        if CONF.listener.consolidate_l7policies:
+            try:
+                aflex_sync.sync_listener_policies(self.axapi_client, vthunder, listener)
+                LOG.debug("Listener l7policies updated successfully: %s", listener.id)
+            except Exception as e:
+                LOG.exception("Failed to create/update l7policy: %s", str(e))
+                raise
+            return
+
+        filename = l7policy.id
+        script = policy.get_compiler().createPolicy(l7policy)
         try:
-            self.axapi_client.slb.aflex_policy.create(
-                file=filename, script=script, size=size, action="import")
+            aflex_sync.upload_script(self.axapi_client, vthunder, filename, script)
             LOG.debug("l7policy created successfully: %s", l7policy.id)
         except Exception as e:
             LOG.exception("Failed to create/update l7policy: %s", str(e))
             raise
 
         try:
-            get_listener = self.axapi_client.slb.virtual_server.vport.get(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port)
-        except Exception as e:
-            LOG.exception("Failed to get listener for l7policy: %s", str(e))
-            raise
-
-        aflex_scripts = []
-        if 'aflex-scripts' in get_listener['port']:
-            aflex_scripts = get_listener['port']['aflex-scripts']
-            aflex_scripts.append({"aflex": filename})
-        else:
-            aflex_scripts = [{"aflex": filename}]
-            kargs["aflex-scripts"] = aflex_scripts
-
-        try:
-            self.axapi_client.slb.virtual_server.vport.update(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port,
-                listener.default_pool_id, s_pers,
-                c_pers, 1, **kargs)
+            aflex_sync.bind_scripts(self.axapi_client, vthunder, listener, add=[filename])
             LOG.debug("Listener updated successfully: %s", listener.id)
         except Exception as e:
             LOG.exception("Failed to update listener for l7policy: %s", str(e))
@@ -77,7 +61,7 @@ class CreateL7Policy(L7PolicyParent, task.Task):
 
     @axapi_client_decorator
     def execute(self, l7policy, listeners, vthunder):
-        self.set(l7policy, listeners)
+        self.set(l7policy, listeners, vthunder)
 
 
 class UpdateL7Policy(L7PolicyParent, task.Task):
@@ -86,7 +70,11 @@ class UpdateL7Policy(L7PolicyParent, task.Task):
     @axapi_client_decorator
     def execute(self, l7policy, listeners, vthunder, update_dict):
         l7policy.__dict__.update(update_dict)
-        self.set(l7policy, listeners)
+        if 'position' in update_dict:
+            l7policies = l7policy.listener.l7policies
+            l7policies.remove(l7policy)
+            l7policies.insert(update_dict['position'] - 1, l7policy)
+        self.set(l7policy, listeners, vthunder)
 
 
 class DeleteL7Policy(task.Task):
@@ -95,33 +83,13 @@ class DeleteL7Policy(task.Task):
     @axapi_client_decorator
     def execute(self, l7policy, vthunder):
         listener = l7policy.listener
-        c_pers, s_pers = utils.get_sess_pers_templates(
-            listener.default_pool)
-        kargs = {}
-        get_listener = None
-
-        try:
-            get_listener = self.axapi_client.slb.virtual_server.vport.get(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port)
-        except Exception as e:
-            LOG.warning("Failed to get listener for l7policy: %s", str(e))
-            raise
-
-        new_aflex_scripts = []
-        if 'aflex-scripts' in get_listener['port']:
-            aflex_scripts = get_listener['port']['aflex-scripts']
-            for aflex in aflex_scripts:
-                if aflex['aflex'] != l7policy.id:
-                    new_aflex_scripts.append(aflex)
-        kargs["aflex-scripts"] = new_aflex_scripts
-
         try:
-            self.axapi_client.slb.virtual_server.vport.update(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port,
-                listener.default_pool_id,
-                s_pers, c_pers, 1, **kargs)
+            if CONF.listener.consolidate_l7policies:
+                aflex_sync.sync_listener_policies(self.axapi_client, vthunder, listener,
+                                                  unbind=[l7policy.id])
+            else:
+                aflex_sync.bind_scripts(self.axapi_client, vthunder, listener,
+                                        remove=[l7policy.id])
             LOG.debug(
                 "l7policy %s detached from port %s successfully.", l7policy.id, listener.id)
         except Exception as e:
@@ -129,7 +97,10 @@ class DeleteL7Policy(task.Task):
             raise
 
         try:
-            self.axapi_client.slb.aflex_policy.delete(l7policy.id)
+            aflex_sync.delete_script(self.axapi_client, vthunder, l7policy.id)
             LOG.debug("l7policy deleted successfully: %s", l7policy.id)
+        except acos_errors.NotFound:
+            # Never uploaded on its own when policies are consolidated
+            LOG.debug("aFlex script of l7policy %s not found", l7policy.id)
         except Exception as e:
             LOG.warning("Failed to delete l7policy: %s", str(e))
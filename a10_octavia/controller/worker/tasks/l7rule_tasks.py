@@ -16,9 +16,9 @@ from oslo_config import cfg
 from oslo_log import log as logging
 from taskflow import task
 
+from a10_octavia.controller.worker.tasks import aflex_sync
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
-from a10_octavia.controller.worker.tasks.policy import PolicyUtil
-from a10_octavia.controller.worker.tasks import utils
+from a10_octavia.controller.worker.tasks import policy
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -26,46 +26,29 @@ LOG = logging.getLogger(__name__)
 
 class L7RuleParent(object):
 
-    def set(self, l7rule, listeners):
+    def set(self, l7rule, listeners, vthunder):
         l7policy = l7rule.l7policy
-        filename = l7policy.id
-        p = PolicyUtil()
-        script = p.createPolicy(l7policy)
-        size = len(script.encode('utf-8'))
         listener = listeners[0]
-        c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
-        kargs = {}
-        get_listener = None
+        if CONF.listener.consolidate_l7policies:
+            try:
+                aflex_sync.sync_listener_policies(self.axapi_client, vthunder, listener)
+                LOG.debug("Listener l7policies updated successfully: %s", listener.id)
+            except Exception as e:
+                LOG.exception("Failed to create/update l7rule: %s", str(e))
+                raise
+            return
+
+        filename = l7policy.id
+        script = policy.get_compiler().createPolicy(l7policy)
         try:
-            self.axapi_client.slb.aflex_policy.create(
-                file=filename, script=script, size=size, action="import")
+            aflex_sync.upload_script(self.axapi_client, vthunder, filename, script)
             LOG.debug("aFlex policy created successfully.")
         except Exception as e:
             LOG.exception("Failed to create/update l7rule: %s", str(e))
             raise
 
         try:
-            get_listener = self.axapi_client.slb.virtual_server.vport.get(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port)
-        except Exception as e:
-            LOG.exception("Failed to get listener for l7rule: %s", str(e))
-            raise
-
-        aflex_scripts = []
-        if 'aflex-scripts' in get_listener['port']:
-            aflex_scripts = get_listener['port']['aflex-scripts']
-            aflex_scripts.append({"aflex": filename})
-        else:
-            aflex_scripts = [{"aflex": filename}]
-        kargs["aflex-scripts"] = aflex_scripts
-
-        try:
-            self.axapi_client.slb.virtual_server.vport.update(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port,
-                listener.default_pool_id, s_pers,
-                c_pers, 1, **kargs)
+            aflex_sync.bind_scripts(self.axapi_client, vthunder, listener, add=[filename])
             LOG.debug("Listener updated successfully: %s", listener.id)
         except Exception as e:
             LOG.exception("Failed to create/update l7rule: %s", str(e))
@@ -77,7 +60,7 @@ class CreateL7Rule(L7RuleParent, task.Task):
 
     @axapi_client_decorator
     def execute(self, l7rule, listeners, vthunder):
-        self.set(l7rule, listeners)
+        self.set(l7rule, listeners, vthunder)
 
 
 class UpdateL7Rule(L7RuleParent, task.Task):
@@ -86,7 +69,7 @@ class UpdateL7Rule(L7RuleParent, task.Task):
     @axapi_client_decorator
     def execute(self, l7rule, listeners, vthunder, update_dict):
         l7rule.__dict__.update(update_dict)
-        self.set(l7rule, listeners)
+        self.set(l7rule, listeners, vthunder)
 
 
 class DeleteL7Rule(task.Task):
@@ -94,52 +77,37 @@ class DeleteL7Rule(task.Task):
 
     @axapi_client_decorator
     def execute(self, l7rule, listeners, vthunder):
-        policy = l7rule.l7policy
-        rules = policy.l7rules
+        policy_obj = l7rule.l7policy
+        rules = policy_obj.l7rules
 
         for index, rule in enumerate(rules):
             if rule.id == l7rule.id:
                 del rules[index]
                 break
-        policy.rules = rules
-        l7rule.l7policy = policy
+        policy_obj.rules = rules
+        l7rule.l7policy = policy_obj
         l7policy = l7rule.l7policy
-        filename = l7policy.id
-        p = PolicyUtil()
-        script = p.createPolicy(l7policy)
-        size = len(script.encode('utf-8'))
         listener = listeners[0]
-        c_pers, s_pers = utils.get_sess_pers_templates(listener.default_pool)
-        kargs = {}
-        try:
-            self.axapi_client.slb.aflex_policy.create(
-                file=filename, script=script, size=size, action="import")
-            LOG.debug("aFlex policy deleted successfully.")
-        except Exception as e:
-            LOG.warning("Failed to delete l7rule: %s", str(e))
-            raise
+        if CONF.listener.consolidate_l7policies:
+            try:
+                aflex_sync.sync_listener_policies(self.axapi_client, vthunder, listener)
+                LOG.debug("Listener l7policies updated successfully: %s", listener.id)
+            except Exception as e:
+                LOG.warning("Failed to delete l7rule: %s", str(e))
+                raise
+            return
 
+        filename = l7policy.id
+        script = policy.get_compiler().createPolicy(l7policy)
         try:
-            get_listener = self.axapi_client.slb.virtual_server.vport.get(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port)
+            aflex_sync.upload_script(self.axapi_client, vthunder, filename, script)
+            LOG.debug("aFlex policy deleted successfully.")
         except Exception as e:
             LOG.warning("Failed to delete l7rule: %s", str(e))
             raise
 
-        aflex_scripts = []
-        if 'aflex-scripts' in get_listener['port']:
-            aflex_scripts = get_listener['port']['aflex-scripts']
-            aflex_scripts.append({"aflex": filename})
-        else:
-            aflex_scripts = [{"aflex": filename}]
-        kargs["aflex-scripts"] = aflex_scripts
-
         try:
-            self.axapi_client.slb.virtual_server.vport.update(
-                listener.load_balancer_id, listener.name,
-                listener.protocol, listener.protocol_port, listener.default_pool_id,
-                s_pers, c_pers, 1, **kargs)
+            aflex_sync.bind_scripts(self.axapi_client, vthunder, listener, add=[filename])
             LOG.debug("Listener updated successfully: %s", listener.id)
         except Exception as e:
             LOG.warning("Failed to delete l7rule: %s", str(e))
@@ -12,6 +12,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import threading
+
+from oslo_config import cfg
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
 
 TYPE_DICT = {
     "HOST_NAME": "HTTP::host",
@@ -31,6 +38,39 @@ COMPARE_TYPE_DICT = {
 }
 
 
+SWITCH_SUBJECT_DICT = {
+    "HOST_NAME": "HTTP::host",
+    "PATH": "HTTP::uri",
+    "FILE_TYPE": "HTTP::uri"
+}
+
+
+GLOB_PATTERN_DICT = {
+    "EQUAL_TO": "{0}",
+    "STARTS_WITH": "{0}*",
+    "ENDS_WITH": "*{0}"
+}
+
+# Glob and Tcl quoting special characters, values holding them are not
+# matched with switch -glob
+GLOB_SPECIAL_CHARS = frozenset('*?[]\\{}"$')
+
+
+def switch_case(l7policy):
+    """Subject and glob pattern matching the policy with switch -glob, or None"""
+    if len(l7policy.l7rules) != 1:
+        return None
+    l7rule = l7policy.l7rules[0]
+    if l7rule.invert or l7rule.type not in SWITCH_SUBJECT_DICT:
+        return None
+    # File type rules always match the uri suffix, whatever their compare type
+    compare_type = "ENDS_WITH" if l7rule.type == "FILE_TYPE" else l7rule.compare_type
+    if (compare_type not in GLOB_PATTERN_DICT or not l7rule.value or
+            GLOB_SPECIAL_CHARS.intersection(l7rule.value)):
+        return None
+    return SWITCH_SUBJECT_DICT[l7rule.type], GLOB_PATTERN_DICT[compare_type].format(l7rule.value)
+
+
 class PolicyUtil(object):
     def __init__(self):
         self.base = """ when HTTP_REQUEST {{ \n
@@ -40,25 +80,57 @@ class PolicyUtil(object):
         }} """
 
     def createPolicy(self, l7policy):
-        actionString = ""
-        if l7policy.action == "REDIRECT_TO_POOL":
-            actionString = "pool " + l7policy.redirect_pool.id
+        return self.base.format(self.conditionParser(l7policy), self.actionParser(l7policy))
+
+    def createListenerPolicy(self, l7policies):
+        """One aFlex program running the action of the first matching policy.
+
+        Policies are evaluated in the given order, i.e. by position, in a
+        single if/elseif chain. Runs of consecutive policies matching the
+        host or uri by equality, prefix or suffix are looked up with one
+        switch -glob instead, the rest of the chain going in its default.
+        """
+        groups = []
+        for l7policy in l7policies:
+            action = self.actionParser(l7policy)
+            case = switch_case(l7policy)
+            if case is None:
+                if not groups or groups[-1][0] != 'if':
+                    groups.append(('if', None, []))
+                groups[-1][2].append((self.conditionParser(l7policy), action))
+            else:
+                subject, pattern = case
+                if not groups or groups[-1][:2] != ('switch', subject):
+                    groups.append(('switch', subject, []))
+                groups[-1][2].append((pattern, action))
 
+        program = ""
+        for kind, subject, branches in reversed(groups):
+            if kind == 'if':
+                clauses = ["if {{ {0} }} {{\n{1}\n}}".format(*branches[0])]
+                clauses.extend("elseif {{ {0} }} {{\n{1}\n}}".format(*branch)
+                               for branch in branches[1:])
+                if program:
+                    clauses.append("else {{\n{0}\n}}".format(program))
+                program = " ".join(clauses)
+            else:
+                cases = ['"{0}" {{\n{1}\n}}'.format(*branch) for branch in branches]
+                if program:
+                    cases.append("default {{\n{0}\n}}".format(program))
+                program = "switch -glob [{0}] {{\n{1}\n}}".format(subject, "\n".join(cases))
+        return "when HTTP_REQUEST {{\n{0}\n}}".format(program)
+
+    def actionParser(self, l7policy):
+        if l7policy.action == "REDIRECT_TO_POOL":
+            return "pool " + l7policy.redirect_pool.id
         elif l7policy.action == "REDIRECT_TO_URL":
-            actionString = "HTTP::redirect " + l7policy.redirect_url
+            return "HTTP::redirect " + l7policy.redirect_url
+        return "HTTP::close"
 
-        else:
-            actionString = "HTTP::close"
-        ruleString = ""
+    def conditionParser(self, l7policy):
         if len(l7policy.l7rules) <= 0:
-            ruleString = "( true )"
-        else:
-            ruleArray = []
-            for rule in l7policy.l7rules:
-                temp = self.ruleParser(rule)
-                ruleArray.append(temp)
-            ruleString = " and ".join(ruleArray)
-        return self.base.format(ruleString, actionString)
+            return "( true )"
+        return " and ".join(self.ruleParser(rule) for rule in l7policy.l7rules)
 
     def ruleParser(self, l7rule):
         ruleString = "("
@@ -85,3 +157,90 @@ class PolicyUtil(object):
         if l7rule.invert:
             ruleString = "not" + ruleString
         return ruleString
+
+
+def rule_key(l7rule):
+    return (l7rule.type, l7rule.key, l7rule.compare_type, l7rule.value, l7rule.invert)
+
+
+def policy_key(l7policy):
+    """Key of everything the aFlex script of the policy is compiled from.
+
+    Cached scripts are looked up by the hash of this tuple, which is cheaper
+    to build than the script, unlike a digest of its repr.
+    """
+    redirect_pool_id = l7policy.redirect_pool.id if l7policy.redirect_pool else None
+    return (l7policy.action, redirect_pool_id, l7policy.redirect_url,
+            tuple(rule_key(rule) for rule in l7policy.l7rules))
+
+
+class _LRUCache(object):
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PolicyCompiler(PolicyUtil):
+    """PolicyUtil caching the aFlex scripts it compiles.
+
+    Scripts are cached by the policy action and rules, so only the policies
+    that changed are compiled again. Rule conditions are not cached on
+    their own, parsing one is cheaper than a cache lookup.
+    """
+
+    def __init__(self, cache_size):
+        super(PolicyCompiler, self).__init__()
+        self._policies = _LRUCache(cache_size)
+
+    def createPolicy(self, l7policy):
+        key = policy_key(l7policy)
+        script = self._policies.get(key)
+        if script is None:
+            script = super(PolicyCompiler, self).createPolicy(l7policy)
+            self._policies.put(key, script)
+        return script
+
+    def createListenerPolicy(self, l7policies):
+        key = ('listener',) + tuple(policy_key(l7policy) for l7policy in l7policies)
+        script = self._policies.get(key)
+        if script is None:
+            script = super(PolicyCompiler, self).createListenerPolicy(l7policies)
+            self._policies.put(key, script)
+        return script
+
+    def clear(self):
+        self._policies.clear()
+
+
+_compiler = None
+_compiler_lock = threading.Lock()
+
+
+def get_compiler():
+    global _compiler
+    with _compiler_lock:
+        if _compiler is None:
+            _compiler = PolicyCompiler(CONF.a10_controller_worker.l7policy_cache_size)
+        return _compiler
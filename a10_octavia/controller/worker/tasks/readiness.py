@@ -0,0 +1,241 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Readiness polling of vThunder devices
+
+"""
+from acos_client import errors as acos_errors
+try:
+    import http.client as http_client
+except ImportError:
+    import httplib as http_client
+import random
+from requests import exceptions as req_exceptions
+from taskflow import states
+from taskflow.listeners import base as tf_listeners
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+CONFIG_SYNC_OPER_URL = "/axapi/v3/vrrp-a/config-sync/oper"
+
+# Seconds given to apply a synced config when its status cannot be read
+CONFIG_SYNC_FALLBACK_WAIT = 30
+
+PROBE_ERRORS = (req_exceptions.ConnectionError, acos_errors.ACOSException,
+                http_client.BadStatusLine, req_exceptions.ReadTimeout)
+# Errors of a device that is up but cannot answer yet
+TRANSIENT_ERRORS = (req_exceptions.ConnectionError, req_exceptions.ReadTimeout,
+                    http_client.BadStatusLine, acos_errors.ACOSSystemIsBusy,
+                    acos_errors.ACOSSystemNotReady)
+
+_current = threading.local()
+
+
+def _record_wait(seconds):
+    report = getattr(_current, 'report', None)
+    if report is not None:
+        report.add(seconds)
+
+
+def bind_report(fn):
+    """Wrap fn to record its readiness waits in the report of the calling thread.
+
+    Used to hand tasks over to the threads of a parallel engine.
+    """
+    report = getattr(_current, 'report', None)
+
+    def bound(*args, **kwargs):
+        previous = getattr(_current, 'report', None)
+        _current.report = report
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.report = previous
+
+    return bound
+
+
+def _probe(axapi_client):
+    try:
+        axapi_client.system.information()
+        return True
+    except PROBE_ERRORS:
+        return False
+
+
+def _poll_until(condition, deadline):
+    """Evaluate condition with exponential backoff and jitter until deadline"""
+    conf = CONF.a10_controller_worker
+    delay = conf.vthunder_ready_poll_min_interval
+    while True:
+        if condition():
+            return True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(remaining, delay / 2.0 + random.uniform(0, delay / 2.0)))
+        delay = min(delay * 2, conf.vthunder_ready_poll_max_interval)
+
+
+def wait_for_vthunder(axapi_client, vthunder, after_reboot=False, timeout=None):
+    """Poll system.information() until the vThunder answers.
+
+    :param axapi_client: aXAPI client of the vThunder
+    :param vthunder: vThunder being waited for
+    :param after_reboot: A reboot was just requested. First wait up to
+                         `vthunder_reboot_shutdown_timeout` seconds for the
+                         device to stop answering, so the still running
+                         device is not mistaken for the rebooted one.
+    :param timeout: Overall budget in seconds, defaults to
+                    `vthunder_ready_timeout`
+    :returns: Seconds spent waiting
+    :raises requests.exceptions.ConnectionError: The vThunder did not
+                                                 answer within the budget.
+    """
+    conf = CONF.a10_controller_worker
+    started_at = time.time()
+    deadline = started_at + (conf.vthunder_ready_timeout if timeout is None else timeout)
+    if after_reboot:
+        shutdown_deadline = min(deadline, started_at + conf.vthunder_reboot_shutdown_timeout)
+        if not _poll_until(lambda: not _probe(axapi_client), shutdown_deadline):
+            LOG.debug("vThunder %s kept answering after the reboot request",
+                      vthunder.ip_address)
+
+    ready = _poll_until(lambda: _probe(axapi_client), deadline)
+    waited = time.time() - started_at
+    _record_wait(waited)
+    if not ready:
+        LOG.error("Failed to connect vThunder in expected amount of boot time: %s",
+                  vthunder.id)
+        raise req_exceptions.ConnectionError()
+    LOG.debug("vThunder %s answered after %.1f seconds", vthunder.ip_address, waited)
+    return waited
+
+
+class _ConfigSyncStatusUnavailable(Exception):
+    pass
+
+
+def _config_sync_status(axapi_client):
+    """Return the lowercase config-sync status, None while the device is busy
+
+    :raises _ConfigSyncStatusUnavailable: The device has no config-sync
+                                          status, or answered without one.
+    """
+    try:
+        resp = axapi_client.http.request(
+            "GET", CONFIG_SYNC_OPER_URL, {},
+            {'Authorization': "A10 %s" % axapi_client.session.id})
+    except TRANSIENT_ERRORS:
+        return None
+    except acos_errors.ACOSException as e:
+        raise _ConfigSyncStatusUnavailable(str(e))
+    try:
+        return str(resp['config-sync']['oper']['status']).lower()
+    except (KeyError, TypeError):
+        raise _ConfigSyncStatusUnavailable("no status in %r" % (resp,))
+
+
+def wait_for_config_sync(axapi_client, vthunder, timeout=None):
+    """Poll the vrrp-a config-sync oper status until the sync has finished.
+
+    Devices without a readable config-sync status are given
+    CONFIG_SYNC_FALLBACK_WAIT seconds to apply the synced config instead.
+
+    :param axapi_client: aXAPI client of the vThunder that started the sync
+    :param vthunder: vThunder that started the sync
+    :param timeout: Overall budget in seconds, defaults to
+                    `vthunder_ready_timeout`
+    :returns: Seconds spent waiting
+    :raises acos_client.errors.ACOSException: The sync failed, or was still
+                                              in progress after the budget.
+    """
+    conf = CONF.a10_controller_worker
+    started_at = time.time()
+    deadline = started_at + (conf.vthunder_ready_timeout if timeout is None else timeout)
+    status = [None]
+
+    def finished():
+        status[0] = _config_sync_status(axapi_client)
+        return status[0] is not None and 'progress' not in status[0]
+
+    try:
+        done = _poll_until(finished, deadline)
+    except _ConfigSyncStatusUnavailable as e:
+        LOG.warning("Config sync status of vThunder %s is unavailable (%s), "
+                    "waiting %s seconds instead", vthunder.id, str(e),
+                    CONFIG_SYNC_FALLBACK_WAIT)
+        time.sleep(max(0, started_at + CONFIG_SYNC_FALLBACK_WAIT - time.time()))
+        done, status[0] = True, None
+    waited = time.time() - started_at
+    _record_wait(waited)
+    if status[0] is not None and (not done or 'fail' in status[0]):
+        LOG.error("Config sync of vThunder %s did not complete, status: %s",
+                  vthunder.id, status[0])
+        raise acos_errors.ACOSException(msg="Config sync did not complete: %s" % status[0])
+    if not done:
+        LOG.warning("Config sync status of vThunder %s could not be read within "
+                    "%.1f seconds", vthunder.id, waited)
+    LOG.debug("Config sync of vThunder %s finished after %.1f seconds",
+              vthunder.ip_address, waited)
+    return waited
+
+
+class WaitReport(object):
+    """Time spent in readiness waits while running one flow"""
+
+    def __init__(self, flow_name):
+        self.flow_name = flow_name
+        self.waits = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.seconds += seconds
+
+
+class WaitReportListener(tf_listeners.Listener):
+    """Reports the time a flow spent waiting for vThunders to be ready.
+
+    Readiness waits are attributed to the flow that runs on the same thread,
+    or that submitted the task to the executor through bind_report().
+    """
+
+    def __init__(self, engine):
+        super(WaitReportListener, self).__init__(
+            engine, task_listen_for=(), retry_listen_for=())
+        self.report = None
+
+    def _flow_receiver(self, state, details):
+        if state == states.RUNNING:
+            self.report = WaitReport(details['flow_name'])
+            _current.report = self.report
+        elif state in (states.SUCCESS, states.REVERTED, states.FAILURE,
+                       states.SUSPENDED) and self.report is not None:
+            _current.report = None
+            if self.report.waits:
+                LOG.info("Flow %(flow)s spent %(seconds).1f seconds in %(waits)s "
+                         "vThunder readiness waits",
+                         {'flow': self.report.flow_name,
+                          'seconds': self.report.seconds,
+                          'waits': self.report.waits})
@@ -19,6 +19,7 @@ from taskflow import task
 
 import acos_client.errors as acos_errors
 
+from a10_octavia.controller.worker.tasks import address_index
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks import utils
 
@@ -47,6 +48,8 @@ class MemberCreate(task.Task):
             self.axapi_client.slb.server.create(member.id, member.ip_address, status=status,
                                                 server_templates=server_temp,
                                                 axapi_args=server_args)
+            address_index.get_index().add(vthunder, address_index.SERVER,
+                                          member.id, member.ip_address)
             LOG.debug("Successfully created member: %s", member.id)
         except (acos_errors.ACOSException, exceptions.ConnectionError) as e:
             LOG.exception("Failed to create member: %s", member.id)
@@ -68,6 +71,7 @@ class MemberCreate(task.Task):
             LOG.warning("Reverting creation of member: %s for pool: %s",
                         member.id, pool.id)
             self.axapi_client.slb.server.delete(member.id)
+            address_index.get_index().remove(vthunder, address_index.SERVER, member.id)
         except exceptions.ConnectionError:
             LOG.exception("Failed to connect A10 Thunder device: %s", vthunder.ip_address)
         except Exception as e:
@@ -90,6 +94,7 @@ class MemberDelete(task.Task):
             raise e
         try:
             self.axapi_client.slb.server.delete(member.id)
+            address_index.get_index().remove(vthunder, address_index.SERVER, member.id)
             LOG.debug("Successfully deleted member %s from pool %s", member.id, pool.id)
         except (acos_errors.ACOSException, exceptions.ConnectionError) as e:
             LOG.exception("Failed to delete member: %s", member.id)
@@ -14,6 +14,7 @@
 
 import json
 import logging
+import uuid
 
 from oslo_config import cfg
 
@@ -23,6 +24,11 @@ CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
+def get_ssl_template_name(listener):
+    """Name of the client ssl template shared by the listeners of a certificate"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, listener.tls_certificate_id))
+
+
 def get_cert_data(barbican_client, listener):
     cert_data = Certificate()
     cert_ref = listener.tls_certificate_id
@@ -32,7 +38,7 @@ def get_cert_data(barbican_client, listener):
                             cert_content=cert_container.certificate.payload,
                             key_content=cert_container.private_key.payload,
                             key_pass=cert_container.private_key_passphrase,
-                            template_name=listener.id)
+                            template_name=get_ssl_template_name(listener))
     return cert_data
 
 
@@ -61,7 +61,7 @@ class ListenersParent(object):
                                                                      listener.protocol)
         # Adding TERMINATED_HTTPS SSL cert, created in previous task
         if listener.protocol == 'HTTPS' and listener.tls_certificate_id:
-            template_args["template_client_ssl"] = listener.id
+            template_args["template_client_ssl"] = utils.get_ssl_template_name(listener)
 
         if listener.protocol in a10constants.HTTP_TYPE:
             # TODO(hthompson6) work around for issue in acos client
@@ -19,6 +19,7 @@ from requests import exceptions
 from taskflow import task
 
 
+from a10_octavia.controller.worker.tasks import address_index
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks import utils
 
@@ -52,6 +53,8 @@ class CreateVirtualServerTask(LoadBalancerParent, task.Task):
     def execute(self, loadbalancer, vthunder):
         try:
             self.set(self.axapi_client.slb.virtual_server.create, loadbalancer)
+            address_index.get_index().add(vthunder, address_index.VIRTUAL_SERVER,
+                                          loadbalancer.id, loadbalancer.vip.ip_address)
             LOG.debug("Successfully created load balancer: %s", loadbalancer.id)
         except (acos_errors.ACOSException, exceptions.ConnectionError) as e:
             LOG.exception("Failed to created load balancer: %s", loadbalancer.id)
@@ -62,6 +65,8 @@ class CreateVirtualServerTask(LoadBalancerParent, task.Task):
         try:
             LOG.warning("Reverting creation of load balancer: %s", loadbalancer.id)
             self.axapi_client.slb.virtual_server.delete(loadbalancer.id)
+            address_index.get_index().remove(vthunder, address_index.VIRTUAL_SERVER,
+                                             loadbalancer.id)
         except exceptions.ConnectionError:
             LOG.exception(
                 "Failed to connect A10 Thunder device: %s", vthunder.ip)
@@ -77,6 +82,8 @@ class DeleteVirtualServerTask(task.Task):
     def execute(self, loadbalancer, vthunder):
         try:
             self.axapi_client.slb.virtual_server.delete(loadbalancer.id)
+            address_index.get_index().remove(vthunder, address_index.VIRTUAL_SERVER,
+                                             loadbalancer.id)
             LOG.debug("Successfully deleted load balancer: %s", loadbalancer.id)
         except (acos_errors.ACOSException, exceptions.ConnectionError) as e:
             LOG.exception("Failed to delete load balancer: %s", loadbalancer.id)
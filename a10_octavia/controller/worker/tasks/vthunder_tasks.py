@@ -14,13 +14,8 @@
 
 import acos_client
 from acos_client import errors as acos_errors
-try:
-    import http.client as http_client
-except ImportError:
-    import httplib as http_client
 from requests import exceptions as req_exceptions
 from taskflow import task
-import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -31,11 +26,16 @@ from octavia.common import utils
 from octavia.db import api as db_apis
 
 from a10_octavia.common import a10constants
+from a10_octavia.common import axapi_session_pool
 from a10_octavia.common import exceptions
 from a10_octavia.common import openstack_mappings
 from a10_octavia.common import utils as a10_utils
+from a10_octavia.controller.worker.tasks import address_index
 from a10_octavia.controller.worker.tasks.decorators import axapi_client_decorator
 from a10_octavia.controller.worker.tasks.decorators import device_context_switch_decorator
+from a10_octavia.controller.worker.tasks.decorators import invalidate_partition_cache
+from a10_octavia.controller.worker.tasks import readiness
+from a10_octavia.controller.worker.tasks import write_memory
 
 
 CONF = cfg.CONF
@@ -63,23 +63,7 @@ class VThunderComputeConnectivityWait(VThunderBaseTask):
         try:
             axapi_client = a10_utils.get_axapi_client(vthunder)
             LOG.info("Attempting to connect vThunder device for connection.")
-            attempts = 30
-            while attempts >= 0:
-                try:
-                    attempts = attempts - 1
-                    axapi_client.system.information()
-                    break
-                except (req_exceptions.ConnectionError, acos_errors.ACOSException,
-                        http_client.BadStatusLine, req_exceptions.ReadTimeout):
-                    attemptid = 21 - attempts
-                    time.sleep(20)
-                    LOG.debug("VThunder connection attempt - " + str(attemptid))
-                    pass
-            if attempts < 0:
-                LOG.error("Failed to connect vThunder in expected amount of boot time: %s",
-                          vthunder.id)
-                raise req_exceptions.ConnectionError
-
+            readiness.wait_for_vthunder(axapi_client, vthunder)
         except driver_except.TimeOutException as e:
             LOG.exception("Amphora compute instance failed to become reachable. "
                           "This either means the compute driver failed to fully "
@@ -99,8 +83,8 @@ class AmphoraePostVIPPlug(VThunderBaseTask):
         try:
             self.axapi_client.system.action.write_memory()
             self.axapi_client.system.action.reboot()
-            LOG.debug("Waiting for 30 seconds to trigger vThunder reboot.")
-            time.sleep(30)
+            LOG.debug("Waiting for vThunder %s to reboot.", vthunder.id)
+            readiness.wait_for_vthunder(self.axapi_client, vthunder, after_reboot=True)
             LOG.debug("Successfully rebooted vThunder: %s", vthunder.id)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to save configuration and reboot on vThunder for amphora id: %s",
@@ -119,7 +103,7 @@ class AmphoraePostMemberNetworkPlug(VThunderBaseTask):
             if len(added_ports[amphora_id]) > 0:
                 self.axapi_client.system.action.write_memory()
                 self.axapi_client.system.action.reboot()
-                time.sleep(30)
+                readiness.wait_for_vthunder(self.axapi_client, vthunder, after_reboot=True)
                 LOG.debug("Successfully rebooted vThunder: %s", vthunder.id)
             else:
                 LOG.debug("vThunder reboot is not required for member addition.")
@@ -153,20 +137,14 @@ class EnableInterfaceForMembers(VThunderBaseTask):
             network_driver = utils.get_network_driver()
             nics = network_driver.get_plugged_networks(compute_id)
             if len(added_ports[amphora_id]) > 0:
-                configured_interface = False
-                attempts = 5
-                while attempts > 0 and configured_interface is False:
-                    try:
-                        target_interface = len(nics)
-                        self.axapi_client.system.action.setInterface(target_interface - 1)
-                        configured_interface = True
-                        LOG.debug("Configured the new interface required for member.")
-                    except (req_exceptions.ConnectionError, acos_errors.ACOSException,
-                            http_client.BadStatusLine, req_exceptions.ReadTimeout):
-                        attempts = attempts - 1
+                # The vThunder may still be booting after the member network plug
+                readiness.wait_for_vthunder(self.axapi_client, vthunder)
+                target_interface = len(nics)
+                self.axapi_client.system.action.setInterface(target_interface - 1)
+                LOG.debug("Configured the new interface required for member.")
             else:
                 LOG.debug("Configuration of new interface is not required for member.")
-        except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
+        except readiness.PROBE_ERRORS as e:
             LOG.exception("Failed to configure vthunder interface: %s", str(e))
             raise e
 
@@ -220,8 +198,19 @@ class ConfigureVRRPSync(VThunderBaseTask):
             self.axapi_client.system.action.configSynch(backup_vthunder.ip_address,
                                                         backup_vthunder.username,
                                                         backup_vthunder.password)
-            LOG.debug("Waiting 30 seconds for config synch.")
-            time.sleep(30)
+            LOG.debug("Waiting for the config sync to backup vThunder %s.",
+                      backup_vthunder.id)
+            readiness.wait_for_config_sync(self.axapi_client, vthunder)
+            backup_client = axapi_session_pool.acquire_client(backup_vthunder)
+            discard = False
+            try:
+                readiness.wait_for_vthunder(backup_client, backup_vthunder)
+            except req_exceptions.ConnectionError:
+                discard = True
+                raise
+            finally:
+                axapi_session_pool.release_client(backup_client, backup_vthunder,
+                                                  discard=discard)
             LOG.debug("Sync up for vThunder master")
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed VRRP sync: %s", str(e))
@@ -258,20 +247,12 @@ class ConfigureaVCSBackup(VThunderBaseTask):
     def execute(self, vthunder, device_id=2, device_priority=100,
                 floating_ip="192.168.0.100", floating_ip_mask="255.255.255.0"):
         try:
-            attempts = 30
-            while attempts > 0:
-                # TODO(omkartelee01): Need this loop to be moved in acos_client with
-                # proper exception handling with all other API call loops.
-                # Currently resolves "System is Busy" error
-                try:
-                    configure_avcs(self.axapi_client, device_id, device_priority,
-                                   floating_ip, floating_ip_mask)
-                    attempts = 0
-                    LOG.debug("Configured the backup vThunder for aVCS: %s", vthunder.id)
-                except (req_exceptions.ConnectionError, acos_errors.ACOSException,
-                        http_client.BadStatusLine, req_exceptions.ReadTimeout):
-                    attempts = attempts - 1
-        except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
+            # The backup may still be applying the configuration synced from the master
+            readiness.wait_for_vthunder(self.axapi_client, vthunder)
+            configure_avcs(self.axapi_client, device_id, device_priority,
+                           floating_ip, floating_ip_mask)
+            LOG.debug("Configured the backup vThunder for aVCS: %s", vthunder.id)
+        except readiness.PROBE_ERRORS as e:
             LOG.exception("Failed to configure backup vThunder aVCS: %s", str(e))
             raise e
 
@@ -315,6 +296,7 @@ class CreateHealthMonitorOnVThunder(VThunderBaseTask):
             health_check = a10constants.OCTAVIA_HEALTH_MONITOR
             try:
                 self.axapi_client.slb.server.create(name, ip_address, health_check=health_check)
+                address_index.get_index().add(vthunder, address_index.SERVER, name, ip_address)
                 LOG.debug("Server created successfully. Enabled health check for health monitor.")
             except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
                 LOG.exception("Failed to create health monitor server: %s", str(e))
@@ -358,6 +340,7 @@ class HandleACOSPartitionChange(VThunderBaseTask):
                 axapi_client.system.partition.create(vthunder.partition_name)
                 axapi_client.system.action.write_memory(partition="shared")
                 LOG.info("Partition %s created", vthunder.partition_name)
+            invalidate_partition_cache(vthunder.ip_address, vthunder.partition_name)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
             LOG.exception("Failed to create parition on vThunder: %s", str(e))
             raise e
@@ -476,7 +459,7 @@ class TagInterfaceBaseTask(VThunderBaseTask):
             LOG.warning("Failed to get ve ip from device id %s: %s", str(device_id), str(e))
 
     def get_subnet_and_mask(self, subnet_id):
-        self._subnet = self.network_driver.get_subnet(subnet_id)
+        self._subnet = self.network_driver.get_cached_subnet(subnet_id)
         subnet_ip, subnet_mask = a10_utils.get_net_info_from_cidr(self._subnet.cidr)
         self._subnet_ip = subnet_ip
         self._subnet_mask = subnet_mask
@@ -591,11 +574,7 @@ class TagInterfaceBaseTask(VThunderBaseTask):
 
     def tag_interfaces(self, vthunder, create_vlan_id):
         if vthunder.device_network_map:
-            network_list = self.network_driver.list_networks()
-            vlan_subnet_id_dict = {}
-            for network in network_list:
-                vlan_id = network.provider_segmentation_id
-                vlan_subnet_id_dict[str(vlan_id)] = network.subnets[0]
+            vlan_subnet_id_dict = self.network_driver.get_vlan_subnet_map(create_vlan_id)
             master_device_id = vthunder.device_network_map[0].vcs_device_id
             for device_obj in vthunder.device_network_map:
                 try:
@@ -612,29 +591,15 @@ class TagInterfaceBaseTask(VThunderBaseTask):
     def get_vlan_id(self, subnet_id, is_revert):
         self.get_subnet_and_mask(subnet_id)
         network_id = self._subnet.network_id
-        network = self.network_driver.get_network(network_id)
+        network = self.network_driver.get_cached_network(network_id)
         if network.provider_network_type != 'vlan' and not is_revert:
             LOG.warning('provider_network_type not set to vlan for openstack network: %s',
                         network_id)
         return network.provider_segmentation_id
 
-    def is_vlan_deletable(self):
-        vs_list = self.axapi_client.slb.virtual_server.get(name="")
-        server_list = self.axapi_client.slb.server.get(name="")
-
-        if vs_list:
-            for vs in vs_list["virtual-server-list"]:
-                if a10_utils.check_ip_in_subnet_range(vs["ip-address"], self._subnet_ip,
-                                                      self._subnet_mask):
-                    return False
-
-        if server_list:
-            for server in server_list["server-list"]:
-                if a10_utils.check_ip_in_subnet_range(server["host"], self._subnet_ip,
-                                                      self._subnet_mask):
-                    return False
-
-        return True
+    def is_vlan_deletable(self, vthunder):
+        return address_index.get_index().is_subnet_free(
+            self.axapi_client, vthunder, self._subnet_ip, self._subnet_mask)
 
 
 class TagInterfaceForLB(TagInterfaceBaseTask):
@@ -654,7 +619,7 @@ class TagInterfaceForLB(TagInterfaceBaseTask):
         try:
             if vthunder.device_network_map:
                 vlan_id = self.get_vlan_id(loadbalancer.vip.subnet_id, False)
-                if self.is_vlan_deletable():
+                if self.is_vlan_deletable(vthunder):
                     LOG.warning("Revert TagInterfaceForLB with VLAN id %s", vlan_id)
                     master_device_id = vthunder.device_network_map[0].vcs_device_id
                     for device_obj in vthunder.device_network_map:
@@ -697,7 +662,7 @@ class TagInterfaceForMember(TagInterfaceBaseTask):
         try:
             if vthunder.device_network_map:
                 vlan_id = self.get_vlan_id(member.subnet_id, False)
-                if self.is_vlan_deletable():
+                if self.is_vlan_deletable(vthunder):
                     LOG.warning("Reverting tag interface for member with VLAN id %s", vlan_id)
                     master_device_id = vthunder.device_network_map[0].vcs_device_id
                     for device_obj in vthunder.device_network_map:
@@ -718,7 +683,7 @@ class DeleteInterfaceTagIfNotInUseForLB(TagInterfaceBaseTask):
         try:
             if vthunder.device_network_map:
                 vlan_id = self.get_vlan_id(loadbalancer.vip.subnet_id, False)
-                if self.is_vlan_deletable():
+                if self.is_vlan_deletable(vthunder):
                     master_device_id = vthunder.device_network_map[0].vcs_device_id
                     for device_obj in vthunder.device_network_map:
                         self.delete_device_vlan(vlan_id, loadbalancer.vip.subnet_id, vthunder,
@@ -742,7 +707,7 @@ class DeleteInterfaceTagIfNotInUseForMember(TagInterfaceBaseTask):
         try:
             if vthunder.device_network_map:
                 vlan_id = self.get_vlan_id(member.subnet_id, False)
-                if self.is_vlan_deletable():
+                if self.is_vlan_deletable(vthunder):
                     master_device_id = vthunder.device_network_map[0].vcs_device_id
                     for device_obj in vthunder.device_network_map:
                         self.delete_device_vlan(vlan_id, member.subnet_id, vthunder,
@@ -754,17 +719,30 @@ class DeleteInterfaceTagIfNotInUseForMember(TagInterfaceBaseTask):
 
 
 class WriteMemory(VThunderBaseTask):
-    """Task to write memory of the Thunder device"""
+    """Task to write memory of the Thunder device
+
+    With `write_memory_coalesce_window` set the device partition is only
+    marked dirty and written by the background writer. Flows that need the
+    configuration persisted before they finish pass wait=True.
+    """
+
+    def __init__(self, wait=False, **kwargs):
+        super(WriteMemory, self).__init__(**kwargs)
+        self.wait = wait
 
-    @axapi_client_decorator
     def execute(self, vthunder):
+        if not vthunder:
+            return
+        if CONF.a10_controller_worker.write_memory_coalesce_window > 0:
+            pending = write_memory.get_coalescer().mark_dirty(vthunder)
+            if self.wait:
+                pending.wait()
+        else:
+            self._write_memory(vthunder=vthunder)
+
+    @axapi_client_decorator
+    def _write_memory(self, vthunder):
         try:
-            if vthunder:
-                if vthunder.partition_name != "shared":
-                    self.axapi_client.system.action.write_memory(
-                        partition="specified",
-                        specified_partition=vthunder.partition_name)
-                else:
-                    self.axapi_client.system.action.write_memory(partition="shared")
+            write_memory.save_config(self.axapi_client, vthunder)
         except (acos_errors.ACOSException, req_exceptions.ConnectionError):
             LOG.warning("Failed to write memory on thunder device: %s", vthunder.ip_address)
@@ -0,0 +1,196 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Coalesced `write memory` of Thunder devices
+
+"""
+import atexit
+from concurrent import futures
+import threading
+import time
+
+from acos_client import errors as acos_errors
+from oslo_config import cfg
+from oslo_log import log as logging
+from requests import exceptions as req_exceptions
+
+from a10_octavia.common import axapi_session_pool
+from a10_octavia.controller.worker.tasks import decorators
+
+CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+LOG = logging.getLogger(__name__)
+
+# Devices written concurrently by the background writer
+MAX_CONCURRENT_WRITES = 8
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def save_config(axapi_client, vthunder):
+    """Write the running config of the vThunder partition to memory"""
+    if vthunder.partition_name != "shared":
+        axapi_client.system.action.write_memory(
+            partition="specified",
+            specified_partition=vthunder.partition_name)
+    else:
+        axapi_client.system.action.write_memory(partition="shared")
+
+
+def _write(vthunder):
+    # Pooled clients send their requests through the device scheduler, so
+    # background writes share the write slots of the device with the flows
+    axapi_client = axapi_session_pool.acquire_client(vthunder)
+    discard = False
+    try:
+        if vthunder.partition_name != "shared":
+            decorators.activate_partition(axapi_client, vthunder.partition_name)
+        save_config(axapi_client, vthunder)
+    except req_exceptions.ConnectionError:
+        discard = True
+        raise
+    finally:
+        axapi_session_pool.release_client(axapi_client, vthunder, discard=discard)
+
+
+class PendingWrite(object):
+    """Write memory of one device partition, shared by every flow marking it dirty"""
+
+    def __init__(self, vthunder, due_at):
+        self.vthunder = vthunder
+        self.due_at = due_at
+        self.error = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the write completed, returns False on timeout"""
+        self._done.wait(timeout)
+        return self._done.is_set()
+
+    def write(self):
+        try:
+            _write(self.vthunder)
+        except (acos_errors.ACOSException, req_exceptions.ConnectionError) as e:
+            self.error = e
+            LOG.warning("Failed to write memory on thunder device: %s",
+                        self.vthunder.ip_address)
+        finally:
+            self._done.set()
+
+
+class WriteMemoryCoalescer(object):
+    """Debounces write memory per (device, partition).
+
+    The first flow marking a device partition dirty schedules a write
+    `window` seconds later, and flows marking it dirty until then share that
+    write. A partition is never written concurrently with itself: marks made
+    while its write runs are persisted by the next one.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._writing = set()
+        self._closed = False
+        self._executor = futures.ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WRITES)
+        self._thread = threading.Thread(target=self._run, name='write-memory')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def mark_dirty(self, vthunder):
+        """Schedule a write memory of the vThunder partition.
+
+        :returns: PendingWrite to wait on for durability
+        """
+        key = (vthunder.ip_address, vthunder.partition_name)
+        with self._cond:
+            if not self._closed:
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = PendingWrite(vthunder, time.time() + self.window)
+                    self._pending[key] = pending
+                    self._cond.notify()
+                return pending
+
+        # Shutting down, nothing would write it later
+        pending = PendingWrite(vthunder, time.time())
+        pending.write()
+        return pending
+
+    def _submit(self, key):
+        pending = self._pending.pop(key)
+        self._writing.add(key)
+        future = self._executor.submit(pending.write)
+        future.add_done_callback(lambda f: self._written(key))
+
+    def _written(self, key):
+        with self._cond:
+            self._writing.discard(key)
+            self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                now = time.time()
+                next_due_at = None
+                for key, pending in list(self._pending.items()):
+                    if key in self._writing:
+                        continue
+                    if pending.due_at <= now:
+                        self._submit(key)
+                    elif next_due_at is None or pending.due_at < next_due_at:
+                        next_due_at = pending.due_at
+                self._cond.wait(None if next_due_at is None else next_due_at - now)
+
+    def close(self):
+        """Write every dirty partition now and wait for all writes to complete"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            pending_writes = list(self._pending.values())
+            self._pending.clear()
+        self._executor.shutdown(wait=True)
+        if pending_writes:
+            LOG.info("Writing memory of %s dirty Thunder partitions", len(pending_writes))
+        # Written from the calling thread, as the executor no longer accepts
+        # work once the interpreter is exiting
+        for pending in pending_writes:
+            pending.write()
+
+
+def get_coalescer():
+    global _coalescer
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = WriteMemoryCoalescer(
+                CONF.a10_controller_worker.write_memory_coalesce_window)
+            atexit.register(close)
+        return _coalescer
+
+
+def close():
+    """Persist every dirty device partition, called on shutdown"""
+    global _coalescer
+    with _coalescer_lock:
+        coalescer, _coalescer = _coalescer, None
+    if coalescer is not None:
+        coalescer.close()
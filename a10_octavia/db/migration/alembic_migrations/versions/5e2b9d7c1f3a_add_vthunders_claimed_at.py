@@ -0,0 +1,24 @@
+"""Add the failover claim time of vthunders
+
+Revision ID: 5e2b9d7c1f3a
+Revises: 9c7f5a2d4e1b
+Create Date: 2020-06-22 09:41:07.318524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2b9d7c1f3a'
+down_revision = '9c7f5a2d4e1b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('vthunders', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('vthunders', 'claimed_at')
@@ -0,0 +1,38 @@
+"""Add indexes on the vthunders lookup columns
+
+Revision ID: 9c7f5a2d4e1b
+Revises: 4028e5f7a198
+Create Date: 2020-06-15 10:12:31.520417
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c7f5a2d4e1b'
+down_revision = '4028e5f7a198'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    # Stale vThunder scan of the health manager, ordered by last_udp_update
+    ('ix_vthunders_status_last_udp_update', ['status', 'last_udp_update']),
+    # vThunder of a load balancer by role
+    ('ix_vthunders_loadbalancer_id_role', ['loadbalancer_id', 'role']),
+    # Spare vThunder lookup and count
+    ('ix_vthunders_status_loadbalancer_id', ['status', 'loadbalancer_id']),
+    # Heartbeat source address lookup
+    ('ix_vthunders_ip_address', ['ip_address']),
+    # Amphora sharing check before deleting a compute
+    ('ix_vthunders_compute_id', ['compute_id']),
+)
+
+
+def upgrade():
+    for name, columns in INDEXES:
+        op.create_index(name, 'vthunders', columns)
+
+
+def downgrade():
+    for name, columns in INDEXES:
+        op.drop_index(name, table_name='vthunders')
@@ -28,6 +28,13 @@ from octavia.i18n import _
 class VThunder(base_models.BASE):
     __data_model__ = data_models.VThunder
     __tablename__ = 'vthunders'
+    __table_args__ = (
+        sa.Index('ix_vthunders_status_last_udp_update', 'status', 'last_udp_update'),
+        sa.Index('ix_vthunders_loadbalancer_id_role', 'loadbalancer_id', 'role'),
+        sa.Index('ix_vthunders_status_loadbalancer_id', 'status', 'loadbalancer_id'),
+        sa.Index('ix_vthunders_ip_address', 'ip_address'),
+        sa.Index('ix_vthunders_compute_id', 'compute_id'),
+    )
 
     id = sa.Column(sa.Integer, primary_key=True)
     vthunder_id = sa.Column(sa.String(36), nullable=False)
@@ -49,6 +56,7 @@ class VThunder(base_models.BASE):
     updated_at = sa.Column(u'updated_at', sa.DateTime(), nullable=True)
     partition_name = sa.Column(sa.String(14), nullable=True)
     hierarchical_multitenancy = sa.Column(sa.Boolean(), default=False, nullable=True)
+    claimed_at = sa.Column(u'claimed_at', sa.DateTime(), nullable=True)
 
     @classmethod
     def find_by_loadbalancer_id(cls, loadbalancer_id, db_session=None):
@@ -17,6 +17,7 @@ import datetime
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from sqlalchemy import func
 from sqlalchemy.orm import noload
 from sqlalchemy import or_
 from sqlalchemy import and_
@@ -183,16 +184,54 @@ class BaseRepository(object):
 class VThunderRepository(BaseRepository):
     model_class = models.VThunder
 
-    def get_stale_vthunders(self, session, initial_setup_wait_time, failover_wait_time):
-        model = session.query(self.model_class).filter(
-            self.model_class.created_at < initial_setup_wait_time).filter(
-            self.model_class.last_udp_update < failover_wait_time).filter(
-                self.model_class.status == 'ACTIVE').filter(
-                or_(self.model_class.role == "MASTER",
-                    self.model_class.role == "BACKUP")).first()
-        if model is None:
-            return None
-        return model.to_data_model()
+    def claim_stale_vthunders(self, session, initial_setup_wait_time, failover_wait_time,
+                              claim_expiry_time, limit):
+        """Claim up to limit stale vThunders for failover in a single query.
+
+        The stale rows are locked with SELECT ... FOR UPDATE SKIP LOCKED, so
+        rows already being claimed by another health manager are skipped, and
+        their claimed_at is set to the claim time before the lock is released.
+        A claimed vThunder is not picked again by any health manager until
+        the claim is released with release_vthunder_claim() after a completed
+        failover, or expires, which retries a failed failover.
+
+        :param session: A Sql Alchemy database session.
+        :param initial_setup_wait_time: Ignore vThunders created after this.
+        :param failover_wait_time: Heartbeats older than this are stale.
+        :param claim_expiry_time: Claims older than this were abandoned and
+                                  are claimed again.
+        :param limit: Maximum number of vThunders to claim.
+        :returns: List of claimed vThunder data models, oldest heartbeat first
+        """
+        with session.begin(subtransactions=True):
+            models = session.query(self.model_class).filter(
+                self.model_class.created_at < initial_setup_wait_time).filter(
+                self.model_class.last_udp_update < failover_wait_time).filter(
+                    self.model_class.status == 'ACTIVE').filter(
+                    or_(self.model_class.role == "MASTER",
+                        self.model_class.role == "BACKUP")).filter(
+                    or_(self.model_class.claimed_at.is_(None),
+                        self.model_class.claimed_at < claim_expiry_time)).order_by(
+                self.model_class.last_udp_update).limit(limit).with_for_update(
+                skip_locked=True).all()
+            if not models:
+                return []
+            claimed_at = datetime.datetime.utcnow()
+            session.query(self.model_class).filter(
+                self.model_class.id.in_([model.id for model in models])).update(
+                {self.model_class.claimed_at: claimed_at},
+                synchronize_session=False)
+            vthunders = [model.to_data_model() for model in models]
+            for vthunder in vthunders:
+                vthunder.claimed_at = claimed_at
+        return vthunders
+
+    def release_vthunder_claim(self, session, vthunder_id):
+        """Release the failover claim of a vThunder after a completed failover"""
+        with session.begin(subtransactions=True):
+            session.query(self.model_class).filter(
+                self.model_class.vthunder_id == vthunder_id).update(
+                {self.model_class.claimed_at: None}, synchronize_session=False)
 
     def get_vthunder_from_lb(self, session, lb_id):
         model = session.query(self.model_class).filter(
@@ -248,6 +287,37 @@ class VThunderRepository(BaseRepository):
             return None
         return model.id
 
+    def get_ip_address_ids(self, session, updated_since=None):
+        """Retrieves (id, ip_address, updated_at) of the vThunders.
+
+        :param session: A Sql Alchemy database session.
+        :param updated_since: Only return vThunders updated at or after this datetime.
+        :returns: list of (id, ip_address, updated_at) tuples
+        """
+        query = session.query(self.model_class.id, self.model_class.ip_address,
+                              self.model_class.updated_at)
+        if updated_since:
+            query = query.filter(self.model_class.updated_at >= updated_since)
+        return query.all()
+
+    def update_last_udp_update(self, session, ids, last_udp_update):
+        """Bulk update the heartbeat timestamp of the given vThunders.
+
+        :param session: A Sql Alchemy database session.
+        :param ids: Iterable of vThunder record ids.
+        :param last_udp_update: datetime to store as last_udp_update.
+        :returns: Number of updated rows
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        with session.begin(subtransactions=True):
+            count = session.query(self.model_class).filter(
+                self.model_class.id.in_(ids)).update(
+                    {self.model_class.last_udp_update: last_udp_update},
+                    synchronize_session=False)
+        return count
+
     def get_spare_vthunder(self, session):
         model = session.query(self.model_class).filter(
             self.model_class.status == "READY").first()
@@ -301,6 +371,65 @@ class VRIDRepository(BaseRepository):
         return model.to_data_model()
 
 
+class ListenerRepository(repo.ListenerRepository):
+
+    def get_certificate_usage_count(self, session, listener_id, tls_certificate_id,
+                                    ip_address, partition_name):
+        """Count the other listeners using the certificate on the device partition"""
+        listener = base_models.Listener
+        vthunder = models.VThunder
+        query = session.query(func.count(listener.id.distinct())).join(
+            vthunder, vthunder.loadbalancer_id == listener.load_balancer_id).filter(
+            listener.id != listener_id,
+            listener.tls_certificate_id == tls_certificate_id,
+            listener.provisioning_status != consts.DELETED,
+            vthunder.ip_address == ip_address)
+        if partition_name and partition_name != 'shared':
+            query = query.filter(vthunder.partition_name == partition_name)
+        else:
+            query = query.filter(or_(vthunder.partition_name.is_(None),
+                                     vthunder.partition_name == 'shared'))
+        return query.scalar()
+
+    def get_listeners_with_vthunder(self, session):
+        """Retrieves the listeners of the active vThunders, with the vThunder.
+
+        :param session: A Sql Alchemy database session.
+        :returns: list of (vThunder data model, listener id, load balancer id,
+                  protocol, protocol port) tuples
+        """
+        listener = base_models.Listener
+        vthunder = models.VThunder
+        rows = session.query(vthunder, listener.id, listener.load_balancer_id,
+                             listener.protocol, listener.protocol_port).join(
+            listener, listener.load_balancer_id == vthunder.loadbalancer_id).filter(
+            vthunder.status == 'ACTIVE',
+            or_(vthunder.role == "STANDALONE", vthunder.role == "MASTER"),
+            listener.provisioning_status != consts.DELETED).all()
+        return [(row[0].to_data_model(),) + tuple(row[1:]) for row in rows]
+
+    def get_statistics(self, session, listener_ids):
+        """Retrieves the statistics stored by the provider driver for the listeners.
+
+        :param session: A Sql Alchemy database session.
+        :param listener_ids: Iterable of listener ids.
+        :returns: dict of listener id to dict of statistics
+        """
+        listener_ids = list(listener_ids)
+        if not listener_ids:
+            return {}
+        stats = base_models.ListenerStatistics
+        models_list = session.query(stats).filter(
+            stats.listener_id.in_(listener_ids),
+            stats.amphora_id == stats.listener_id).all()
+        return {model.listener_id: {consts.ACTIVE_CONNECTIONS: model.active_connections,
+                                    consts.BYTES_IN: model.bytes_in,
+                                    consts.BYTES_OUT: model.bytes_out,
+                                    consts.REQUEST_ERRORS: model.request_errors,
+                                    consts.TOTAL_CONNECTIONS: model.total_connections}
+                for model in models_list}
+
+
 class MemberRepository(repo.MemberRepository):
 
     def get_member_count(self, session, project_id):
@@ -309,3 +438,15 @@ class MemberRepository(repo.MemberRepository):
                  or_(self.model_class.provisioning_status == consts.PENDING_DELETE,
                      self.model_class.provisioning_status == consts.ACTIVE))).count()
         return count
+
+    def get_subnet_usage_count(self, session, project_id, subnet_id):
+        """Count the VIPs and members of the project placed on the subnet"""
+        vips = session.query(base_models.Vip.subnet_id).join(
+            base_models.LoadBalancer,
+            base_models.Vip.load_balancer_id == base_models.LoadBalancer.id).filter(
+            base_models.LoadBalancer.project_id == project_id,
+            base_models.Vip.subnet_id == subnet_id)
+        members = session.query(self.model_class.subnet_id).filter(
+            self.model_class.project_id == project_id,
+            self.model_class.subnet_id == subnet_id)
+        return vips.union_all(members).count()
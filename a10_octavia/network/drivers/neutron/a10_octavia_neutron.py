@@ -12,15 +12,20 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+import time
+
 from neutronclient.common import exceptions as neutron_client_exceptions
 from oslo_config import cfg
 from oslo_log import log as logging
 from stevedore import driver as stevedore_driver
 
+from octavia.i18n import _
 from octavia.network import data_models as n_data_models
 from octavia.network.drivers.neutron import allowed_address_pairs
 from octavia.network.drivers.neutron import utils
 
+from a10_octavia.common import cache
 from a10_octavia.common import exceptions
 from a10_octavia.network import data_models
 
@@ -30,6 +35,117 @@ VIP_SECURITY_GRP_PREFIX = 'lb-'
 OCTAVIA_OWNER = 'Octavia'
 
 CONF = cfg.CONF
+CONF.import_group('a10_controller_worker', 'a10_octavia.common.config_options')
+
+_network_cache = None
+_network_cache_lock = threading.Lock()
+_port_index = None
+_port_index_lock = threading.Lock()
+
+
+class NetworkCache(object):
+    """Neutron networks and subnets shared by all network driver instances.
+
+    Besides the networks and subnets looked up by id, it keeps an index of
+    the first subnet of every network keyed by the network segmentation id,
+    which VLAN tagging needs for every configured VLAN. The index is built
+    from a single list of all networks and rebuilt once it expired. No flow
+    changes neutron networks or subnets, so the ttl is the only bound on
+    how long a change made outside of a10-octavia goes unnoticed.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.networks = cache.TTLCache(ttl, max_size)
+        self.subnets = cache.TTLCache(ttl, max_size)
+        self._lock = threading.Lock()
+        self._segmentation_index = None
+        self._indexed_at = 0
+
+    def get_segmentation_index(self):
+        with self._lock:
+            if (self._segmentation_index is None or
+                    time.time() - self._indexed_at > self.ttl):
+                return None
+            return self._segmentation_index
+
+    def index_networks(self, networks):
+        """Cache the networks and return their segmentation id index"""
+        index = {}
+        for network in networks:
+            self.networks.set(network.id, network)
+            if network.subnets:
+                index[str(network.provider_segmentation_id)] = network.subnets[0]
+        if self.ttl > 0:
+            with self._lock:
+                self._segmentation_index = index
+                self._indexed_at = time.time()
+        return index
+
+
+class PortIndex(object):
+    """IP address to port id index of the Octavia owned neutron ports.
+
+    Used when neutron rejects filtering ports by fixed ip. The index is
+    loaded from one listing of all Octavia owned ports, and kept up to date
+    by the ports this process creates and deletes. A lookup missing the
+    index reloads it at most once every `ttl` seconds, to pick up ports
+    created by other controllers.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.server_filtering = True
+        self._lock = threading.Lock()
+        self._port_ids = {}
+        self._loaded_at = None
+
+    def is_stale(self):
+        with self._lock:
+            return self._loaded_at is None or time.time() - self._loaded_at > self.ttl
+
+    def load(self, ports):
+        port_ids = {}
+        for port in ports:
+            for fixed_ip in port.get('fixed_ips') or []:
+                if fixed_ip.get('ip_address'):
+                    port_ids[fixed_ip['ip_address']] = port['id']
+        with self._lock:
+            self._port_ids = port_ids
+            self._loaded_at = time.time()
+
+    def get(self, ip):
+        with self._lock:
+            return self._port_ids.get(ip)
+
+    def add_port(self, port_id, ip_addresses):
+        with self._lock:
+            for ip in ip_addresses:
+                self._port_ids[ip] = port_id
+
+    def remove_port(self, port_id):
+        with self._lock:
+            for ip in [ip for ip, indexed_id in self._port_ids.items()
+                       if indexed_id == port_id]:
+                del self._port_ids[ip]
+
+
+def get_port_index():
+    global _port_index
+    with _port_index_lock:
+        if _port_index is None:
+            _port_index = PortIndex(CONF.a10_controller_worker.network_cache_ttl)
+        return _port_index
+
+
+def get_network_cache():
+    global _network_cache
+    with _network_cache_lock:
+        if _network_cache is None:
+            _network_cache = NetworkCache(
+                CONF.a10_controller_worker.network_cache_ttl,
+                CONF.a10_controller_worker.network_cache_max_size)
+        return _network_cache
 
 
 class A10OctaviaNeutronDriver(allowed_address_pairs.AllowedAddressPairsDriver):
@@ -150,33 +266,52 @@ class A10OctaviaNeutronDriver(allowed_address_pairs.AllowedAddressPairsDriver):
             message = "Error creating port in network: {0}".format(network_id)
             LOG.exception(message)
             raise exceptions.PortCreationFailedException(message)
+        get_port_index().add_port(new_port.id, [fixed_ip.ip_address
+                                                for fixed_ip in new_port.fixed_ips or []])
         return new_port
 
     def delete_port(self, port_id):
         try:
             self.neutron_client.delete_port(port_id)
+            get_port_index().remove_port(port_id)
         except Exception:
             message = "Error deleting port: {0}".format(port_id)
             LOG.exception(message)
 
+    def _find_port_id(self, ports, ip):
+        for port in ports:
+            for ipaddr in port.get('fixed_ips') or []:
+                if ipaddr.get('ip_address') == ip:
+                    return port['id']
+        return None
+
     def get_port_id_from_ip(self, ip):
+        if not ip:
+            return None
+        port_index = get_port_index()
         try:
-            ports = self.neutron_client.list_ports(device_owner=OCTAVIA_OWNER)
-            if not ports or not ports.get('ports'):
-                return None
-            for port in ports['ports']:
-                if port.get('fixed_ips'):
-                    fixed_ips = port['fixed_ips']
-                    for ipaddr in fixed_ips:
-                        if ipaddr.get('ip_address') == ip:
-                            return port['id']
+            if port_index.server_filtering:
+                try:
+                    ports = self.neutron_client.list_ports(
+                        device_owner=OCTAVIA_OWNER, fixed_ips=['ip_address=' + ip])
+                    return self._find_port_id(ports.get('ports') or [], ip)
+                except neutron_client_exceptions.BadRequest:
+                    LOG.warning("Neutron does not filter ports by fixed ip, "
+                                "looking up ports in the local port index")
+                    port_index.server_filtering = False
+
+            port_id = port_index.get(ip)
+            if port_id is None and port_index.is_stale():
+                ports = self.neutron_client.list_ports(device_owner=OCTAVIA_OWNER)
+                port_index.load(ports.get('ports') or [])
+                port_id = port_index.get(ip)
+            return port_id
         except (neutron_client_exceptions.NotFound,
                 neutron_client_exceptions.PortNotFoundClient):
             pass
         except Exception:
             message = _('Error listing ports, ip {} ').format(ip)
             LOG.exception(message)
-            pass
         return None
 
     def list_networks(self):
@@ -196,3 +331,34 @@ class A10OctaviaNeutronDriver(allowed_address_pairs.AllowedAddressPairsDriver):
                 provider_segmentation_id=network.get('provider:segmentation_id'),
                 router_external=network.get('router:external')))
         return network_list_datamodel
+
+    def get_cached_network(self, network_id):
+        """get_network() of the VLAN tagging, cached for network_cache_ttl"""
+        network_cache = get_network_cache()
+        network = network_cache.networks.get(network_id)
+        if network is None:
+            network = self.get_network(network_id)
+            network_cache.networks.set(network_id, network)
+        return network
+
+    def get_cached_subnet(self, subnet_id):
+        """get_subnet() of the VLAN tagging, cached for network_cache_ttl"""
+        network_cache = get_network_cache()
+        subnet = network_cache.subnets.get(subnet_id)
+        if subnet is None:
+            subnet = self.get_subnet(subnet_id)
+            network_cache.subnets.set(subnet_id, subnet)
+        return subnet
+
+    def get_vlan_subnet_map(self, segmentation_id=None):
+        """Return the first subnet id of every network by segmentation id
+
+        Networks are only listed when the cached index expired, or when it
+        does not know `segmentation_id` yet.
+        """
+        network_cache = get_network_cache()
+        index = network_cache.get_segmentation_index()
+        if index is None or (segmentation_id is not None and
+                             str(segmentation_id) not in index):
+            index = network_cache.index_networks(self.list_networks())
+        return dict(index)
@@ -0,0 +1,88 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""CPU time of compiling the L7 policies of a listener to aFlex scripts.
+
+Compiles every policy of listeners holding 1,000 L7 rules in total, split
+into a single policy or many smaller ones: from scratch with PolicyUtil,
+with the caching PolicyCompiler when nothing changed, and with the
+PolicyCompiler after one rule of one policy changed.
+
+    python -m a10_octavia.tests.benchmark.aflex_compile [rules]
+"""
+import sys
+import timeit
+
+from octavia.common import data_models as o_data_models
+
+from a10_octavia.controller.worker.tasks import policy
+
+DEFAULT_RULES = 1000
+POLICY_COUNTS = (1, 10, 50)
+REPEAT = 20
+RULE_TYPES = (('HOST_NAME', 'EQUAL_TO'), ('PATH', 'STARTS_WITH'), ('FILE_TYPE', 'EQUAL_TO'),
+              ('HEADER', 'CONTAINS'), ('COOKIE', 'REGEX'))
+
+
+def _listener_policies(rules, policies):
+    l7policies = []
+    for policy_index in range(policies):
+        l7policy = o_data_models.L7Policy(
+            id='l7policy-%d' % policy_index, action='REDIRECT_TO_POOL',
+            redirect_pool=o_data_models.Pool(id='pool-%d' % policy_index))
+        for rule_index in range(policy_index, rules, policies):
+            rule_type, compare_type = RULE_TYPES[rule_index % len(RULE_TYPES)]
+            l7policy.l7rules.append(o_data_models.L7Rule(
+                id='l7rule-%d' % rule_index, type=rule_type, compare_type=compare_type,
+                key='X-Key-%d' % rule_index, value='value-%d' % rule_index,
+                invert=rule_index % 7 == 0))
+        l7policies.append(l7policy)
+    return l7policies
+
+
+def _compile_all(util, l7policies):
+    for l7policy in l7policies:
+        util.createPolicy(l7policy)
+
+
+def _best(func):
+    return min(timeit.repeat(func, number=1, repeat=REPEAT))
+
+
+def main():
+    rules = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RULES
+    print('%-22s %14s %14s %14s' % ('%d rules' % rules, 'PolicyUtil', 'cached',
+                                    'one rule edit'))
+    for policies in POLICY_COUNTS:
+        l7policies = _listener_policies(rules, policies)
+        full = _best(lambda: _compile_all(policy.PolicyUtil(), l7policies))
+
+        compiler = policy.PolicyCompiler(cache_size=1024)
+        _compile_all(compiler, l7policies)
+        cached = _best(lambda: _compile_all(compiler, l7policies))
+
+        edited_rule = l7policies[0].l7rules[0]
+        edits = iter(range(REPEAT))
+
+        def edit_and_compile():
+            edited_rule.value = 'edited-%d' % next(edits)
+            _compile_all(compiler, l7policies)
+        edited = _best(edit_and_compile)
+
+        print('%-22s %12.3fms %12.3fms %12.3fms' % (
+            '%d policies' % policies, full * 1000, cached * 1000, edited * 1000))
+
+
+if __name__ == '__main__':
+    main()
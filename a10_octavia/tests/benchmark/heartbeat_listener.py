@@ -0,0 +1,103 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Packets per second micro-benchmark of the heartbeat listeners.
+
+Floods a listener bound to the loopback interface from a separate process
+and reports how many heartbeats it consumed per second. Database writes are
+mocked out, so only packet intake and batching are measured.
+
+    python -m a10_octavia.tests.benchmark.heartbeat_listener [seconds]
+"""
+import multiprocessing
+import socket
+import sys
+import threading
+import time
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+
+from a10_octavia.cmd import vthunder_heartbeat_udp as heartbeat_udp
+from a10_octavia.common import config_options  # noqa
+
+CONF = cfg.CONF
+PAYLOAD = b'x' * 256
+DEFAULT_DURATION = 5
+
+
+def _flood(sockaddr, duration):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        for i in range(1000):
+            try:
+                sock.sendto(PAYLOAD, sockaddr)
+            except socket.error:
+                pass
+    sock.close()
+
+
+def _serve_socket(getter, exit_event):
+    while not exit_event.is_set():
+        getter.check()
+    getter.flush()
+
+
+def _serve_asyncio(getter, exit_event):
+    getter.run(exit_event)
+
+
+def _measure(getter, serve, duration):
+    getter.vthunder_repo = mock.Mock()
+    getter.address_index.lookup = mock.Mock(return_value={1})
+    exit_event = threading.Event()
+    listener = threading.Thread(target=serve, args=(getter, exit_event))
+    listener.start()
+    sender = multiprocessing.Process(target=_flood,
+                                     args=(getter.sock.getsockname(), duration))
+    sender.start()
+    sender.join()
+    exit_event.set()
+    listener.join()
+    getter.sock.close()
+    return getter.packets_received / float(duration)
+
+
+def main():
+    duration = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DURATION
+    CONF([], project='a10-octavia')
+    CONF.set_override('bind_ip', '127.0.0.1', group='a10_health_manager')
+    CONF.set_override('bind_port', 0, group='a10_health_manager')
+    CONF.set_override('sock_rlimit', 4 * 1024 * 1024, group='a10_health_manager')
+
+    listeners = [('socket', _serve_socket, heartbeat_udp.VThunderUDPStatusGetter)]
+    try:
+        from a10_octavia.cmd import vthunder_heartbeat_async as heartbeat_async
+        listeners.append(('asyncio', _serve_asyncio,
+                          heartbeat_async.VThunderAsyncUDPStatusGetter))
+    except ImportError:
+        print('asyncio listener requires python 3, skipping it')
+
+    with mock.patch.object(heartbeat_udp.db_api, 'get_session'):
+        for name, serve, getter_class in listeners:
+            rate = _measure(getter_class(), serve, duration)
+            print('%-8s %12.0f heartbeats/s' % (name, rate))
+
+
+if __name__ == '__main__':
+    main()
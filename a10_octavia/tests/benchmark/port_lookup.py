@@ -0,0 +1,108 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Latency of A10OctaviaNeutronDriver.get_port_id_from_ip on many ports.
+
+Times the lookup of a VE port by ip address against a fake neutron client
+holding Octavia owned ports: scanning the full port listing, filtering by
+fixed ip on the server, and the local port index used when neutron does
+not support the filter. Port listings are returned as decoded JSON, as the
+real client does, so the cost of transferring every port is accounted.
+
+    python -m a10_octavia.tests.benchmark.port_lookup [ports]
+"""
+import json
+import sys
+import timeit
+
+from neutronclient.common import exceptions as neutron_client_exceptions
+
+from a10_octavia.network.drivers.neutron import a10_octavia_neutron
+
+DEFAULT_PORTS = 50000
+REPEAT = 20
+
+
+def _ip(i):
+    return '10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i & 255)
+
+
+class FakeNeutronClient(object):
+
+    def __init__(self, ports, server_filtering=True):
+        self.server_filtering = server_filtering
+        self._ports = [{'id': 'port-%d' % i,
+                        'device_owner': a10_octavia_neutron.OCTAVIA_OWNER,
+                        'network_id': 'network-%d' % (i % 100),
+                        'fixed_ips': [{'subnet_id': 'subnet-%d' % (i % 100),
+                                       'ip_address': _ip(i)}]}
+                       for i in range(ports)]
+        self._by_ip = dict((port['fixed_ips'][0]['ip_address'], port) for port in self._ports)
+        self._listing = json.dumps({'ports': self._ports})
+
+    def list_ports(self, device_owner=None, fixed_ips=None):
+        if fixed_ips is None:
+            return json.loads(self._listing)
+        if not self.server_filtering:
+            raise neutron_client_exceptions.BadRequest()
+        ip = fixed_ips[0].split('=', 1)[1]
+        port = self._by_ip.get(ip)
+        return json.loads(json.dumps({'ports': [port] if port else []}))
+
+
+def _scan_all_ports(client, ip):
+    """get_port_id_from_ip before the fixed ip filter and the port index"""
+    for port in client.list_ports(device_owner=a10_octavia_neutron.OCTAVIA_OWNER)['ports']:
+        for ipaddr in port.get('fixed_ips') or []:
+            if ipaddr.get('ip_address') == ip:
+                return port['id']
+
+
+def _driver(client):
+    driver = a10_octavia_neutron.A10OctaviaNeutronDriver.__new__(
+        a10_octavia_neutron.A10OctaviaNeutronDriver)
+    driver.neutron_client = client
+    return driver
+
+
+def main():
+    ports = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORTS
+    ip = _ip(ports // 2)
+
+    client = FakeNeutronClient(ports)
+    full_scan = min(timeit.repeat(lambda: _scan_all_ports(client, ip), number=1, repeat=REPEAT))
+
+    a10_octavia_neutron._port_index = None
+    driver = _driver(client)
+    filtered = min(timeit.repeat(lambda: driver.get_port_id_from_ip(ip),
+                                 number=1, repeat=REPEAT))
+
+    a10_octavia_neutron._port_index = None
+    driver = _driver(FakeNeutronClient(ports, server_filtering=False))
+    # The first lookup loads the index from one full listing
+    started = timeit.default_timer()
+    driver.get_port_id_from_ip(ip)
+    index_load = timeit.default_timer() - started
+    indexed = min(timeit.repeat(lambda: driver.get_port_id_from_ip(ip),
+                                number=1, repeat=REPEAT))
+
+    print('%-34s %12s' % ('lookup (%d ports)' % ports, 'latency'))
+    print('%-34s %10.3fms' % ('full listing scan', full_scan * 1000))
+    print('%-34s %10.3fms' % ('server side fixed_ips filter', filtered * 1000))
+    print('%-34s %10.3fms' % ('local port index (first lookup)', index_load * 1000))
+    print('%-34s %10.3fms' % ('local port index', indexed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Latency of the vthunders lookup queries with and without their indexes.
+
+Seeds an in-memory SQLite database, or the database given as an SQLAlchemy
+url, with vThunders and times the queries of VThunderRepository before and
+after creating the indexes of the vthunders table.
+
+    python -m a10_octavia.tests.benchmark.vthunder_queries [rows] [db_url]
+"""
+import datetime
+import sys
+import timeit
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy import or_
+from sqlalchemy import orm
+
+from a10_octavia.db import models
+
+DEFAULT_ROWS = 100000
+REPEAT = 20
+NOW = datetime.datetime(2020, 6, 1)
+
+
+def _seed(engine, rows):
+    vthunders = []
+    for i in range(rows):
+        # One in a hundred vThunders is a spare, the others are paired
+        spare = i % 100 == 0
+        vthunders.append({
+            'vthunder_id': str(uuid.uuid4()),
+            'project_id': 'project-%d' % (i % 500),
+            'amphora_id': str(uuid.uuid4()),
+            'device_name': 'vthunder-%d' % i,
+            'ip_address': '10.%d.%d.%d' % (i >> 16 & 255, i >> 8 & 255, i & 255),
+            'username': 'admin',
+            'password': 'a10',
+            'axapi_version': 30,
+            'undercloud': False,
+            'loadbalancer_id': None if spare else 'lb-%d' % (i // 2),
+            'compute_id': 'compute-%d' % (i // 2),
+            'topology': 'ACTIVE_STANDBY',
+            'role': 'MASTER' if i % 2 == 0 else 'BACKUP',
+            'last_udp_update': NOW - datetime.timedelta(seconds=i % 3600),
+            'status': 'READY' if spare else 'ACTIVE',
+            'created_at': NOW - datetime.timedelta(days=1),
+            'updated_at': NOW - datetime.timedelta(days=1),
+        })
+    with engine.begin() as conn:
+        conn.execute(models.VThunder.__table__.insert(), vthunders)
+
+
+def _queries(session, rows):
+    model = models.VThunder
+    middle = rows // 2
+    return [
+        ('claim_stale_vthunders', lambda: session.query(model).filter(
+            model.created_at < NOW).filter(
+            model.last_udp_update < NOW - datetime.timedelta(hours=2)).filter(
+            model.status == 'ACTIVE').filter(
+            or_(model.role == 'MASTER', model.role == 'BACKUP')).filter(
+            or_(model.claimed_at.is_(None), model.claimed_at < NOW)).order_by(
+            model.last_udp_update).limit(10).all()),
+        ('get_vthunder_from_lb', lambda: session.query(model).filter(
+            model.loadbalancer_id == 'lb-%d' % (middle // 2)).filter(
+            or_(model.role == 'STANDALONE', model.role == 'MASTER')).first()),
+        ('get_vthunder_from_src_addr', lambda: session.query(model).filter(
+            model.ip_address == '10.%d.%d.%d' % (
+                middle >> 16 & 255, middle >> 8 & 255, middle & 255)).first()),
+        ('get_spare_vthunder_count', lambda: session.query(model).filter_by(
+            status='READY', loadbalancer_id=None).count()),
+        ('get_delete_compute_flag', lambda: session.query(model).filter(
+            model.compute_id == 'compute-%d' % (middle // 2)).count()),
+    ]
+
+
+def _time(session, rows):
+    results = {}
+    for name, query in _queries(session, rows):
+        results[name] = min(timeit.repeat(query, number=1, repeat=REPEAT))
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    url = sys.argv[2] if len(sys.argv) > 2 else 'sqlite://'
+    engine = sa.create_engine(url)
+    table = models.VThunder.__table__
+    table.create(engine)
+    try:
+        for index in table.indexes:
+            index.drop(engine)
+        _seed(engine, rows)
+        session = orm.sessionmaker(bind=engine)()
+
+        before = _time(session, rows)
+        for index in table.indexes:
+            index.create(engine)
+        after = _time(session, rows)
+        session.close()
+    finally:
+        table.drop(engine)
+
+    print('%-28s %12s %12s' % ('query (%d rows)' % rows, 'no index', 'indexed'))
+    for name, query in _queries(None, rows):
+        print('%-28s %10.3fms %10.3fms' % (name, before[name] * 1000, after[name] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -47,5 +47,6 @@ MOCK_PROJECT_ID = 'mock-project-id'
 
 A10_GLOBAL_CONF_SECTION = 'a10_global'
 A10_HARDWARE_THUNDER_CONF_SECTION = 'hardware_thunder'
+A10_CONTROLLER_WORKER_CONF_SECTION = 'a10_controller_worker'
 LISTENER_CONF_SECTION = 'listener'
 SERVICE_GROUP_CONF_SECTION = 'service_group'
@@ -0,0 +1,55 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia_lib.api.drivers import data_models as driver_dm
+from octavia_lib.api.drivers import exceptions as driver_exceptions
+
+from octavia.tests.unit import base
+
+from a10_octavia.api.drivers import driver
+
+
+class TestA10ProviderDriver(base.TestCase):
+
+    @mock.patch('oslo_messaging.RPCClient', mock.Mock())
+    @mock.patch('oslo_messaging.get_rpc_transport', mock.Mock())
+    def setUp(self):
+        super(TestA10ProviderDriver, self).setUp()
+        self.driver = driver.A10ProviderDriver()
+        self.driver.client = mock.Mock()
+        self.driver.repositories = mock.Mock()
+        db_session = mock.patch('octavia.db.api.get_session')
+        db_session.start()
+        self.addCleanup(db_session.stop)
+
+    def test_member_batch_update(self):
+        db_pool = mock.Mock(members=[mock.Mock(id='member-1'), mock.Mock(id='member-2')])
+        self.driver.repositories.pool.get.return_value = db_pool
+        members = [driver_dm.Member(member_id='member-2', pool_id='pool-1', weight=5),
+                   driver_dm.Member(member_id='member-3', pool_id='pool-1')]
+        self.driver.member_batch_update(members)
+        self.driver.client.cast.assert_called_once_with(
+            {}, 'batch_update_members', old_member_ids=['member-1'],
+            new_member_ids=['member-3'],
+            updated_members=[{'id': 'member-2', 'pool_id': 'pool-1', 'weight': 5}])
+
+    def test_member_batch_update_empty(self):
+        self.assertRaises(driver_exceptions.UnsupportedOptionError,
+                          self.driver.member_batch_update, [])
+        self.driver.client.cast.assert_not_called()
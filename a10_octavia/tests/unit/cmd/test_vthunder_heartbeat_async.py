@@ -0,0 +1,111 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import six
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+if six.PY3:
+    from a10_octavia.cmd import vthunder_heartbeat_async as heartbeat_async
+
+IP_1 = "10.0.0.1"
+IP_2 = "10.0.0.2"
+IP_3 = "10.0.0.3"
+TIME_1 = datetime.datetime(2020, 1, 1, 0, 0, 1)
+
+
+@unittest.skipIf(six.PY2, "asyncio listener requires python 3")
+@mock.patch('a10_octavia.cmd.vthunder_heartbeat_udp.db_api.get_session', mock.Mock())
+class TestVThunderAsyncUDPStatusGetter(base.TestCase):
+
+    def setUp(self):
+        super(TestVThunderAsyncUDPStatusGetter, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group='a10_health_manager', heartbeat_batch_interval=5,
+                         heartbeat_batch_size=1)
+        socket_patcher = mock.patch('socket.socket')
+        socket_patcher.start()
+        self.addCleanup(socket_patcher.stop)
+        self.getter = heartbeat_async.VThunderAsyncUDPStatusGetter()
+        self.getter.vthunder_repo = mock.Mock()
+        self.getter.address_index.lookup = mock.Mock(return_value={1})
+        self.getter.schedule_flush = mock.Mock()
+
+    def _receive(self, *ips):
+        packets = [(64, (ip, 5550)) for ip in ips]
+        self.getter.sock.recvfrom_into.side_effect = packets + [BlockingIOError()]
+
+    def test_on_readable_drains_socket(self):
+        self._receive(IP_1, IP_1)
+        self.getter.on_readable()
+        self.assertEqual([IP_1], list(self.getter.pending))
+        self.assertEqual(2, self.getter.packets_received)
+        self.assertEqual(3, self.getter.sock.recvfrom_into.call_count)
+        self.getter.schedule_flush.assert_called_once_with()
+
+    def test_on_readable_reuses_buffer(self):
+        self._receive(IP_1, IP_2)
+        self.getter.on_readable()
+        buffers = set(id(call[0][0]) for call in
+                      self.getter.sock.recvfrom_into.call_args_list)
+        self.assertEqual({id(self.getter.buffer)}, buffers)
+
+    def test_on_readable_drops_new_addresses_when_full(self):
+        self.getter.max_pending = 2
+        self._receive(IP_1, IP_2, IP_3, IP_1)
+        self.getter.on_readable()
+        self.assertEqual({IP_1, IP_2}, set(self.getter.pending))
+        self.assertEqual(1, self.getter.packets_dropped)
+
+    @mock.patch.object(heartbeat_async, 'MAX_DATAGRAMS_PER_WAKEUP', 2)
+    def test_on_readable_bounds_reads_per_wakeup(self):
+        self._receive(IP_1, IP_2, IP_3)
+        self.getter.on_readable()
+        self.assertEqual(2, self.getter.sock.recvfrom_into.call_count)
+
+    def test_schedule_flush_writes_in_executor(self):
+        del self.getter.schedule_flush
+        self.getter.loop = mock.Mock()
+        self.getter.add_heartbeat(IP_1, TIME_1)
+        self.getter.schedule_flush()
+        self.assertEqual({}, self.getter.pending)
+        self.getter.loop.run_in_executor.assert_called_once_with(
+            None, self.getter.write_batches, {IP_1: TIME_1})
+
+    def test_write_batches_splits_pending(self):
+        self.getter.batch_size = 2
+        self.getter.write_batch = mock.Mock()
+        self.getter.write_batches({IP_1: TIME_1, IP_2: TIME_1, IP_3: TIME_1})
+        self.assertEqual([{IP_1: TIME_1, IP_2: TIME_1}, {IP_3: TIME_1}],
+                         [call[0][0] for call in self.getter.write_batch.call_args_list])
+
+    def test_schedule_flush_skips_while_flushing(self):
+        del self.getter.schedule_flush
+        self.getter.loop = mock.Mock()
+        self.getter.flushing = mock.Mock()
+        self.getter.flushing.done.return_value = False
+        self.getter.add_heartbeat(IP_1, TIME_1)
+        self.getter.schedule_flush()
+        self.assertEqual([IP_1], list(self.getter.pending))
+        self.getter.loop.run_in_executor.assert_not_called()
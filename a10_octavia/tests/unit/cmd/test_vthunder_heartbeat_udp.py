@@ -0,0 +1,160 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import socket
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+
+from a10_octavia.cmd import vthunder_heartbeat_udp as heartbeat_udp
+from a10_octavia.common import config_options  # noqa
+
+IP_1 = "10.0.0.1"
+IP_2 = "10.0.0.2"
+TIME_1 = datetime.datetime(2020, 1, 1, 0, 0, 1)
+TIME_2 = datetime.datetime(2020, 1, 1, 0, 0, 2)
+
+
+@mock.patch('a10_octavia.cmd.vthunder_heartbeat_udp.db_api.get_session', mock.Mock())
+class TestVThunderUDPStatusGetter(base.TestCase):
+
+    def setUp(self):
+        super(TestVThunderUDPStatusGetter, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group='a10_health_manager', heartbeat_batch_interval=5,
+                         heartbeat_batch_size=2)
+        socket_patcher = mock.patch('socket.socket')
+        socket_patcher.start()
+        self.addCleanup(socket_patcher.stop)
+
+    def _getter(self):
+        getter = heartbeat_udp.VThunderUDPStatusGetter()
+        getter.vthunder_repo = mock.Mock()
+        getter.address_index.vthunder_repo = getter.vthunder_repo
+        getter.vthunder_repo.get_ip_address_ids.return_value = [
+            (1, IP_1, TIME_1), (2, IP_2, TIME_1)]
+        return getter
+
+    def test_add_heartbeat_deduplicates_by_ip(self):
+        getter = self._getter()
+        getter.add_heartbeat(IP_1, TIME_1)
+        getter.add_heartbeat(IP_1, TIME_2)
+        self.assertEqual({IP_1: TIME_2}, getter.pending)
+        self.assertEqual(2, getter.packets_received)
+        self.assertEqual(1, getter.packets_deduplicated)
+        self.assertFalse(getter.is_flush_due())
+
+    def test_flush_due_on_batch_size(self):
+        getter = self._getter()
+        getter.add_heartbeat(IP_1, TIME_1)
+        getter.add_heartbeat(IP_2, TIME_2)
+        self.assertTrue(getter.is_flush_due())
+
+    @mock.patch('time.time')
+    def test_flush_due_on_batch_interval(self, mock_time):
+        mock_time.return_value = 100
+        getter = self._getter()
+        getter.add_heartbeat(IP_1, TIME_1)
+        mock_time.return_value = 105
+        self.assertTrue(getter.is_flush_due())
+
+    def test_flush_writes_single_bulk_update(self):
+        getter = self._getter()
+        getter.add_heartbeat(IP_1, TIME_2)
+        getter.add_heartbeat(IP_2, TIME_1)
+        getter.flush()
+        getter.vthunder_repo.update_last_udp_update.assert_called_once_with(
+            mock.ANY, {1, 2}, TIME_1)
+        self.assertEqual({}, getter.pending)
+        self.assertEqual(2, getter.vthunders_flushed)
+
+    def test_check_batches_received_packet(self):
+        getter = self._getter()
+        getter.sock.recvfrom.return_value = (b'', (IP_1, 5550))
+        getter.check()
+        self.assertIn(IP_1, getter.pending)
+        getter.vthunder_repo.update_last_udp_update.assert_not_called()
+
+    def test_check_without_batching(self):
+        self.conf.config(group='a10_health_manager', heartbeat_batch_interval=0)
+        getter = self._getter()
+        getter.sock.recvfrom.return_value = (b'', (IP_1, 5550))
+        getter.check()
+        getter.vthunder_repo.update_last_udp_update.assert_called_once_with(
+            mock.ANY, {1}, mock.ANY)
+        getter.vthunder_repo.get_vthunder_from_src_addr.assert_not_called()
+
+    def test_update_sets_reuseport_for_multiple_workers(self):
+        self.conf.config(group='a10_health_manager', heartbeat_listener_workers=4)
+        getter = self._getter()
+        getter.sock.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+    def test_update_single_worker_without_reuseport(self):
+        getter = self._getter()
+        for args, kwargs in getter.sock.setsockopt.call_args_list:
+            self.assertNotIn(socket.SO_REUSEPORT, args)
+
+    def test_check_socket_timeout(self):
+        getter = self._getter()
+        getter.sock.recvfrom.side_effect = socket.timeout
+        getter.check()
+        self.assertEqual(0, getter.packets_received)
+
+
+@mock.patch('a10_octavia.cmd.vthunder_heartbeat_udp.db_api.get_session', mock.Mock())
+class TestVThunderAddressIndex(base.TestCase):
+
+    def setUp(self):
+        super(TestVThunderAddressIndex, self).setUp()
+        self.repo = mock.Mock()
+        self.repo.get_ip_address_ids.return_value = [(1, IP_1, TIME_1)]
+        self.index = heartbeat_udp.VThunderAddressIndex(self.repo)
+
+    def test_lookup_loads_once(self):
+        self.assertEqual({1}, self.index.lookup(IP_1))
+        self.assertEqual({1}, self.index.lookup(IP_1))
+        self.repo.get_ip_address_ids.assert_called_once_with(mock.ANY)
+
+    @mock.patch('time.time')
+    def test_lookup_miss_refreshes_incrementally(self, mock_time):
+        mock_time.return_value = 100
+        self.index.lookup(IP_1)
+        self.repo.get_ip_address_ids.return_value = [(2, IP_2, TIME_2)]
+        mock_time.return_value = 100 + heartbeat_udp.INDEX_MISS_REFRESH_HOLDOFF
+        self.assertEqual({2}, self.index.lookup(IP_2))
+        self.repo.get_ip_address_ids.assert_called_with(mock.ANY, updated_since=TIME_1)
+        self.assertEqual({1}, self.index.lookup(IP_1))
+
+    @mock.patch('time.time')
+    def test_lookup_miss_within_holdoff(self, mock_time):
+        mock_time.return_value = 100
+        self.index.lookup(IP_1)
+        self.assertEqual(set(), self.index.lookup(IP_2))
+        self.assertEqual(1, self.repo.get_ip_address_ids.call_count)
+
+    @mock.patch('time.time')
+    def test_refresh_moves_changed_address(self, mock_time):
+        mock_time.return_value = 100
+        self.index.lookup(IP_1)
+        self.repo.get_ip_address_ids.return_value = [(1, IP_2, TIME_2)]
+        self.index.refresh()
+        self.assertEqual({1}, self.index.ids_by_ip[IP_2])
+        self.assertNotIn(IP_1, self.index.ids_by_ip)
@@ -0,0 +1,83 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import axapi_session_pool
+from a10_octavia.common import data_models
+
+VTHUNDER = data_models.VThunder(ip_address="10.0.0.1", axapi_version=30,
+                                username="abc", password="abc",
+                                partition_name="shared")
+VTHUNDER_PARTITION = data_models.VThunder(ip_address="10.0.0.1", axapi_version=30,
+                                          username="abc", password="abc",
+                                          partition_name="p1")
+
+
+@mock.patch('a10_octavia.common.axapi_session_pool._new_client',
+            side_effect=lambda vthunder: mock.Mock())
+class TestAXAPISessionPool(base.TestCase):
+
+    def setUp(self):
+        super(TestAXAPISessionPool, self).setUp()
+        self.pool = axapi_session_pool.AXAPISessionPool(idle_timeout=300, max_idle=2)
+
+    def test_acquire_reuses_released_client(self, mock_new_client):
+        client = self.pool.acquire(VTHUNDER)
+        self.pool.release(client, VTHUNDER)
+        self.assertIs(client, self.pool.acquire(VTHUNDER))
+        self.assertEqual(1, mock_new_client.call_count)
+        client.session.close.assert_not_called()
+
+    def test_acquire_keyed_by_partition(self, mock_new_client):
+        client = self.pool.acquire(VTHUNDER)
+        self.pool.release(client, VTHUNDER)
+        self.assertIsNot(client, self.pool.acquire(VTHUNDER_PARTITION))
+
+    def test_acquire_does_not_share_checked_out_client(self, mock_new_client):
+        client1 = self.pool.acquire(VTHUNDER)
+        client2 = self.pool.acquire(VTHUNDER)
+        self.assertIsNot(client1, client2)
+
+    @mock.patch('time.time')
+    def test_acquire_closes_expired_client(self, mock_time, mock_new_client):
+        mock_time.return_value = 1000
+        client = self.pool.acquire(VTHUNDER)
+        self.pool.release(client, VTHUNDER)
+        mock_time.return_value = 1301
+        self.assertIsNot(client, self.pool.acquire(VTHUNDER))
+        client.session.close.assert_called_once_with()
+
+    def test_release_discard_closes_client(self, mock_new_client):
+        client = self.pool.acquire(VTHUNDER)
+        self.pool.release(client, VTHUNDER, discard=True)
+        client.session.close.assert_called_once_with()
+        self.assertIsNot(client, self.pool.acquire(VTHUNDER))
+
+    def test_release_over_max_idle_closes_client(self, mock_new_client):
+        clients = [self.pool.acquire(VTHUNDER) for i in range(3)]
+        for client in clients:
+            self.pool.release(client, VTHUNDER)
+        clients[2].session.close.assert_called_once_with()
+
+    def test_close_all(self, mock_new_client):
+        client = self.pool.acquire(VTHUNDER)
+        self.pool.release(client, VTHUNDER)
+        self.pool.close_all()
+        client.session.close.assert_called_once_with()
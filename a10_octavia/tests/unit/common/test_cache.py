@@ -0,0 +1,62 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import cache
+
+
+class TestTTLCache(base.TestCase):
+
+    def test_expires_entries(self):
+        ttl_cache = cache.TTLCache(ttl=10, max_size=2)
+        with mock.patch('a10_octavia.common.cache.time') as t:
+            t.time.return_value = 100
+            ttl_cache.set('a', 1)
+            t.time.return_value = 105
+            self.assertEqual(1, ttl_cache.get('a'))
+            t.time.return_value = 111
+            self.assertIsNone(ttl_cache.get('a'))
+            self.assertNotIn('a', ttl_cache)
+
+    def test_evicts_least_recently_used(self):
+        ttl_cache = cache.TTLCache(ttl=10, max_size=2)
+        ttl_cache.set('a', 1)
+        ttl_cache.set('b', 2)
+        ttl_cache.get('a')
+        ttl_cache.set('c', 3)
+        self.assertEqual(1, ttl_cache.get('a'))
+        self.assertIsNone(ttl_cache.get('b'))
+        self.assertEqual(3, ttl_cache.get('c'))
+
+    def test_disabled(self):
+        ttl_cache = cache.TTLCache(ttl=0, max_size=2)
+        ttl_cache.set('a', 1)
+        self.assertIsNone(ttl_cache.get('a'))
+        self.assertEqual(0, len(ttl_cache))
+
+    def test_invalidate(self):
+        ttl_cache = cache.TTLCache(ttl=10)
+        ttl_cache.set('a', 1)
+        ttl_cache.set('b', 2)
+        ttl_cache.invalidate('a')
+        self.assertNotIn('a', ttl_cache)
+        self.assertEqual(2, ttl_cache.get('b'))
+        ttl_cache.clear()
+        self.assertEqual(0, len(ttl_cache))
@@ -0,0 +1,128 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import threading
+
+from acos_client import errors as acos_errors
+from acos_client.v30 import axapi_http
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import device_scheduler
+from a10_octavia.common import exceptions
+
+DEVICE = "10.0.0.1"
+
+
+class TestDeviceScheduler(base.TestCase):
+
+    def setUp(self):
+        super(TestDeviceScheduler, self).setUp()
+        self.scheduler = device_scheduler.DeviceScheduler(
+            read_limit=2, write_limit=1, busy_timeout=10,
+            backoff_min=0.5, backoff_max=4)
+
+    def _try_slot(self, write):
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with self.scheduler.slot(DEVICE, write=write):
+                entered.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.daemon = True
+        thread.start()
+        return thread, entered, release
+
+    def test_writes_are_serialized(self):
+        with self.scheduler.slot(DEVICE, write=True):
+            thread, entered, release = self._try_slot(write=True)
+            self.assertFalse(entered.wait(0.2))
+            self.assertEqual(1, self.scheduler.stats()[DEVICE]['waiting'])
+            reader, reader_entered, reader_release = self._try_slot(write=False)
+            self.assertTrue(reader_entered.wait(5))
+            reader_release.set()
+        self.assertTrue(entered.wait(5))
+        release.set()
+        thread.join()
+        reader.join()
+        device_stats = self.scheduler.stats()[DEVICE]
+        self.assertEqual(0, device_stats['waiting'])
+        self.assertEqual(1, device_stats['max_waiting'])
+        self.assertEqual(3, device_stats['wait']['count'])
+
+    def test_slot_is_reentrant(self):
+        with self.scheduler.slot(DEVICE, write=True):
+            with self.scheduler.slot(DEVICE, write=True):
+                pass
+            self.assertEqual(1, self.scheduler.stats()[DEVICE]['running'])
+
+    @mock.patch('a10_octavia.common.device_scheduler.time.sleep')
+    def test_call_retries_busy_device_with_backoff(self, mock_sleep):
+        func = mock.Mock(side_effect=[acos_errors.ACOSSystemIsBusy(),
+                                      acos_errors.ACOSSystemNotReady(),
+                                      'response'])
+        self.assertEqual('response', self.scheduler.call(DEVICE, 'POST', func, '/axapi/v3/'))
+        self.assertEqual(3, func.call_count)
+        first, second = [c[0][0] for c in mock_sleep.call_args_list]
+        self.assertTrue(0.25 <= first <= 0.5)
+        self.assertTrue(0.5 <= second <= 1)
+        self.assertEqual(2, self.scheduler.stats()[DEVICE]['busy_retries'])
+
+    @mock.patch('a10_octavia.common.device_scheduler.time.sleep')
+    def test_call_gives_up_after_busy_timeout(self, mock_sleep):
+        self.scheduler.busy_timeout = 0
+        func = mock.Mock(side_effect=acos_errors.ACOSSystemIsBusy())
+        self.assertRaises(exceptions.DeviceBusyTimeout,
+                          self.scheduler.call, DEVICE, 'PUT', func)
+        self.assertEqual(1, func.call_count)
+        mock_sleep.assert_not_called()
+
+    def test_call_does_not_retry_other_errors(self):
+        func = mock.Mock(side_effect=acos_errors.NotFound())
+        self.assertRaises(acos_errors.NotFound,
+                          self.scheduler.call, DEVICE, 'GET', func)
+        self.assertEqual(1, func.call_count)
+
+    def test_install_wraps_request_impl(self):
+        request_impl = mock.Mock(return_value='response')
+        client = mock.Mock()
+        client.http.request_impl = request_impl
+        self.scheduler.install(client, DEVICE)
+        self.assertEqual('response', client.http.request_impl('GET', '/axapi/v3/slb'))
+        request_impl.assert_called_once_with('GET', '/axapi/v3/slb')
+        self.assertIn(DEVICE, self.scheduler.stats())
+
+    @mock.patch('a10_octavia.common.device_scheduler.time.sleep')
+    def test_busy_errors_are_retried_by_the_scheduler_only(self, mock_sleep):
+        http = axapi_http.HttpClient(DEVICE)
+        request_impl = mock.Mock(side_effect=acos_errors.ACOSSystemIsBusy())
+        http.request_impl = request_impl
+        self.scheduler.busy_timeout = 0
+        self.scheduler.install(mock.Mock(http=http), DEVICE)
+        with mock.patch.object(self.scheduler, 'call', wraps=self.scheduler.call) as call:
+            self.assertRaises(exceptions.DeviceBusyTimeout,
+                              http.request, 'GET', '/axapi/v3/slb')
+        # acos_client's own busy retry loop does not call the scheduler again
+        call.assert_called_once()
+        request_impl.assert_called_once_with('GET', '/axapi/v3/slb', {}, None,
+                                             file_name=None, file_content=None,
+                                             max_retries=None, timeout=None,
+                                             axapi_args=None)
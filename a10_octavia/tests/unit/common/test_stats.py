@@ -0,0 +1,44 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import stats
+
+
+class TestLatencyStats(base.TestCase):
+
+    def test_summary(self):
+        latency = stats.LatencyStats()
+        for seconds in range(1, 101):
+            latency.record(seconds)
+        summary = latency.summary()
+        self.assertEqual(100, summary['count'])
+        self.assertEqual(50.5, summary['mean'])
+        self.assertEqual(100, summary['max'])
+        self.assertEqual(95, summary['p95'])
+        self.assertEqual(51, latency.percentile(50))
+
+    def test_summary_keeps_window(self):
+        latency = stats.LatencyStats(window=2)
+        for seconds in (100, 1, 2):
+            latency.record(seconds)
+        summary = latency.summary()
+        self.assertEqual(3, summary['count'])
+        self.assertEqual(2, summary['max'])
+
+    def test_empty(self):
+        latency = stats.LatencyStats()
+        self.assertEqual({'count': 0}, latency.summary())
+        self.assertIsNone(latency.percentile(50))
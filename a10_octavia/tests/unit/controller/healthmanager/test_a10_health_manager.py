@@ -0,0 +1,163 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import threading
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import data_models
+from a10_octavia.controller.healthmanager import a10_health_manager
+
+VTHUNDER_1 = data_models.VThunder(id=1, vthunder_id="vthunder-1")
+VTHUNDER_2 = data_models.VThunder(id=2, vthunder_id="vthunder-2")
+VTHUNDER_3 = data_models.VThunder(id=3, vthunder_id="vthunder-3")
+
+
+def _future(exception=None):
+    fut = futures.Future()
+    if exception:
+        fut.set_exception(exception)
+    else:
+        fut.set_result(None)
+    return fut
+
+
+@mock.patch('a10_octavia.controller.healthmanager.a10_health_manager.db_apis.get_session')
+class TestA10HealthManager(base.TestCase):
+
+    def setUp(self):
+        super(TestA10HealthManager, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group='a10_health_manager', failover_threads=2,
+                         health_check_interval=0)
+        self.exit_event = threading.Event()
+        with mock.patch('a10_octavia.controller.worker.controller_worker.A10ControllerWorker'):
+            self.hm = a10_health_manager.A10HealthManager(self.exit_event)
+        self.hm.vthunder_repo = mock.Mock()
+        self.hm.executor = mock.Mock()
+        self.hm.executor.submit.side_effect = lambda fn, vthunder_id: _future()
+
+    def _claim(self, *results):
+        results = iter(results)
+
+        def _claim_stale_vthunders(*args):
+            result = next(results)
+            if callable(result):
+                result()
+                return []
+            return result
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = _claim_stale_vthunders
+
+    def _claims(self, stale):
+        """Claim and release the stale vThunders like the repository does.
+
+        A completed failover replaces the vThunder, which is not stale anymore.
+        """
+        stale = list(stale)
+        claimed = set()
+
+        def _release_vthunder_claim(session, vthunder_id):
+            claimed.discard(vthunder_id)
+            stale[:] = [vthunder for vthunder in stale if vthunder.vthunder_id != vthunder_id]
+
+        def _claim_stale_vthunders(session, initial_setup_wait_time, failover_wait_time,
+                                   claim_expiry_time, limit):
+            vthunders = [vthunder for vthunder in stale
+                         if vthunder.vthunder_id not in claimed][:limit]
+            claimed.update(vthunder.vthunder_id for vthunder in vthunders)
+            return vthunders
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = _claim_stale_vthunders
+        self.hm.vthunder_repo.release_vthunder_claim.side_effect = _release_vthunder_claim
+
+    def test_health_check_claims_free_slots(self, mock_session):
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = [
+            [VTHUNDER_1, VTHUNDER_2], []]
+        self.hm.health_check()
+        self.hm.vthunder_repo.claim_stale_vthunders.assert_has_calls([
+            mock.call(mock_session.return_value, mock.ANY, mock.ANY, mock.ANY, 2),
+            mock.call(mock_session.return_value, mock.ANY, mock.ANY, mock.ANY, 2)])
+        self.hm.executor.submit.assert_has_calls([
+            mock.call(self.hm.cw.failover_amphora, "vthunder-1"),
+            mock.call(self.hm.cw.failover_amphora, "vthunder-2")])
+        self.assertEqual({}, self.hm.in_flight)
+        self.assertEqual(2, self.hm.failover_latency.count)
+
+    def test_health_check_admits_when_slot_frees(self, mock_session):
+        slow = futures.Future()
+        self.hm.executor.submit.side_effect = [slow, _future(), _future()]
+        self._claim([VTHUNDER_1, VTHUNDER_2], [VTHUNDER_3],
+                    lambda: slow.set_result(None), [])
+        self.hm.health_check()
+        calls = self.hm.vthunder_repo.claim_stale_vthunders.call_args_list
+        self.assertEqual([2, 1, 1, 2], [call[0][4] for call in calls])
+        self.assertEqual(3, self.hm.executor.submit.call_count)
+        self.assertEqual({}, self.hm.in_flight)
+
+    def test_health_check_skips_in_flight_vthunders(self, mock_session):
+        slow = futures.Future()
+        self.hm.executor.submit.side_effect = [slow]
+        self._claim([VTHUNDER_1], [VTHUNDER_1], self.exit_event.set)
+        self.hm.health_check()
+        self.hm.executor.submit.assert_called_once_with(
+            self.hm.cw.failover_amphora, "vthunder-1")
+
+    def test_health_check_records_failed_failover(self, mock_session):
+        self.hm.executor.submit.side_effect = [_future(Exception())]
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = [[VTHUNDER_1], []]
+        self.hm.health_check()
+        self.assertEqual(1, self.hm.failover_latency.count)
+        self.hm.vthunder_repo.release_vthunder_claim.assert_not_called()
+
+    def test_health_check_releases_claim_of_completed_failover(self, mock_session):
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = [[VTHUNDER_1], []]
+        self.hm.health_check()
+        self.hm.vthunder_repo.release_vthunder_claim.assert_called_once_with(
+            mock_session.return_value, "vthunder-1")
+
+    def test_health_check_does_not_resubmit_failed_failover(self, mock_session):
+        self._claims([VTHUNDER_1])
+        self.hm.executor.submit.side_effect = lambda fn, vthunder_id: _future(Exception())
+        self.hm.health_check()
+        self.hm.health_check()
+        self.hm.executor.submit.assert_called_once_with(
+            self.hm.cw.failover_amphora, "vthunder-1")
+
+    def test_health_check_failing_vthunder_does_not_hold_slots(self, mock_session):
+        self._claims([VTHUNDER_1, VTHUNDER_2, VTHUNDER_3])
+        self.hm.executor.submit.side_effect = lambda fn, vthunder_id: _future(
+            Exception() if vthunder_id == "vthunder-1" else None)
+        self.hm.health_check()
+        self.hm.health_check()
+        self.assertEqual(["vthunder-1", "vthunder-2", "vthunder-3"],
+                         [call[0][1] for call in self.hm.executor.submit.call_args_list])
+        self.assertEqual({}, self.hm.in_flight)
+
+    def test_health_check_no_stale_vthunders(self, mock_session):
+        self.hm.vthunder_repo.claim_stale_vthunders.return_value = []
+        self.hm.health_check()
+        self.hm.executor.submit.assert_not_called()
+
+    def test_health_check_rolls_back_on_error(self, mock_session):
+        self.hm.vthunder_repo.claim_stale_vthunders.side_effect = Exception()
+        self.assertRaises(Exception, self.hm.health_check)
+        mock_session.return_value.rollback.assert_called_once_with()
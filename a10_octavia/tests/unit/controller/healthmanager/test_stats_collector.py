@@ -0,0 +1,222 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import acos_client.errors as acos_errors
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from octavia.tests.unit import base
+from octavia_lib.api.drivers import exceptions as driver_exceptions
+
+from a10_octavia.common import config_options  # noqa
+from a10_octavia.common import data_models
+from a10_octavia.controller.healthmanager import stats_collector
+
+VTHUNDER_1 = data_models.VThunder(ip_address="10.0.0.1", partition_name="shared")
+VTHUNDER_2 = data_models.VThunder(ip_address="10.0.0.1", partition_name=None)
+VTHUNDER_3 = data_models.VThunder(ip_address="10.0.0.2", partition_name="p1")
+ROWS = [(VTHUNDER_1, 'listener-1', 'lb-1', 'HTTP', 80),
+        (VTHUNDER_1, 'listener-2', 'lb-1', 'TCP', 443),
+        (VTHUNDER_2, 'listener-3', 'lb-2', 'TERMINATED_HTTPS', 443),
+        (VTHUNDER_3, 'listener-4', 'lb-3', 'UDP', 53)]
+
+
+def _port(protocol, port_number, curr_conn=0, total_conn=0, fwd_bytes=0, rev_bytes=0,
+          total_req=0, total_req_succ=0):
+    return {'port-number': port_number, 'protocol': protocol,
+            'stats': {'curr_conn': curr_conn, 'total_conn': total_conn,
+                      'total_fwd_bytes': fwd_bytes, 'total_rev_bytes': rev_bytes,
+                      'total_req': total_req, 'total_req_succ': total_req_succ}}
+
+
+def _stats(listener_id, active=0, total=0, bytes_in=0, bytes_out=0, errors=0):
+    return {'id': listener_id, 'active_connections': active, 'total_connections': total,
+            'bytes_in': bytes_in, 'bytes_out': bytes_out, 'request_errors': errors}
+
+
+def _sample(*args):
+    sample = _stats(None, *args)
+    del sample['id']
+    return sample
+
+
+class TestVportStatsReader(base.TestCase):
+
+    def setUp(self):
+        super(TestVportStatsReader, self).setUp()
+        self.client = mock.Mock()
+        vport = self.client.slb.virtual_server.vport
+        vport.TCP, vport.UDP, vport.HTTP, vport.HTTPS = 'tcp', 'udp', 'http', 'https'
+        self.reader = stats_collector.VportStatsReader()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def _read(self, listeners, mock_pool):
+        mock_pool.acquire_client.return_value = self.client
+        return self.reader.read(listeners, vthunder=VTHUNDER_1)
+
+    def test_read_maps_ports_to_listeners(self):
+        self.client.session.id = 'session-1'
+        self.client.http.request.return_value = {'virtual-server-list': [
+            {'name': 'lb-1', 'port-list': [_port('http', 80, 1, 10, 100, 1000, 8, 6),
+                                           _port('tcp', 443, 2, 20, 200, 2000),
+                                           _port('udp', 80, 3, 30)]},
+            {'name': 'lb-4', 'port-list': [_port('https', 443, 4, 40)]}]}
+        samples = self._read([row[1:] for row in ROWS[:3]])
+        self.assertEqual({'listener-1': _sample(1, 10, 100, 1000, 2),
+                          'listener-2': _sample(2, 20, 200, 2000)}, samples)
+        self.client.http.request.assert_called_once_with(
+            "GET", "/axapi/v3/slb/virtual-server/stats", {},
+            {'Authorization': "A10 session-1"})
+        self.client.slb.virtual_server.stats.assert_not_called()
+
+    def test_read_without_virtual_servers(self):
+        self.client.http.request.side_effect = acos_errors.NotFound()
+        self.assertEqual({}, self._read([row[1:] for row in ROWS[:3]]))
+
+
+class TestListenerCounters(base.TestCase):
+
+    def setUp(self):
+        super(TestListenerCounters, self).setUp()
+        self.counters = stats_collector.ListenerCounters()
+
+    def test_update_accumulates_deltas(self):
+        self.assertEqual(_stats('listener-1', 5, 10, 100, 1000, 1),
+                         self.counters.update('listener-1', _sample(5, 10, 100, 1000, 1)))
+        self.assertEqual(_stats('listener-1', 2, 15, 150, 1500, 1),
+                         self.counters.update('listener-1', _sample(2, 15, 150, 1500, 1)))
+
+    def test_update_after_counter_reset(self):
+        self.counters.update('listener-1', _sample(5, 10, 100, 1000, 1))
+        self.assertEqual(_stats('listener-1', 1, 13, 130, 1300, 1),
+                         self.counters.update('listener-1', _sample(1, 3, 30, 300, 0)))
+        self.assertEqual(_stats('listener-1', 1, 14, 140, 1400, 1),
+                         self.counters.update('listener-1', _sample(1, 4, 40, 400, 0)))
+
+    def test_update_starts_from_stored(self):
+        stored = _stats('listener-1', 9, 50, 500, 5000, 5)
+        self.assertEqual(_stats('listener-1', 5, 50, 500, 5000, 5),
+                         self.counters.update('listener-1', _sample(5, 10, 100, 1000, 1),
+                                              stored))
+        self.assertEqual(_stats('listener-1', 5, 52, 520, 5200, 5),
+                         self.counters.update('listener-1', _sample(5, 12, 120, 1200, 1),
+                                              stored))
+
+    def test_retain(self):
+        self.counters.update('listener-1', _sample(5, 10))
+        self.counters.update('listener-2', _sample(5, 10))
+        self.counters.retain(['listener-2'])
+        self.assertNotIn('listener-1', self.counters)
+        self.assertIn('listener-2', self.counters)
+        self.assertEqual(_stats('listener-1', 5, 10),
+                         self.counters.update('listener-1', _sample(5, 10)))
+
+
+@mock.patch('a10_octavia.controller.healthmanager.stats_collector.db_apis.get_session')
+@mock.patch('a10_octavia.controller.healthmanager.stats_collector.VportStatsReader')
+class TestA10StatsCollector(base.TestCase):
+
+    def setUp(self):
+        super(TestA10StatsCollector, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group='a10_health_manager', stats_update_threads=2)
+        self.exit_event = threading.Event()
+        self.collector = stats_collector.A10StatsCollector(self.exit_event)
+        self.addCleanup(self.collector.executor.shutdown)
+        self.collector.listener_repo = mock.Mock()
+        self.collector.listener_repo.get_listeners_with_vthunder.return_value = ROWS
+        self.collector.listener_repo.get_statistics.return_value = {}
+        self.collector._driver_lib = mock.Mock()
+        self.samples = {}
+
+    def _read(self, listeners, vthunder):
+        if vthunder is VTHUNDER_3:
+            raise acos_errors.ACOSException()
+        return dict((listener[0], self.samples[listener[0]])
+                    for listener in listeners if listener[0] in self.samples)
+
+    def _set_samples(self, **samples):
+        for listener_id, sample in samples.items():
+            self.samples[listener_id.replace('_', '-')] = sample
+
+    def _pushed(self):
+        update = self.collector._driver_lib.update_listener_statistics
+        pushed = [sorted(call[0][0]['listeners'], key=lambda stats: stats['id'])
+                  for call in update.call_args_list]
+        update.reset_mock()
+        return pushed
+
+    def test_collect_stats_reads_each_partition_once(self, mock_reader, mock_session):
+        mock_reader.return_value.read.side_effect = self._read
+        self._set_samples(listener_1=_sample(1, 10), listener_3=_sample(3, 30))
+        self.collector.collect_stats()
+        self.assertEqual(2, mock_reader.return_value.read.call_count)
+        calls = dict((call[1]['vthunder'].partition_name, call[0][0])
+                     for call in mock_reader.return_value.read.call_args_list)
+        self.assertEqual([row[1:] for row in ROWS[:3]], calls['shared'])
+        self.assertEqual([ROWS[3][1:]], calls['p1'])
+        self.assertEqual([[_stats('listener-1', 1, 10), _stats('listener-3', 3, 30)]],
+                         self._pushed())
+
+    def test_collect_stats_pushes_changed_stats(self, mock_reader, mock_session):
+        mock_reader.return_value.read.side_effect = self._read
+        self._set_samples(listener_1=_sample(1, 10), listener_2=_sample(2, 20))
+        self.collector.collect_stats()
+        self._pushed()
+        self.collector.collect_stats()
+        self.assertEqual([], self._pushed())
+        self._set_samples(listener_2=_sample(2, 25))
+        self.collector.collect_stats()
+        self.assertEqual([[_stats('listener-2', 2, 25)]], self._pushed())
+
+    def test_collect_stats_starts_from_stored(self, mock_reader, mock_session):
+        mock_reader.return_value.read.side_effect = self._read
+        self.collector.listener_repo.get_statistics.return_value = {
+            'listener-1': _stats('listener-1', 0, 100)}
+        self._set_samples(listener_1=_sample(1, 10))
+        self.collector.collect_stats()
+        self.collector.listener_repo.get_statistics.assert_called_once_with(
+            mock_session.return_value, ['listener-1'])
+        self._set_samples(listener_1=_sample(1, 12))
+        self.collector.collect_stats()
+        self.assertEqual([[_stats('listener-1', 1, 100)], [_stats('listener-1', 1, 102)]],
+                         self._pushed())
+        self.collector.listener_repo.get_statistics.assert_called_with(
+            mock_session.return_value, [])
+
+    def test_collect_stats_retries_failed_update(self, mock_reader, mock_session):
+        mock_reader.return_value.read.side_effect = self._read
+        self._set_samples(listener_1=_sample(1, 10))
+        update = self.collector._driver_lib.update_listener_statistics
+        update.side_effect = driver_exceptions.UpdateStatisticsError(
+            fault_string='error', stats_object='listeners')
+        self.collector.collect_stats()
+        update.side_effect = None
+        self.collector.collect_stats()
+        self.assertEqual([[_stats('listener-1', 1, 10)]] * 2, self._pushed())
+
+    def test_collect_stats_forgets_deleted_listeners(self, mock_reader, mock_session):
+        mock_reader.return_value.read.side_effect = self._read
+        self._set_samples(listener_1=_sample(1, 10))
+        self.collector.collect_stats()
+        self.collector.listener_repo.get_listeners_with_vthunder.return_value = ROWS[1:]
+        self.collector.collect_stats()
+        self.assertNotIn('listener-1', self.collector.counters)
+        self.assertEqual({}, self.collector.pushed)
@@ -0,0 +1,68 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from taskflow import engines
+
+from octavia.common import constants
+from octavia.common import data_models as o_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.common import a10constants as a10_common
+from a10_octavia.controller.worker.flows import a10_listener_flows
+from a10_octavia.controller.worker.tasks import a10_database_tasks
+from a10_octavia.controller.worker.tasks import cert_tasks
+
+LB = o_data_models.LoadBalancer(id='lb-1', project_id='project-1')
+LISTENER = o_data_models.Listener(id='listener-1', protocol='TERMINATED_HTTPS',
+                                  tls_certificate_id='container-1')
+
+
+class TestListenerFlows(base.TestCase):
+
+    def setUp(self):
+        super(TestListenerFlows, self).setUp()
+        self.flows = a10_listener_flows.ListenerFlows()
+
+    def _run_ssl_certificate_delete_flow(self, usage_count):
+        delete_flow = self.flows.get_ssl_certificate_delete_flow()
+        tasks = [cert_tasks.GetSSLCertData, cert_tasks.ClientSSLTemplateDelete,
+                 cert_tasks.SSLCertDelete, cert_tasks.SSLKeyDelete,
+                 cert_tasks.ListenerClientSSLTemplateDelete]
+        executes = []
+        for task_class in tasks:
+            patcher = mock.patch.object(task_class, 'execute')
+            executes.append(patcher.start())
+            self.addCleanup(patcher.stop)
+        with mock.patch.object(a10_database_tasks.CountListenersWithCertificate, 'execute',
+                               return_value=usage_count):
+            engines.run(delete_flow, store={constants.LOADBALANCER: LB,
+                                            constants.LISTENER: LISTENER,
+                                            a10_common.VTHUNDER: mock.Mock()})
+        return executes
+
+    def test_ssl_certificate_delete_flow_last_listener(self):
+        for execute in self._run_ssl_certificate_delete_flow(0):
+            execute.assert_called_once()
+
+    def test_ssl_certificate_delete_flow_shared_certificate(self):
+        executes = self._run_ssl_certificate_delete_flow(2)
+        for execute in executes[:-1]:
+            execute.assert_not_called()
+        # The template named after the listener is never shared
+        executes[-1].assert_called_once()
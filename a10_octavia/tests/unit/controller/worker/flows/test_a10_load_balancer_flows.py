@@ -20,6 +20,7 @@ except ImportError:
 from oslo_config import cfg
 from oslo_config import fixture as oslo_fixture
 from taskflow.patterns import linear_flow as flow
+from taskflow.patterns import unordered_flow
 
 from octavia.common import constants
 from octavia.common import data_models as o_data_models
@@ -61,6 +62,14 @@ class TestLoadBalancerFlows(base.TestCase):
         self.assertIsInstance(target, flow.Flow)
         self.assertIn("vthunder", target.provides)
 
+    def test_new_lb_networking_subflow_active_standby(self, mock_net_driver):
+        target = self.flows.get_new_lb_networking_subflow(constants.TOPOLOGY_ACTIVE_STANDBY)
+        branches = [node for node, _ in target.iter_nodes()
+                    if isinstance(node, unordered_flow.Flow)]
+        self.assertEqual(1, len(branches))
+        self.assertEqual(['master-lb-networking-subflow', 'backup-lb-networking-subflow'],
+                         [node.name for node, _ in branches[0].iter_nodes()])
+
     def test_create_lb_rack_vthunder_vlan_flow(self, mock_net_driver):
         self.conf.register_opts(config_options.A10_GLOBAL_OPTS,
                                 group=a10constants.A10_GLOBAL_CONF_SECTION)
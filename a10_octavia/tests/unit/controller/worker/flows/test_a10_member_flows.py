@@ -12,14 +12,23 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
 from oslo_config import cfg
 from oslo_config import fixture as oslo_fixture
 from taskflow.patterns import linear_flow as flow
+from taskflow.patterns import unordered_flow
 
+from octavia.common import constants
 from octavia.tests.unit import base
 
+from a10_octavia.common import a10constants as a10_common
 from a10_octavia.common import config_options
 from a10_octavia.controller.worker.flows import a10_member_flows
+from a10_octavia.controller.worker.tasks import vthunder_tasks
 from a10_octavia.tests.common import a10constants
 
 
@@ -60,3 +69,81 @@ class TestMemberFlows(base.TestCase):
                          devices=[RACK_DEVICE])
         del_flow = self.flows.get_delete_member_flow()
         self.assertIsInstance(del_flow, flow.Flow)
+
+    def test_create_member_flow_active_standby(self):
+        plug_subflow = self.flows.get_member_network_plug_subflow(
+            constants.TOPOLOGY_ACTIVE_STANDBY)
+        branches = [node for node, _ in plug_subflow.iter_nodes()
+                    if isinstance(node, unordered_flow.Flow)]
+        self.assertEqual(1, len(branches))
+        self.assertEqual([a10_common.MASTER_MEMBER_NETWORK_PLUG_SUBFLOW,
+                          a10_common.BACKUP_MEMBER_NETWORK_PLUG_SUBFLOW],
+                         [node.name for node, _ in branches[0].iter_nodes()])
+        # The reboots stay sequential, backup first, outside of the branches
+        reboots = [node.name for node, _ in plug_subflow.iter_nodes()
+                   if isinstance(node, vthunder_tasks.AmphoraePostMemberNetworkPlug)]
+        self.assertEqual(['backup_amphora_network_plug',
+                          vthunder_tasks.AmphoraePostMemberNetworkPlug().name], reboots)
+        for branch, _ in branches[0].iter_nodes():
+            self.assertEqual(
+                [vthunder_tasks.EnableInterfaceForMembers],
+                [type(node) for node, _ in branch.iter_nodes()])
+
+    def _mock_member(self, member_id, subnet_id):
+        member = mock.Mock(id=member_id, subnet_id=subnet_id,
+                           project_id=RACK_DEVICE['project_id'])
+        return member
+
+    def _task_names(self, batch_flow):
+        return [atom.name for atom, _ in batch_flow.iter_nodes()] + [
+            atom.name for subflow, _ in batch_flow.iter_nodes()
+            if hasattr(subflow, 'iter_nodes')
+            for atom, _ in subflow.iter_nodes()]
+
+    def test_batch_update_members_flow(self):
+        old = [self._mock_member('old-1', 'subnet-1')]
+        new = [self._mock_member('new-1', 'subnet-1'), self._mock_member('new-2', 'subnet-2')]
+        updated = [(self._mock_member('upd-1', 'subnet-1'), {'weight': 2})]
+        batch_flow = self.flows.get_batch_update_members_flow(
+            old, new, updated, constants.TOPOLOGY_SINGLE)
+        self.assertIsInstance(batch_flow, flow.Flow)
+        names = self._task_names(batch_flow)
+        self.assertIn(a10_common.MEMBER_NETWORK_PLUG_SUBFLOW, names)
+        for name in ('member-delete-old-1', 'member-create-new-1',
+                     'member-create-new-2', 'member-update-upd-1'):
+            self.assertIn(name, names)
+        self.assertEqual(1, sum(1 for n in names if n.endswith('WriteMemory')))
+
+    def test_batch_update_members_flow_without_new_members(self):
+        old = [self._mock_member('old-1', 'subnet-1')]
+        batch_flow = self.flows.get_batch_update_members_flow(
+            old, [], [], constants.TOPOLOGY_SINGLE)
+        self.assertNotIn(a10_common.MEMBER_NETWORK_PLUG_SUBFLOW,
+                         self._task_names(batch_flow))
+
+    def test_rack_vthunder_batch_update_members_vlan_flow(self):
+        self.conf.register_opts(config_options.A10_GLOBAL_OPTS,
+                                group=a10constants.A10_GLOBAL_CONF_SECTION)
+        self.conf.config(group=a10constants.A10_GLOBAL_CONF_SECTION, network_type='vlan')
+        old = [self._mock_member('old-1', 'subnet-1'), self._mock_member('old-2', 'subnet-3')]
+        new = [self._mock_member('new-1', 'subnet-1'), self._mock_member('new-2', 'subnet-2'),
+               self._mock_member('new-3', 'subnet-2')]
+        batch_flow = self.flows.get_rack_vthunder_batch_update_members_flow(old, new, [])
+        names = self._task_names(batch_flow)
+        self.assertEqual(['tag-interface-for-member-subnet-1',
+                          'tag-interface-for-member-subnet-2'],
+                         [n for n in names if n.startswith('tag-interface')])
+        # subnet-1 is still used by a new member
+        self.assertEqual(['delete-interface-tag-for-member-subnet-3'],
+                         [n for n in names if n.startswith('delete-interface-tag')])
+        self.assertIn(a10_common.HANDLE_VRID_MEMBER_SUBFLOW, names)
+        self.assertNotIn(a10_common.DELETE_MEMBER_VRID_SUBFLOW, names)
+
+    def test_rack_vthunder_batch_delete_members_flow_releases_vrid(self):
+        self.conf.register_opts(config_options.A10_GLOBAL_OPTS,
+                                group=a10constants.A10_GLOBAL_CONF_SECTION)
+        old = [self._mock_member('old-1', 'subnet-1'), self._mock_member('old-2', 'subnet-1')]
+        batch_flow = self.flows.get_rack_vthunder_batch_update_members_flow(old, [], [])
+        names = self._task_names(batch_flow)
+        self.assertIn(a10_common.DELETE_MEMBER_VRID_SUBFLOW, names)
+        self.assertNotIn(a10_common.HANDLE_VRID_MEMBER_SUBFLOW, names)
@@ -181,3 +181,32 @@ class TestA10DatabaseTasks(base.BaseTaskTestCase):
         mock_vrid_entry.member_repo.get_member_count.return_value = 1
         member_count = mock_vrid_entry.execute(MEMBER_1)
         self.assertEqual(1, member_count)
+
+    def _check_vlan_task(self, task_class, usage_count):
+        conf = mock.patch('a10_octavia.controller.worker.tasks.a10_database_tasks.CONF')
+        conf.start().hardware_thunder.devices = {a10constants.MOCK_PROJECT_ID: VTHUNDER}
+        self.addCleanup(conf.stop)
+        check_vlan = task_class()
+        check_vlan.member_repo = mock.Mock()
+        check_vlan.member_repo.get_subnet_usage_count.return_value = usage_count
+        return check_vlan
+
+    def test_check_vip_vlan_can_be_deleted(self):
+        lb = o_data_models.LoadBalancer(id=a10constants.MOCK_LOAD_BALANCER_ID,
+                                        project_id=a10constants.MOCK_PROJECT_ID,
+                                        vip=o_data_models.Vip(subnet_id='subnet-1'))
+        check_vlan = self._check_vlan_task(task.CheckVipVLANCanBeDeleted, 1)
+        self.assertTrue(check_vlan.execute(lb))
+        check_vlan.member_repo.get_subnet_usage_count.assert_called_once_with(
+            mock.ANY, a10constants.MOCK_PROJECT_ID, 'subnet-1')
+        check_vlan.member_repo.get_subnet_usage_count.return_value = 2
+        self.assertFalse(check_vlan.execute(lb))
+
+    def test_check_member_vlan_can_be_deleted(self):
+        member = o_data_models.Member(id=uuidutils.generate_uuid(),
+                                      project_id=a10constants.MOCK_PROJECT_ID,
+                                      subnet_id='subnet-1')
+        check_vlan = self._check_vlan_task(task.CheckMemberVLANCanBeDeleted, 0)
+        self.assertTrue(check_vlan.execute(member))
+        check_vlan.member_repo.get_subnet_usage_count.return_value = 1
+        self.assertFalse(check_vlan.execute(member))
@@ -390,6 +390,17 @@ class TestNetworkTasks(base.BaseTaskTestCase):
         self.network_driver_mock.delete_port.assert_called_with(a10constants.MOCK_VRRP_PORT_ID)
         self.client_mock.vrrpa.delete.assert_called_with(vrid.vrid)
 
+    def test_DeleteMemberVRIDPort_delete_vrid_entry_all_members_deleted(self):
+        mock_network_task = a10_network_tasks.DeleteMemberVRIDPort()
+        vrid = copy.deepcopy(VRID)
+        vrid.vrid_port_id = a10constants.MOCK_VRRP_PORT_ID
+        vrid.vrid = VRID_VALUE
+        mock_network_task.axapi_client = self.client_mock
+        self.assertFalse(mock_network_task.execute(VTHUNDER, vrid, 3, deleted_members=2))
+        self.network_driver_mock.delete_port.assert_not_called()
+        self.assertTrue(mock_network_task.execute(VTHUNDER, vrid, 3, deleted_members=3))
+        self.network_driver_mock.delete_port.assert_called_with(a10constants.MOCK_VRRP_PORT_ID)
+
     def test_DeleteMemberVRIDPort_noop_member_count_equals_zero(self):
         mock_network_task = a10_network_tasks.DeleteMemberVRIDPort()
         mock_network_task.axapi_client = self.client_mock
@@ -0,0 +1,104 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import address_index
+
+VTHUNDER = data_models.VThunder(ip_address="10.0.0.1", partition_name="shared")
+PARTITION_VTHUNDER = data_models.VThunder(ip_address="10.0.0.1", partition_name="p1")
+SERVER_LIST = {"server-list": [{"name": "member-1", "host": "10.0.2.1"},
+                               {"name": "member-2", "host": "2001:db8::1"}]}
+VS_LIST = {"virtual-server-list": [{"name": "lb-1", "ip-address": "10.0.1.1"}]}
+
+
+class TestAddressIndex(base.TestCase):
+
+    def setUp(self):
+        super(TestAddressIndex, self).setUp()
+        self.index = address_index.AddressIndex(ttl=600)
+        self.client = mock.Mock()
+        self.client.slb.server.get.return_value = SERVER_LIST
+        self.client.slb.virtual_server.get.return_value = VS_LIST
+
+    def _in_use(self, vthunder, subnet_ip, netmask="255.255.255.0"):
+        return self.index.has_address_in(self.client, vthunder, subnet_ip, netmask)
+
+    def test_has_address_in_loads_partition_once(self):
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.1.0"))
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.2.0"))
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.3.0"))
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.0.0", "255.255.0.0"))
+        self.assertEqual(1, self.client.slb.server.get.call_count)
+        self._in_use(PARTITION_VTHUNDER, "10.0.1.0")
+        self.assertEqual(2, self.client.slb.server.get.call_count)
+
+    def test_add_and_remove(self):
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.3.0"))
+        self.index.add(VTHUNDER, address_index.SERVER, "member-3", "10.0.3.1")
+        self.index.add(VTHUNDER, address_index.VIRTUAL_SERVER, "lb-2", "10.0.3.2")
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.3.0"))
+        self.index.remove(VTHUNDER, address_index.SERVER, "member-3")
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.3.0"))
+        self.index.remove(VTHUNDER, address_index.VIRTUAL_SERVER, "lb-2")
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.3.0"))
+        self.index.remove(VTHUNDER, address_index.VIRTUAL_SERVER, "lb-1")
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.1.0"))
+        self.assertEqual(1, self.client.slb.server.get.call_count)
+
+    def test_add_ignores_partition_not_loaded(self):
+        self.index.add(VTHUNDER, address_index.SERVER, "member-3", "10.0.3.1")
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.3.0"))
+
+    @mock.patch('a10_octavia.controller.worker.tasks.address_index.time')
+    def test_partition_expires(self, mock_time):
+        mock_time.time.return_value = 100
+        self._in_use(VTHUNDER, "10.0.1.0")
+        mock_time.time.return_value = 800
+        self._in_use(VTHUNDER, "10.0.1.0")
+        self.assertEqual(2, self.client.slb.server.get.call_count)
+
+    def test_refresh_and_invalidate(self):
+        self._in_use(VTHUNDER, "10.0.1.0")
+        self.client.slb.virtual_server.get.return_value = {"virtual-server-list": []}
+        self.index.refresh(self.client, VTHUNDER)
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.1.0"))
+        self.index.invalidate(VTHUNDER)
+        self.client.slb.virtual_server.get.return_value = VS_LIST
+        self.assertTrue(self._in_use(VTHUNDER, "10.0.1.0"))
+        self.assertEqual(3, self.client.slb.server.get.call_count)
+
+    def test_is_subnet_free_trusts_cached_use(self):
+        self._in_use(VTHUNDER, "10.0.1.0")
+        self.assertFalse(self.index.is_subnet_free(
+            self.client, VTHUNDER, "10.0.1.0", "255.255.255.0"))
+        self.assertEqual(1, self.client.slb.server.get.call_count)
+
+    def test_is_subnet_free_reloads_partition(self):
+        self.assertFalse(self._in_use(VTHUNDER, "10.0.3.0"))
+        # Another worker creates a member in the subnet
+        self.client.slb.server.get.return_value = {
+            "server-list": SERVER_LIST["server-list"] + [{"name": "member-3",
+                                                         "host": "10.0.3.1"}]}
+        self.assertFalse(self.index.is_subnet_free(
+            self.client, VTHUNDER, "10.0.3.0", "255.255.255.0"))
+        self.assertTrue(self.index.is_subnet_free(
+            self.client, VTHUNDER, "10.0.4.0", "255.255.255.0"))
+        self.assertEqual(3, self.client.slb.server.get.call_count)
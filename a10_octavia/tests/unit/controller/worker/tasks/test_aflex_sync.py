@@ -0,0 +1,120 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.common import data_models as o_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import aflex_sync
+
+VTHUNDER = data_models.VThunder(ip_address="10.0.0.1", partition_name="shared")
+LISTENER = o_data_models.Listener(id='listener-1', name='listener-1', protocol='HTTP',
+                                  protocol_port=80, load_balancer_id='lb-1')
+SCRIPT = 'when HTTP_REQUEST { HTTP::close }'
+
+
+def _listener(*enabled):
+    listener = o_data_models.Listener(id='listener-1', name='listener-1', protocol='HTTP',
+                                      protocol_port=80, load_balancer_id='lb-1')
+    for index, policy_enabled in enumerate(enabled):
+        l7policy = o_data_models.L7Policy(id='policy-%d' % index, action='REJECT',
+                                          enabled=policy_enabled, listener=listener)
+        l7policy.l7rules = [o_data_models.L7Rule(type='PATH', compare_type='EQUAL_TO',
+                                                 value='/%d' % index, invert=False)]
+        listener.l7policies.append(l7policy)
+    return listener
+
+
+class TestAflexSync(base.TestCase):
+
+    def setUp(self):
+        super(TestAflexSync, self).setUp()
+        aflex_sync.get_uploads().invalidate()
+        aflex_sync.get_bindings().invalidate()
+        self.client = mock.Mock()
+        self.client.slb.virtual_server.vport.get.return_value = {
+            'port': {'aflex-scripts': [{'aflex': 'other-script'}]}}
+
+    def test_upload_script_skips_unchanged(self):
+        self.assertTrue(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1', SCRIPT))
+        self.assertFalse(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1', SCRIPT))
+        self.assertTrue(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1',
+                                                 SCRIPT + ' '))
+        self.assertEqual(2, self.client.slb.aflex_policy.create.call_count)
+        aflex_sync.delete_script(self.client, VTHUNDER, 'policy-1')
+        self.assertTrue(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1',
+                                                 SCRIPT + ' '))
+
+    def test_upload_script_unchanged_missing_on_device(self):
+        self.client.slb.aflex_policy.exists.return_value = False
+        self.assertTrue(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1', SCRIPT))
+        self.assertTrue(aflex_sync.upload_script(self.client, VTHUNDER, 'policy-1', SCRIPT))
+        self.client.slb.aflex_policy.exists.assert_called_once_with('policy-1')
+        self.assertEqual(2, self.client.slb.aflex_policy.create.call_count)
+
+    def test_bind_scripts_skips_unchanged_bindings(self):
+        self.assertTrue(aflex_sync.bind_scripts(self.client, VTHUNDER, LISTENER,
+                                                add=['policy-1']))
+        self.assertFalse(aflex_sync.bind_scripts(self.client, VTHUNDER, LISTENER,
+                                                 add=['policy-1']))
+        self.client.slb.virtual_server.vport.get.assert_called_once()
+        self.client.slb.virtual_server.vport.update.assert_called_once()
+
+    def test_bind_scripts_reads_vport_before_update(self):
+        aflex_sync.bind_scripts(self.client, VTHUNDER, LISTENER, add=['policy-1'])
+        # Another process binds policy-2 in the meantime
+        self.client.slb.virtual_server.vport.get.return_value = {
+            'port': {'aflex-scripts': [{'aflex': 'other-script'}, {'aflex': 'policy-1'},
+                                       {'aflex': 'policy-2'}]}}
+        self.assertTrue(aflex_sync.bind_scripts(self.client, VTHUNDER, LISTENER,
+                                                add=['policy-3'], remove=['policy-1']))
+        self.assertEqual(2, self.client.slb.virtual_server.vport.get.call_count)
+        kwargs = self.client.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([{'aflex': 'other-script'}, {'aflex': 'policy-2'},
+                          {'aflex': 'policy-3'}], kwargs['aflex-scripts'])
+
+    def test_bind_scripts_failed_update_reads_vport_again(self):
+        self.client.slb.virtual_server.vport.update.side_effect = Exception
+        self.assertRaises(Exception, aflex_sync.bind_scripts, self.client, VTHUNDER,
+                          LISTENER, add=['policy-1'])
+        self.client.slb.virtual_server.vport.update.side_effect = None
+        aflex_sync.bind_scripts(self.client, VTHUNDER, LISTENER, add=['policy-1'])
+        self.assertEqual(2, self.client.slb.virtual_server.vport.get.call_count)
+
+    def test_sync_listener_policies(self):
+        self.client.slb.virtual_server.vport.get.return_value = {
+            'port': {'aflex-scripts': [{'aflex': 'other-script'}, {'aflex': 'policy-0'}]}}
+        aflex_sync.sync_listener_policies(self.client, VTHUNDER, _listener(True, False))
+        create_kwargs = self.client.slb.aflex_policy.create.call_args[1]
+        self.assertEqual('listener-1', create_kwargs['file'])
+        self.assertIn('"/0"', create_kwargs['script'])
+        self.assertNotIn('"/1"', create_kwargs['script'])
+        update_kwargs = self.client.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([{'aflex': 'other-script'}, {'aflex': 'listener-1'}],
+                         update_kwargs['aflex-scripts'])
+
+    def test_sync_listener_policies_without_policies(self):
+        aflex_sync.sync_listener_policies(self.client, VTHUNDER, _listener(True))
+        self.client.slb.virtual_server.vport.get.return_value = {
+            'port': {'aflex-scripts': [{'aflex': 'other-script'}, {'aflex': 'listener-1'}]}}
+        aflex_sync.sync_listener_policies(self.client, VTHUNDER, _listener(),
+                                          unbind=['policy-0'])
+        update_kwargs = self.client.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([{'aflex': 'other-script'}], update_kwargs['aflex-scripts'])
+        self.client.slb.aflex_policy.delete.assert_called_once_with('listener-1')
@@ -23,13 +23,17 @@ except ImportError:
     import mock
     from mock import patch
 
+from acos_client import errors as acos_errors
+
 from octavia.certificates.common.auth.barbican_acl import BarbicanACLAuth
 from octavia.common import data_models as o_data_models
 from octavia.tests.common import constants as t_constants
 
 from a10_octavia.common.data_models import Certificate
 from a10_octavia.common.data_models import VThunder
+from a10_octavia.controller.worker.tasks import cert_sync
 from a10_octavia.controller.worker.tasks import cert_tasks
+from a10_octavia.controller.worker.tasks import utils
 from a10_octavia.tests.common import a10constants as a10_test_constants
 from a10_octavia.tests.unit.base import BaseTaskTestCase
 
@@ -53,6 +57,8 @@ class TestCertHandlerTasks(BaseTaskTestCase):
     def setUp(self):
         super(TestCertHandlerTasks, self).setUp()
         imp.reload(cert_tasks)
+        cert_sync.get_uploads().invalidate()
+        cert_sync.get_barbican_cache().invalidate()
         self.listener = copy.deepcopy(LISTENER)
         self.client_mock = mock.Mock()
 
@@ -61,7 +67,20 @@ class TestCertHandlerTasks(BaseTaskTestCase):
     def test_GetSSLCertData_success(self, barbican_class, cert_data):
         mock_ssl_cert = cert_tasks.GetSSLCertData()
         out = mock_ssl_cert.execute(LB, LISTENER)
-        self.assertEqual(out, CERT_DATA)
+        self.assertEqual(out.cert_content, CERT_DATA.cert_content)
+        self.assertEqual(out.key_content, CERT_DATA.key_content)
+        self.assertEqual(out.template_name, utils.get_ssl_template_name(LISTENER))
+        self.assertEqual(CERT_DATA.template_name, a10_test_constants.MOCK_TEMPLATE_NAME)
+
+    @patch.object(BarbicanACLAuth, 'get_barbican_client')
+    @mock.patch('a10_octavia.controller.worker.tasks.utils.get_cert_data', return_value=CERT_DATA)
+    def test_GetSSLCertData_cached(self, cert_data, barbican_class):
+        mock_ssl_cert = cert_tasks.GetSSLCertData()
+        mock_ssl_cert.execute(LB, LISTENER)
+        out = mock_ssl_cert.execute(LB, LISTENER)
+        self.assertEqual(out.cert_content, CERT_DATA.cert_content)
+        self.assertEqual(1, cert_data.call_count)
+        barbican_class.assert_called_once_with(LB.project_id)
 
     @patch.object(BarbicanACLAuth, 'get_barbican_client')
     def test_GetSSLCertData_barbican_exception(self, barbican_class):
@@ -99,14 +118,48 @@ class TestCertHandlerTasks(BaseTaskTestCase):
             certificate_type=a10_test_constants.MOCK_CERT_TYPE)
         self.client_mock.file.ssl_cert.update.assert_not_called()
 
+    def test_ssl_cert_create_unchanged_skips_upload(self):
+        mock_ssl_cert = cert_tasks.SSLCertCreate()
+        mock_ssl_cert.axapi_client = self.client_mock
+        self.client_mock.file.ssl_cert.exists.side_effect = [False, True]
+        mock_ssl_cert.execute(CERT_DATA, VTHUNDER)
+        mock_ssl_cert.execute(copy.copy(CERT_DATA), VTHUNDER)
+        self.assertEqual(1, self.client_mock.file.ssl_cert.create.call_count)
+        self.client_mock.file.ssl_cert.update.assert_not_called()
+
+    def test_ssl_cert_create_unchanged_lost_on_device_uploads(self):
+        mock_ssl_cert = cert_tasks.SSLCertCreate()
+        mock_ssl_cert.axapi_client = self.client_mock
+        self.client_mock.file.ssl_cert.exists.return_value = False
+        mock_ssl_cert.execute(CERT_DATA, VTHUNDER)
+        mock_ssl_cert.execute(copy.copy(CERT_DATA), VTHUNDER)
+        self.assertEqual(2, self.client_mock.file.ssl_cert.create.call_count)
+
+    def test_ssl_cert_create_changed_content_uploads(self):
+        mock_ssl_cert = cert_tasks.SSLCertCreate()
+        mock_ssl_cert.axapi_client = self.client_mock
+        mock_ssl_cert.execute(CERT_DATA, VTHUNDER)
+        cert_data = copy.copy(CERT_DATA)
+        cert_data.cert_content = cert_data.cert_content + "\n"
+        mock_ssl_cert.execute(cert_data, VTHUNDER)
+        self.assertEqual(2, self.client_mock.file.ssl_cert.update.call_count)
+
     def test_ssl_cert_create_revert(self):
         mock_ssl_cert = cert_tasks.SSLCertCreate()
         mock_ssl_cert.axapi_client = self.client_mock
-        mock_ssl_cert.revert(CERT_DATA, VTHUNDER)
+        mock_ssl_cert.revert(True, CERT_DATA, VTHUNDER)
         self.client_mock.file.ssl_cert.delete.assert_called_with(
             private_key=a10_test_constants.MOCK_KEY_FILENAME,
             cert_name=a10_test_constants.MOCK_CERT_FILENAME)
 
+    def test_ssl_cert_create_revert_shared(self):
+        mock_ssl_cert = cert_tasks.SSLCertCreate()
+        mock_ssl_cert.axapi_client = self.client_mock
+        created = mock_ssl_cert.execute(CERT_DATA, VTHUNDER)
+        mock_ssl_cert.revert(created, CERT_DATA, VTHUNDER)
+        self.assertFalse(created)
+        self.client_mock.file.ssl_cert.delete.assert_not_called()
+
     def test_ssl_cert_update(self):
         mock_ssl_cert = cert_tasks.SSLCertUpdate()
         mock_ssl_cert.axapi_client = self.client_mock
@@ -156,10 +209,22 @@ class TestCertHandlerTasks(BaseTaskTestCase):
             action=a10_test_constants.MOCK_CERT_ACTION)
         self.client_mock.file.ssl_key.update.assert_not_called()
 
+    def test_ssl_key_create_after_delete_uploads(self):
+        mock_ssl_key = cert_tasks.SSLKeyCreate()
+        mock_ssl_key.axapi_client = self.client_mock
+        mock_ssl_key.execute(CERT_DATA, VTHUNDER)
+        mock_ssl_key.execute(CERT_DATA, VTHUNDER)
+        self.assertEqual(1, self.client_mock.file.ssl_key.update.call_count)
+        delete_ssl_key = cert_tasks.SSLKeyDelete()
+        delete_ssl_key.axapi_client = self.client_mock
+        delete_ssl_key.execute(CERT_DATA, VTHUNDER)
+        mock_ssl_key.execute(CERT_DATA, VTHUNDER)
+        self.assertEqual(2, self.client_mock.file.ssl_key.update.call_count)
+
     def test_ssl_key_create_revert(self):
         mock_ssl_key = cert_tasks.SSLKeyCreate()
         mock_ssl_key.axapi_client = self.client_mock
-        mock_ssl_key.revert(CERT_DATA, VTHUNDER)
+        mock_ssl_key.revert(True, CERT_DATA, VTHUNDER)
         self.client_mock.file.ssl_key.delete.assert_called_with(
             private_key=a10_test_constants.MOCK_KEY_FILENAME)
 
@@ -188,9 +253,9 @@ class TestCertHandlerTasks(BaseTaskTestCase):
         mock_client_ssl_template.axapi_client = self.client_mock
         mock_client_ssl_template.execute(CERT_DATA, VTHUNDER)
         self.client_mock.slb.template.client_ssl.exists.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID)
+            name=a10_test_constants.MOCK_TEMPLATE_NAME)
         self.client_mock.slb.template.client_ssl.update.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID,
+            name=a10_test_constants.MOCK_TEMPLATE_NAME,
             cert=a10_test_constants.MOCK_CERT_FILENAME,
             key=a10_test_constants.MOCK_KEY_FILENAME,
             passphrase=a10_test_constants.MOCK_KEY_PASS)
@@ -202,7 +267,7 @@ class TestCertHandlerTasks(BaseTaskTestCase):
         self.client_mock.slb.template.client_ssl.exists.return_value = False
         mock_client_ssl_template.execute(CERT_DATA, VTHUNDER)
         self.client_mock.slb.template.client_ssl.create.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID,
+            name=a10_test_constants.MOCK_TEMPLATE_NAME,
             cert=a10_test_constants.MOCK_CERT_FILENAME,
             key=a10_test_constants.MOCK_KEY_FILENAME,
             passphrase=a10_test_constants.MOCK_KEY_PASS)
@@ -211,18 +276,35 @@ class TestCertHandlerTasks(BaseTaskTestCase):
     def test_client_ssl_template_create_revert(self):
         mock_client_ssl_template = cert_tasks.ClientSSLTemplateCreate()
         mock_client_ssl_template.axapi_client = self.client_mock
-        mock_client_ssl_template.revert(CERT_DATA, VTHUNDER)
+        mock_client_ssl_template.revert(True, CERT_DATA, VTHUNDER)
         self.client_mock.slb.template.client_ssl.delete.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID)
+            name=a10_test_constants.MOCK_TEMPLATE_NAME)
+
+    def test_client_ssl_template_create_revert_shared(self):
+        mock_client_ssl_template = cert_tasks.ClientSSLTemplateCreate()
+        mock_client_ssl_template.axapi_client = self.client_mock
+        mock_client_ssl_template.revert(False, CERT_DATA, VTHUNDER)
+        self.client_mock.slb.template.client_ssl.delete.assert_not_called()
 
     def test_client_ssl_template_update(self):
         mock_client_ssl_template = cert_tasks.ClientSSLTemplateUpdate()
         mock_client_ssl_template.axapi_client = self.client_mock
         mock_client_ssl_template.execute(CERT_DATA, VTHUNDER)
         self.client_mock.slb.template.client_ssl.exists.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID)
+            name=a10_test_constants.MOCK_TEMPLATE_NAME)
         self.client_mock.slb.template.client_ssl.update.assert_called_with(
-            name=a10_test_constants.MOCK_LISTENER_ID,
+            name=a10_test_constants.MOCK_TEMPLATE_NAME,
+            cert=a10_test_constants.MOCK_CERT_FILENAME,
+            key=a10_test_constants.MOCK_KEY_FILENAME,
+            passphrase=a10_test_constants.MOCK_KEY_PASS)
+
+    def test_client_ssl_template_update_creates_missing(self):
+        mock_client_ssl_template = cert_tasks.ClientSSLTemplateUpdate()
+        mock_client_ssl_template.axapi_client = self.client_mock
+        self.client_mock.slb.template.client_ssl.exists.return_value = False
+        mock_client_ssl_template.execute(CERT_DATA, VTHUNDER)
+        self.client_mock.slb.template.client_ssl.create.assert_called_with(
+            name=a10_test_constants.MOCK_TEMPLATE_NAME,
             cert=a10_test_constants.MOCK_CERT_FILENAME,
             key=a10_test_constants.MOCK_KEY_FILENAME,
             passphrase=a10_test_constants.MOCK_KEY_PASS)
@@ -231,5 +313,18 @@ class TestCertHandlerTasks(BaseTaskTestCase):
         mock_client_ssl_template = cert_tasks.ClientSSLTemplateDelete()
         mock_client_ssl_template.axapi_client = self.client_mock
         mock_client_ssl_template.execute(CERT_DATA, VTHUNDER)
-        self.client_mock.slb.template.client_ssl.delete.assert_called_with(
+        self.client_mock.slb.template.client_ssl.delete.assert_called_once_with(
+            name=a10_test_constants.MOCK_TEMPLATE_NAME)
+
+    def test_listener_client_ssl_template_delete(self):
+        mock_client_ssl_template = cert_tasks.ListenerClientSSLTemplateDelete()
+        mock_client_ssl_template.axapi_client = self.client_mock
+        mock_client_ssl_template.execute(VTHUNDER, LISTENER)
+        self.client_mock.slb.template.client_ssl.delete.assert_called_once_with(
             name=a10_test_constants.MOCK_LISTENER_ID)
+
+    def test_listener_client_ssl_template_delete_not_found(self):
+        mock_client_ssl_template = cert_tasks.ListenerClientSSLTemplateDelete()
+        mock_client_ssl_template.axapi_client = self.client_mock
+        self.client_mock.slb.template.client_ssl.delete.side_effect = acos_errors.NotFound()
+        mock_client_ssl_template.execute(VTHUNDER, LISTENER)
@@ -0,0 +1,172 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from taskflow import engines
+from taskflow.patterns import linear_flow
+from taskflow import task
+
+from octavia.tests.unit import base
+
+from a10_octavia.controller.worker.tasks import decorators
+
+PARTITION = "p1"
+# Unit test bases replace the decorator with a no-op once their setUp ran
+axapi_client_decorator = decorators.axapi_client_decorator
+device_context_switch_decorator = decorators.device_context_switch_decorator
+
+
+class TestDecorators(base.TestCase):
+
+    def setUp(self):
+        super(TestDecorators, self).setUp()
+        decorators._get_partition_exists_cache().clear()
+        self.client_mock = mock.Mock()
+        self.client_mock.host = "10.0.0.1"
+        self.client_mock.current_partition = "shared"
+        self.client_mock.session.session_id = None
+
+        def _active(name):
+            self.client_mock.current_partition = name
+            self.client_mock.session.session_id = "session-1"
+        self.client_mock.system.partition.active.side_effect = _active
+
+    def test_activate_partition_skips_active_partition(self):
+        decorators.activate_partition(self.client_mock, PARTITION)
+        decorators.activate_partition(self.client_mock, PARTITION)
+        self.client_mock.system.partition.exists.assert_called_once_with(PARTITION)
+        self.client_mock.system.partition.active.assert_called_once_with(PARTITION)
+
+    def test_activate_partition_caches_existence(self):
+        other_client = mock.Mock()
+        other_client.host = "10.0.0.1"
+        other_client.session.session_id = None
+        decorators.activate_partition(self.client_mock, PARTITION)
+        decorators.activate_partition(other_client, PARTITION)
+        self.client_mock.system.partition.exists.assert_called_once_with(PARTITION)
+        other_client.system.partition.exists.assert_not_called()
+        other_client.system.partition.active.assert_called_once_with(PARTITION)
+
+    def test_activate_partition_after_reauthentication(self):
+        decorators.activate_partition(self.client_mock, PARTITION)
+        self.client_mock.session.session_id = "session-2"
+        decorators.activate_partition(self.client_mock, PARTITION)
+        self.assertEqual(2, self.client_mock.system.partition.active.call_count)
+
+    def test_activate_partition_checks_missing_partition_again(self):
+        self.client_mock.system.partition.exists.return_value = False
+        decorators.activate_partition(self.client_mock, PARTITION)
+        self.client_mock.system.partition.active.assert_not_called()
+        self.client_mock.system.partition.exists.return_value = True
+        decorators.activate_partition(self.client_mock, PARTITION)
+        self.assertEqual(2, self.client_mock.system.partition.exists.call_count)
+        self.client_mock.system.partition.active.assert_called_once_with(PARTITION)
+
+    def test_invalidate_partition_cache(self):
+        decorators.partition_exists(self.client_mock, PARTITION)
+        decorators.invalidate_partition_cache(self.client_mock.host, PARTITION)
+        self.client_mock.system.partition.exists.return_value = False
+        self.assertFalse(decorators.partition_exists(self.client_mock, PARTITION))
+        self.assertEqual(2, self.client_mock.system.partition.exists.call_count)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_axapi_client_decorator_vthunder_keyword(self, mock_pool):
+        mock_pool.acquire_client.return_value = self.client_mock
+        vthunder = mock.Mock(partition_name="shared")
+
+        class Task(object):
+            @axapi_client_decorator
+            def execute(self, listener, vthunder):
+                return self.axapi_client, listener, vthunder
+
+        self.assertEqual((self.client_mock, "listener-1", vthunder),
+                         Task().execute(listener="listener-1", vthunder=vthunder))
+        mock_pool.release_client.assert_called_once_with(
+            self.client_mock, vthunder, discard=False)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_axapi_client_decorator_in_taskflow_engine(self, mock_pool):
+        mock_pool.acquire_client.return_value = self.client_mock
+        vthunder = mock.Mock(partition_name="shared")
+
+        class ClientTask(task.Task):
+            @axapi_client_decorator
+            def execute(self, vthunder):
+                return self.axapi_client
+
+        flow = linear_flow.Flow('decorated').add(
+            ClientTask(requires='vthunder', provides='client'))
+        result = engines.run(flow, store={'vthunder': vthunder})
+        self.assertIs(self.client_mock, result['client'])
+        mock_pool.acquire_client.assert_called_once_with(vthunder)
+
+    def _run_in_device_context(self, mock_pool, vthunder, error=None):
+        mock_pool.acquire_client.return_value = self.client_mock
+
+        class Task(object):
+            @axapi_client_decorator
+            def execute(self, vthunder):
+                return self.configure(device_id=2, master_device_id=1)
+
+            @device_context_switch_decorator
+            def configure(self, device_id, master_device_id):
+                if error:
+                    raise error
+
+        Task().execute(vthunder=vthunder)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_device_context_switch_releases_client(self, mock_pool):
+        vthunder = mock.Mock(partition_name="shared")
+        self._run_in_device_context(mock_pool, vthunder)
+        self.assertEqual([mock.call(2, None), mock.call(1, None)],
+                         self.client_mock.device_context.switch.call_args_list)
+        mock_pool.release_client.assert_called_once_with(
+            self.client_mock, vthunder, discard=False)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_device_context_switch_failure_discards_client(self, mock_pool):
+        vthunder = mock.Mock(partition_name="shared")
+        self.assertRaises(ValueError, self._run_in_device_context, mock_pool, vthunder,
+                          ValueError())
+        self.assertEqual([mock.call(2, None), mock.call(1, None)],
+                         self.client_mock.device_context.switch.call_args_list)
+        mock_pool.release_client.assert_called_once_with(
+            self.client_mock, vthunder, discard=True)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_device_context_restore_failure_discards_client(self, mock_pool):
+        vthunder = mock.Mock(partition_name="shared")
+        self.client_mock.device_context.switch.side_effect = [None, ValueError()]
+        self.assertRaises(ValueError, self._run_in_device_context, mock_pool, vthunder)
+        mock_pool.release_client.assert_called_once_with(
+            self.client_mock, vthunder, discard=True)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.decorators.axapi_session_pool')
+    def test_failure_in_partition_discards_client(self, mock_pool):
+        vthunder = mock.Mock(partition_name=PARTITION)
+        mock_pool.acquire_client.return_value = self.client_mock
+
+        class Task(object):
+            @axapi_client_decorator
+            def execute(self, vthunder):
+                raise ValueError()
+
+        self.assertRaises(ValueError, Task().execute, vthunder=vthunder)
+        mock_pool.release_client.assert_called_once_with(
+            self.client_mock, vthunder, discard=True)
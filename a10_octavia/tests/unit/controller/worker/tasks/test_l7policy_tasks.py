@@ -0,0 +1,96 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import imp
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.common import data_models as o_data_models
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import aflex_sync
+from a10_octavia.controller.worker.tasks import l7policy_tasks as task
+from a10_octavia.tests.common import a10constants
+from a10_octavia.tests.unit import base
+
+VTHUNDER = data_models.VThunder()
+
+
+def _listener(policies):
+    listener = o_data_models.Listener(id=a10constants.MOCK_LISTENER_ID, name='listener',
+                                      protocol='HTTP', protocol_port=80,
+                                      load_balancer_id=a10constants.MOCK_LOAD_BALANCER_ID)
+    for index in range(policies):
+        l7policy = o_data_models.L7Policy(id='l7policy-%d' % index, action='REJECT',
+                                          position=index + 1, listener=listener)
+        l7policy.l7rules = [o_data_models.L7Rule(type='PATH', compare_type='REGEX',
+                                                 value='^/%d' % index, invert=False)]
+        listener.l7policies.append(l7policy)
+    return listener
+
+
+class TestL7PolicyTasks(base.BaseTaskTestCase):
+
+    def setUp(self):
+        super(TestL7PolicyTasks, self).setUp()
+        imp.reload(task)
+        aflex_sync.get_uploads().invalidate()
+        aflex_sync.get_bindings().invalidate()
+        self.client_mock = mock.Mock()
+        self.client_mock.slb.virtual_server.vport.get.return_value = {'port': {}}
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+
+    def test_create_l7policy(self):
+        listener = _listener(2)
+        create_task = task.CreateL7Policy()
+        create_task.axapi_client = self.client_mock
+        create_task.execute(listener.l7policies[1], [listener], VTHUNDER)
+        self.assertEqual('l7policy-1',
+                         self.client_mock.slb.aflex_policy.create.call_args[1]['file'])
+        update_kwargs = self.client_mock.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([{'aflex': 'l7policy-1'}], update_kwargs['aflex-scripts'])
+
+    def test_update_l7policy_position_consolidated(self):
+        self.conf.config(group='listener', consolidate_l7policies=True)
+        listener = _listener(3)
+        update_task = task.UpdateL7Policy()
+        update_task.axapi_client = self.client_mock
+        update_task.execute(listener.l7policies[2], [listener], VTHUNDER, {'position': 1})
+        create_kwargs = self.client_mock.slb.aflex_policy.create.call_args[1]
+        self.assertEqual(a10constants.MOCK_LISTENER_ID, create_kwargs['file'])
+        script = create_kwargs['script']
+        self.assertLess(script.index('"^/2"'), script.index('"^/0"'))
+        self.assertLess(script.index('"^/0"'), script.index('"^/1"'))
+        update_kwargs = self.client_mock.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([{'aflex': a10constants.MOCK_LISTENER_ID}],
+                         update_kwargs['aflex-scripts'])
+
+    def test_delete_last_l7policy_consolidated(self):
+        self.conf.config(group='listener', consolidate_l7policies=True)
+        listener = _listener(1)
+        l7policy = listener.l7policies.pop()
+        self.client_mock.slb.virtual_server.vport.get.return_value = {
+            'port': {'aflex-scripts': [{'aflex': a10constants.MOCK_LISTENER_ID}]}}
+        delete_task = task.DeleteL7Policy()
+        delete_task.axapi_client = self.client_mock
+        delete_task.execute(l7policy, VTHUNDER)
+        update_kwargs = self.client_mock.slb.virtual_server.vport.update.call_args[1]
+        self.assertEqual([], update_kwargs['aflex-scripts'])
+        self.client_mock.slb.aflex_policy.delete.assert_has_calls(
+            [mock.call(a10constants.MOCK_LISTENER_ID), mock.call('l7policy-0')])
@@ -0,0 +1,137 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.common import data_models as o_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.controller.worker.tasks import policy
+
+
+def _routing_policy(pool_id, rule_type, compare_type, value, invert=False):
+    l7policy = o_data_models.L7Policy(id='l7policy-' + pool_id, action='REDIRECT_TO_POOL',
+                                      redirect_pool=o_data_models.Pool(id=pool_id))
+    l7policy.l7rules = [o_data_models.L7Rule(type=rule_type, compare_type=compare_type,
+                                             value=value, invert=invert)]
+    return l7policy
+
+
+def _policy(*values):
+    l7policy = o_data_models.L7Policy(id='l7policy-1', action='REDIRECT_TO_URL',
+                                      redirect_url='http://example.com')
+    l7policy.l7rules = [o_data_models.L7Rule(type='PATH', compare_type='STARTS_WITH',
+                                             value=value, invert=False)
+                        for value in values]
+    return l7policy
+
+
+class TestPolicyCompiler(base.TestCase):
+
+    def setUp(self):
+        super(TestPolicyCompiler, self).setUp()
+        self.compiler = policy.PolicyCompiler(cache_size=8)
+
+    def test_compiles_like_policy_util(self):
+        l7policy = _policy('/a', '/b')
+        self.assertEqual(policy.PolicyUtil().createPolicy(l7policy),
+                         self.compiler.createPolicy(l7policy))
+
+    def test_unchanged_policy_is_not_compiled_again(self):
+        self.compiler.createPolicy(_policy('/a', '/b'))
+        with mock.patch.object(policy.PolicyUtil, 'createPolicy') as create_policy:
+            script = self.compiler.createPolicy(_policy('/a', '/b'))
+        create_policy.assert_not_called()
+        self.assertIn('"/b"', script)
+
+    def test_changed_policy_is_compiled_again(self):
+        self.compiler.createPolicy(_policy('/a', '/b'))
+        script = self.compiler.createPolicy(_policy('/a', '/c'))
+        self.assertIn('"/c"', script)
+        self.assertNotIn('"/b"', script)
+
+    def test_policy_key(self):
+        key = policy.policy_key(_policy('/a'))
+        self.assertEqual(key, policy.policy_key(_policy('/a')))
+        l7policy = _policy('/a')
+        l7policy.redirect_url = 'http://example.org'
+        self.assertNotEqual(key, policy.policy_key(l7policy))
+        l7policy = _policy('/a')
+        l7policy.l7rules[0].invert = True
+        self.assertNotEqual(key, policy.policy_key(l7policy))
+
+    def test_cache_size(self):
+        compiler = policy.PolicyCompiler(cache_size=1)
+        compiler.createPolicy(_policy('/a'))
+        compiler.createPolicy(_policy('/b'))
+        with mock.patch.object(policy.PolicyUtil, 'createPolicy') as create_policy:
+            compiler.createPolicy(_policy('/b'))
+            compiler.createPolicy(_policy('/a'))
+        create_policy.assert_called_once()
+
+
+class TestListenerPolicy(base.TestCase):
+
+    def setUp(self):
+        super(TestListenerPolicy, self).setUp()
+        self.util = policy.PolicyUtil()
+
+    def test_switch_case(self):
+        self.assertEqual(('HTTP::host', 'a.example.com'), policy.switch_case(
+            _routing_policy('pool-1', 'HOST_NAME', 'EQUAL_TO', 'a.example.com')))
+        self.assertEqual(('HTTP::uri', '/api*'), policy.switch_case(
+            _routing_policy('pool-1', 'PATH', 'STARTS_WITH', '/api')))
+        self.assertEqual(('HTTP::uri', '*.jpg'), policy.switch_case(
+            _routing_policy('pool-1', 'FILE_TYPE', 'REGEX', '.jpg')))
+        self.assertIsNone(policy.switch_case(
+            _routing_policy('pool-1', 'PATH', 'STARTS_WITH', '/api', invert=True)))
+        self.assertIsNone(policy.switch_case(
+            _routing_policy('pool-1', 'PATH', 'CONTAINS', '/api')))
+        self.assertIsNone(policy.switch_case(
+            _routing_policy('pool-1', 'PATH', 'STARTS_WITH', '/api*')))
+        self.assertIsNone(policy.switch_case(_policy('/a', '/b')))
+
+    def test_consecutive_host_rules_share_one_switch(self):
+        script = self.util.createListenerPolicy([
+            _routing_policy('pool-1', 'HOST_NAME', 'EQUAL_TO', 'a.example.com'),
+            _routing_policy('pool-2', 'HOST_NAME', 'STARTS_WITH', 'b.')])
+        self.assertEqual(1, script.count('switch -glob [HTTP::host]'))
+        self.assertNotIn('if {', script)
+        self.assertLess(script.index('"a.example.com" {\npool pool-1'),
+                        script.index('"b.*" {\npool pool-2'))
+
+    def test_policies_keep_position_order(self):
+        script = self.util.createListenerPolicy([
+            _routing_policy('pool-1', 'PATH', 'REGEX', '^/a'),
+            _routing_policy('pool-2', 'PATH', 'REGEX', '^/b'),
+            _routing_policy('pool-3', 'HOST_NAME', 'EQUAL_TO', 'c.example.com'),
+            _routing_policy('pool-4', 'PATH', 'REGEX', '^/d')])
+        self.assertTrue(script.startswith(
+            'when HTTP_REQUEST {\nif { ([HTTP::uri] matches_regex "^/a") } {\npool pool-1\n} '
+            'elseif { ([HTTP::uri] matches_regex "^/b") } {\npool pool-2\n} else {\n'
+            'switch -glob [HTTP::host] {\n"c.example.com" {\npool pool-3\n}\ndefault {\n'
+            'if { ([HTTP::uri] matches_regex "^/d") } {\npool pool-4\n}'))
+        self.assertEqual(script.count('{'), script.count('}'))
+
+    def test_compiler_caches_listener_policy(self):
+        compiler = policy.PolicyCompiler(cache_size=8)
+        l7policies = [_routing_policy('pool-1', 'PATH', 'REGEX', '^/a')]
+        compiler.createListenerPolicy(l7policies)
+        with mock.patch.object(policy.PolicyUtil, 'createListenerPolicy') as create:
+            compiler.createListenerPolicy(l7policies)
+            compiler.createListenerPolicy(l7policies + [_policy('/b')])
+        create.assert_called_once()
@@ -0,0 +1,158 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import threading
+
+from acos_client import errors as acos_errors
+from oslo_config import cfg
+from oslo_config import fixture as oslo_fixture
+from requests import exceptions as req_exceptions
+from taskflow import states
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import readiness
+
+VTHUNDER = data_models.VThunder(id=1, ip_address="10.0.0.1")
+
+
+class TestReadiness(base.TestCase):
+
+    def setUp(self):
+        super(TestReadiness, self).setUp()
+        self.conf = self.useFixture(oslo_fixture.Config(cfg.CONF))
+        self.conf.config(group='a10_controller_worker',
+                         vthunder_ready_poll_min_interval=1,
+                         vthunder_ready_poll_max_interval=4,
+                         vthunder_ready_timeout=60,
+                         vthunder_reboot_shutdown_timeout=30)
+        self.clock = 0.0
+        self.sleeps = []
+        time_patcher = mock.patch.object(readiness, 'time')
+        mock_time = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+        mock_time.time.side_effect = lambda: self.clock
+        mock_time.sleep.side_effect = self._sleep
+        self.client_mock = mock.Mock()
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.clock += seconds
+
+    def test_wait_for_vthunder_ready(self):
+        waited = readiness.wait_for_vthunder(self.client_mock, VTHUNDER)
+        self.assertEqual(0, waited)
+        self.assertEqual([], self.sleeps)
+
+    def test_wait_for_vthunder_backoff(self):
+        self.client_mock.system.information.side_effect = [
+            req_exceptions.ConnectionError(), acos_errors.ACOSException(),
+            req_exceptions.ReadTimeout(), req_exceptions.ConnectionError(), None]
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER)
+        self.assertEqual(4, len(self.sleeps))
+        for upper, seconds in zip([1, 2, 4, 4], self.sleeps):
+            self.assertTrue(upper / 2.0 <= seconds <= upper)
+
+    def test_wait_for_vthunder_after_reboot(self):
+        self.client_mock.system.information.side_effect = [
+            None, req_exceptions.ConnectionError(), req_exceptions.ConnectionError(), None]
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER, after_reboot=True)
+        self.assertEqual(4, self.client_mock.system.information.call_count)
+
+    def test_wait_for_vthunder_reboot_not_observed(self):
+        self.conf.config(group='a10_controller_worker', vthunder_reboot_shutdown_timeout=3)
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER, after_reboot=True)
+        self.assertEqual(3, sum(self.sleeps))
+
+    def test_wait_for_vthunder_timeout(self):
+        self.client_mock.system.information.side_effect = req_exceptions.ConnectionError()
+        self.assertRaises(req_exceptions.ConnectionError,
+                          readiness.wait_for_vthunder, self.client_mock, VTHUNDER,
+                          timeout=10)
+        self.assertEqual(10, sum(self.sleeps))
+
+    def _sync_status(self, *statuses):
+        self.client_mock.session.id = 'session-1'
+        self.client_mock.http.request.side_effect = [
+            status if isinstance(status, Exception)
+            else {'config-sync': {'oper': {'status': status}}} for status in statuses]
+
+    def test_wait_for_config_sync(self):
+        self._sync_status(req_exceptions.ConnectionError(), 'In Progress', 'Complete')
+        readiness.wait_for_config_sync(self.client_mock, VTHUNDER)
+        self.assertEqual(2, len(self.sleeps))
+        self.client_mock.http.request.assert_called_with(
+            "GET", "/axapi/v3/vrrp-a/config-sync/oper", {},
+            {'Authorization': "A10 session-1"})
+        self.client_mock.system.information.assert_not_called()
+
+    def test_wait_for_config_sync_failed(self):
+        self._sync_status('Failed')
+        self.assertRaises(acos_errors.ACOSException,
+                          readiness.wait_for_config_sync, self.client_mock, VTHUNDER)
+
+    def test_wait_for_config_sync_timeout(self):
+        self.client_mock.session.id = 'session-1'
+        self.client_mock.http.request.return_value = {
+            'config-sync': {'oper': {'status': 'In Progress'}}}
+        self.assertRaises(acos_errors.ACOSException,
+                          readiness.wait_for_config_sync, self.client_mock, VTHUNDER,
+                          timeout=10)
+        self.assertEqual(10, sum(self.sleeps))
+
+    def test_wait_for_config_sync_not_found(self):
+        self._sync_status(acos_errors.NotFound())
+        readiness.wait_for_config_sync(self.client_mock, VTHUNDER)
+        self.assertEqual([30], self.sleeps)
+        self.assertEqual(1, self.client_mock.http.request.call_count)
+
+    def test_wait_for_config_sync_missing_status(self):
+        self.client_mock.session.id = 'session-1'
+        self.client_mock.http.request.side_effect = [{'config-sync': {'oper': {}}}]
+        readiness.wait_for_config_sync(self.client_mock, VTHUNDER)
+        self.assertEqual([30], self.sleeps)
+
+    def test_wait_for_config_sync_no_answer(self):
+        self.client_mock.session.id = 'session-1'
+        self.client_mock.http.request.side_effect = req_exceptions.ConnectionError()
+        readiness.wait_for_config_sync(self.client_mock, VTHUNDER, timeout=10)
+        self.assertEqual(10, sum(self.sleeps))
+
+    def test_wait_report_listener(self):
+        listener = readiness.WaitReportListener(mock.Mock())
+        listener._flow_receiver(states.RUNNING, {'flow_name': 'flow'})
+        self.client_mock.system.information.side_effect = [
+            req_exceptions.ConnectionError(), None, None, None]
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER)
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER)
+        listener._flow_receiver(states.SUCCESS, {'flow_name': 'flow'})
+        self.assertEqual(2, listener.report.waits)
+        self.assertEqual(sum(self.sleeps), listener.report.seconds)
+        readiness.wait_for_vthunder(self.client_mock, VTHUNDER)
+        self.assertEqual(2, listener.report.waits)
+
+    def test_bind_report_to_other_thread(self):
+        listener = readiness.WaitReportListener(mock.Mock())
+        listener._flow_receiver(states.RUNNING, {'flow_name': 'flow'})
+        wait = readiness.bind_report(readiness.wait_for_vthunder)
+        listener._flow_receiver(states.SUCCESS, {'flow_name': 'flow'})
+        thread = threading.Thread(target=wait, args=(self.client_mock, VTHUNDER))
+        thread.start()
+        thread.join()
+        self.assertEqual(1, listener.report.waits)
@@ -30,6 +30,7 @@ from octavia.network.drivers.neutron import utils
 from a10_octavia.common import config_options
 from a10_octavia.common import data_models as a10_data_models
 from a10_octavia.common import utils as a10_utils
+from a10_octavia.controller.worker.tasks import address_index
 from a10_octavia.controller.worker.tasks import vthunder_tasks as task
 from a10_octavia.network.drivers.neutron import a10_octavia_neutron
 from a10_octavia.tests.common import a10constants
@@ -178,6 +179,14 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         mock_task._subnet.id = mock.Mock()
         mock_task._subnet.network_id = "mock-network-1"
         mock_task._network_driver = a10_octavia_neutron.A10OctaviaNeutronDriver()
+        a10_octavia_neutron._network_cache = None
+        address_index.get_index().invalidate()
+        ve_port = n_data_models.Port(id=DEL_PORT_ID,
+                                     fixed_ips=[n_data_models.FixedIP(ip_address=VE_IP)])
+        convert_port = mock.patch.object(utils, 'convert_port_dict_to_model',
+                                         return_value=ve_port)
+        convert_port.start()
+        self.addCleanup(convert_port.stop)
 
     def test_TagInterfaceForLB_create_vlan_ve_with_dhcp(self):
         intf = a10_utils.convert_interface_to_data_model(ETHERNET_INTERFACE)
@@ -191,7 +200,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.interface.ethernet.get.return_value = ETH_DATA
         self.client_mock.vlan.exists.return_value = False
         mock_task._network_driver.neutron_client.create_port = mock.Mock()
-        utils.convert_port_dict_to_model = mock.Mock()
+        mock_task._network_driver.get_cached_network = mock.Mock()
+        mock_task._network_driver.get_cached_network.return_value = NETWORK_11
         mock_task._network_driver.get_network = mock.Mock()
         mock_task._network_driver.get_network.return_value = NETWORK_11
         mock_task._network_driver.list_networks = mock.Mock()
@@ -222,8 +232,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.interface.ethernet.get.return_value = ETH_DATA
         self.client_mock.vlan.exists.return_value = False
         mock_task._network_driver.neutron_client.create_port = mock.Mock()
-        mock_task._network_driver.get_network = mock.Mock()
-        mock_task._network_driver.get_network.return_value = NETWORK_12
+        mock_task._network_driver.get_cached_network = mock.Mock()
+        mock_task._network_driver.get_cached_network.return_value = NETWORK_12
         mock_task._network_driver.list_networks = mock.Mock()
         mock_task._network_driver.list_networks.return_value = [NETWORK_12]
         mock_task.execute(lb, mock_thunder)
@@ -251,8 +261,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.interface.ethernet.get.return_value = ETH_DATA
         self.client_mock.vlan.exists.return_value = False
         mock_task._network_driver.neutron_client.create_port = mock.Mock()
-        mock_task._network_driver.get_network = mock.Mock()
-        mock_task._network_driver.get_network.return_value = NETWORK_12
+        mock_task._network_driver.get_cached_network = mock.Mock()
+        mock_task._network_driver.get_cached_network.return_value = NETWORK_12
         mock_task._network_driver.list_networks = mock.Mock()
         mock_task._network_driver.list_networks.return_value = [NETWORK_12]
         mock_task.execute(lb, mock_thunder)
@@ -307,6 +317,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.interface.ethernet.get.return_value = ETH_DATA
         self.client_mock.vlan.exists.return_value = False
         mock_task._network_driver.neutron_client.create_port = mock.Mock()
+        mock_task._network_driver.get_cached_network = mock.Mock()
+        mock_task._network_driver.get_cached_network.return_value = NETWORK_11
         mock_task._network_driver.get_network = mock.Mock()
         mock_task._network_driver.get_network.return_value = NETWORK_11
         mock_task._network_driver.list_networks = mock.Mock()
@@ -486,7 +498,27 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         ret_val = task.SetupDeviceNetworkMap().execute(vthunder=None)
         self.assertIsNone(ret_val)
 
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.axapi_session_pool')
+    @mock.patch('a10_octavia.controller.worker.tasks.vthunder_tasks.readiness')
+    def test_ConfigureVRRPSync_execute_waits_for_sync(self, mock_readiness, mock_pool):
+        mock_thunder = copy.deepcopy(VTHUNDER)
+        backup_thunder = copy.deepcopy(VTHUNDER)
+        backup_thunder.ip_address = DEVICE2_MGMT_IP
+        mock_task = task.ConfigureVRRPSync()
+        mock_task.axapi_client = self.client_mock
+        mock_task.execute(mock_thunder, backup_thunder)
+        self.client_mock.system.action.configSynch.assert_called_once_with(
+            DEVICE2_MGMT_IP, backup_thunder.username, backup_thunder.password)
+        mock_readiness.wait_for_config_sync.assert_called_once_with(
+            self.client_mock, mock_thunder)
+        backup_client = mock_pool.acquire_client.return_value
+        mock_readiness.wait_for_vthunder.assert_called_once_with(backup_client, backup_thunder)
+        mock_pool.release_client.assert_called_once_with(backup_client, backup_thunder,
+                                                         discard=False)
+
     def test_WriteMemory_execute_save_shared_mem(self):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         write_memory_coalesce_window=0)
         mock_thunder = copy.deepcopy(VTHUNDER)
         mock_task = task.WriteMemory()
         mock_task.axapi_client = self.client_mock
@@ -494,6 +526,8 @@ class TestVThunderTasks(base.BaseTaskTestCase):
         self.client_mock.system.action.write_memory.assert_called_with(partition='shared')
 
     def test_WriteMemory_execute_save_specific_partition_mem(self):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         write_memory_coalesce_window=0)
         thunder = copy.deepcopy(VTHUNDER)
         thunder.partition_name = "testPartition"
         mock_task = task.WriteMemory()
@@ -506,3 +540,24 @@ class TestVThunderTasks(base.BaseTaskTestCase):
     def test_WriteMemory_execute_delete_flow_after_error_no_fail(self):
         ret_val = task.WriteMemory().execute(vthunder=None)
         self.assertIsNone(ret_val)
+
+    @mock.patch('a10_octavia.controller.worker.tasks.write_memory.get_coalescer')
+    def test_WriteMemory_execute_coalesced(self, mock_get_coalescer):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         write_memory_coalesce_window=2)
+        thunder = copy.deepcopy(VTHUNDER)
+        mock_task = task.WriteMemory()
+        mock_task.axapi_client = self.client_mock
+        mock_task.execute(thunder)
+        mock_get_coalescer.return_value.mark_dirty.assert_called_once_with(thunder)
+        mock_get_coalescer.return_value.mark_dirty.return_value.wait.assert_not_called()
+        self.client_mock.system.action.write_memory.assert_not_called()
+
+    @mock.patch('a10_octavia.controller.worker.tasks.write_memory.get_coalescer')
+    def test_WriteMemory_execute_coalesced_wait(self, mock_get_coalescer):
+        self.conf.config(group=a10constants.A10_CONTROLLER_WORKER_CONF_SECTION,
+                         write_memory_coalesce_window=2)
+        thunder = copy.deepcopy(VTHUNDER)
+        mock_task = task.WriteMemory(wait=True)
+        mock_task.execute(thunder)
+        mock_get_coalescer.return_value.mark_dirty.return_value.wait.assert_called_once_with()
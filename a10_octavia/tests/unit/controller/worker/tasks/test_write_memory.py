@@ -0,0 +1,96 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from acos_client import errors as acos_errors
+
+from octavia.tests.unit import base
+
+from a10_octavia.common import data_models
+from a10_octavia.controller.worker.tasks import write_memory
+
+VTHUNDER = data_models.VThunder(ip_address="10.0.0.1", partition_name="shared")
+VTHUNDER_PARTITION = data_models.VThunder(ip_address="10.0.0.1", partition_name="p1")
+
+
+class TestWriteMemoryCoalescer(base.TestCase):
+
+    def setUp(self):
+        super(TestWriteMemoryCoalescer, self).setUp()
+        write_patcher = mock.patch.object(write_memory, '_write')
+        self.mock_write = write_patcher.start()
+        self.addCleanup(write_patcher.stop)
+
+    def _coalescer(self, window):
+        coalescer = write_memory.WriteMemoryCoalescer(window)
+        self.addCleanup(coalescer.close)
+        return coalescer
+
+    def test_mark_dirty_coalesces_partition(self):
+        coalescer = self._coalescer(0.1)
+        first = coalescer.mark_dirty(VTHUNDER)
+        second = coalescer.mark_dirty(VTHUNDER)
+        self.assertIs(first, second)
+        self.assertTrue(first.wait(5))
+        self.mock_write.assert_called_once_with(VTHUNDER)
+
+    def test_mark_dirty_per_partition(self):
+        coalescer = self._coalescer(0.1)
+        coalescer.mark_dirty(VTHUNDER).wait(5)
+        coalescer.mark_dirty(VTHUNDER_PARTITION).wait(5)
+        self.mock_write.assert_has_calls([mock.call(VTHUNDER), mock.call(VTHUNDER_PARTITION)])
+
+    def test_mark_dirty_during_write_schedules_next_write(self):
+        writing = threading.Event()
+        release = threading.Event()
+
+        def _slow_write(vthunder):
+            writing.set()
+            release.wait(5)
+        self.mock_write.side_effect = _slow_write
+        coalescer = self._coalescer(0)
+        first = coalescer.mark_dirty(VTHUNDER)
+        writing.wait(5)
+        second = coalescer.mark_dirty(VTHUNDER)
+        self.assertIsNot(first, second)
+        release.set()
+        self.assertTrue(second.wait(5))
+        self.assertEqual(2, self.mock_write.call_count)
+
+    def test_close_writes_pending(self):
+        coalescer = self._coalescer(3600)
+        pending = coalescer.mark_dirty(VTHUNDER)
+        coalescer.close()
+        self.assertTrue(pending.wait(0))
+        self.mock_write.assert_called_once_with(VTHUNDER)
+
+    def test_mark_dirty_after_close_writes_now(self):
+        coalescer = self._coalescer(3600)
+        coalescer.close()
+        pending = coalescer.mark_dirty(VTHUNDER)
+        self.assertTrue(pending.wait(0))
+        self.mock_write.assert_called_once_with(VTHUNDER)
+
+    def test_write_error_is_recorded(self):
+        error = acos_errors.ACOSException()
+        self.mock_write.side_effect = error
+        coalescer = self._coalescer(0)
+        pending = coalescer.mark_dirty(VTHUNDER)
+        pending.wait(5)
+        self.assertIs(error, pending.error)
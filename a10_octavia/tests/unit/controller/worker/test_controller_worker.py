@@ -0,0 +1,55 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from octavia.tests.unit import base
+
+from a10_octavia.controller.worker import controller_worker
+
+
+class TestA10ControllerWorker(base.TestCase):
+
+    def setUp(self):
+        super(TestA10ControllerWorker, self).setUp()
+        db_session = mock.patch('octavia.db.api.get_session')
+        db_session.start()
+        self.addCleanup(db_session.stop)
+        self.worker = controller_worker.A10ControllerWorker.__new__(
+            controller_worker.A10ControllerWorker)
+        self.worker._member_repo = mock.Mock()
+        self.worker._member_flows = mock.Mock()
+        self.worker._taskflow_load = mock.Mock()
+
+    def test_batch_update_members_skips_gone_members(self):
+        member = mock.Mock(project_id='project-1')
+        members = {'member-1': member}
+        self.worker._member_repo.get.side_effect = (
+            lambda session, id: members.get(id))
+        with mock.patch.object(controller_worker, 'CONF') as conf:
+            conf.hardware_thunder.devices = {}
+            self.worker.batch_update_members(
+                ['member-2'], [], [{'id': 'member-1', 'weight': 5},
+                                   {'id': 'member-3', 'weight': 5}])
+        self.worker._member_flows.get_batch_update_members_flow.assert_called_once_with(
+            [], [], [(member, {'weight': 5})], conf.a10_controller_worker.loadbalancer_topology)
+        self.worker._taskflow_load.return_value.run.assert_called_once_with()
+
+    def test_batch_update_members_all_gone(self):
+        self.worker._member_repo.get.return_value = None
+        self.worker.batch_update_members(['member-1'], [], [{'id': 'member-2'}])
+        self.worker._taskflow_load.assert_not_called()
@@ -0,0 +1,92 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from taskflow import engines
+from taskflow.patterns import linear_flow
+from taskflow import task
+
+from octavia.tests.unit import base
+
+from a10_octavia.controller.worker import flow_cache
+
+
+class Double(task.Task):
+    def execute(self, value):
+        return value * 2
+
+
+class Fail(task.Task):
+    def execute(self, value):
+        raise ValueError(value)
+
+
+def _build_flow(task_cls=Double):
+    flow = linear_flow.Flow('test-flow')
+    flow.add(task_cls(provides='result'))
+    return flow
+
+
+class TestFlowCache(base.TestCase):
+
+    def setUp(self):
+        super(TestFlowCache, self).setUp()
+        self.cache = flow_cache.FlowCache(max_idle=2)
+
+    def _run(self, flow, value):
+        engine = engines.load(flow, store={'value': value})
+        flow_cache.FlowCheckinListener(engine, self.cache, flow).register()
+        engine.run()
+        return engine.storage.fetch('result')
+
+    def test_checkout_builds_once_per_shape(self):
+        flow = self.cache.checkout(('op',), _build_flow)
+        self.assertEqual(2, self._run(flow, 1))
+        self.assertIs(flow, self.cache.checkout(('op',), _build_flow))
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+        self.assertEqual(1, self.cache.build_latency['op'].count)
+
+    def test_checked_out_flow_is_not_shared(self):
+        flow = self.cache.checkout(('op',), _build_flow)
+        other = self.cache.checkout(('op',), _build_flow)
+        self.assertIsNot(flow, other)
+        self.assertIsNot(flow, self.cache.checkout(('other-op',), _build_flow))
+
+    def test_store_is_bound_per_run(self):
+        flow = self.cache.checkout(('op',), _build_flow)
+        self.assertEqual(2, self._run(flow, 1))
+        flow = self.cache.checkout(('op',), _build_flow)
+        self.assertEqual(6, self._run(flow, 3))
+
+    def test_failed_flow_is_checked_in(self):
+        flow = self.cache.checkout(('op',), lambda: _build_flow(Fail))
+        self.assertRaises(ValueError, self._run, flow, 1)
+        self.assertIs(flow, self.cache.checkout(('op',), lambda: _build_flow(Fail)))
+
+    def test_idle_flows_are_bounded(self):
+        flows = [self.cache.checkout(('op',), _build_flow) for i in range(3)]
+        for flow in flows:
+            self.cache.checkin(flow)
+        self.assertEqual(2, len(self.cache._idle[('op',)]))
+
+    def test_checkin_ignores_uncached_flow(self):
+        self.cache.checkin(_build_flow())
+        self.assertEqual({}, dict(self.cache._idle))
+
+    def test_record_compile(self):
+        flow = self.cache.checkout(('op',), _build_flow)
+        self.cache.record_compile(flow, 0.5)
+        self.cache.record_compile(_build_flow(), 0.25)
+        self.assertEqual(0.5, self.cache.compile_latency['op'].percentile(50))
+        self.assertEqual(0.25, self.cache.compile_latency['test-flow'].percentile(50))
@@ -0,0 +1,153 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from octavia.db import base_models
+from octavia.db import models as o_models
+from octavia.tests.unit import base
+
+from a10_octavia.db import models
+from a10_octavia.db import repositories
+
+PROJECT_ID = 'project-1'
+OTHER_PROJECT_ID = 'project-2'
+TABLES = [o_models.LoadBalancer.__table__, o_models.Vip.__table__, o_models.Member.__table__,
+          o_models.Listener.__table__, o_models.ListenerStatistics.__table__,
+          models.VThunder.__table__]
+CERT_REF = 'http://barbican/v1/containers/container-1'
+OTHER_CERT_REF = 'http://barbican/v1/containers/container-2'
+
+
+class TestMemberRepository(base.TestCase):
+
+    def setUp(self):
+        super(TestMemberRepository, self).setUp()
+        engine = sa.create_engine('sqlite://')
+        base_models.BASE.metadata.create_all(engine, tables=TABLES)
+        self.session = orm.sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        self.member_repo = repositories.MemberRepository()
+
+    def _add_lb(self, lb_id, project_id, subnet_id):
+        self.session.add(o_models.LoadBalancer(
+            id=lb_id, project_id=project_id, provisioning_status='ACTIVE',
+            operating_status='ONLINE', enabled=True))
+        self.session.add(o_models.Vip(load_balancer_id=lb_id, subnet_id=subnet_id))
+
+    def _add_member(self, member_id, project_id, subnet_id):
+        self.session.add(o_models.Member(
+            id=member_id, project_id=project_id, pool_id=member_id, subnet_id=subnet_id,
+            ip_address='10.0.0.1', protocol_port=80, backup=False,
+            provisioning_status='ACTIVE', operating_status='ONLINE', enabled=True))
+
+    def test_get_subnet_usage_count(self):
+        self._add_lb('lb-1', PROJECT_ID, 'subnet-1')
+        self._add_lb('lb-2', PROJECT_ID, 'subnet-2')
+        self._add_lb('lb-3', OTHER_PROJECT_ID, 'subnet-1')
+        self._add_member('member-1', PROJECT_ID, 'subnet-1')
+        self._add_member('member-2', PROJECT_ID, 'subnet-1')
+        self._add_member('member-3', OTHER_PROJECT_ID, 'subnet-1')
+        self.session.flush()
+        self.assertEqual(3, self.member_repo.get_subnet_usage_count(
+            self.session, PROJECT_ID, 'subnet-1'))
+        self.assertEqual(1, self.member_repo.get_subnet_usage_count(
+            self.session, PROJECT_ID, 'subnet-2'))
+        self.assertEqual(0, self.member_repo.get_subnet_usage_count(
+            self.session, PROJECT_ID, 'subnet-3'))
+
+
+class TestListenerRepository(base.TestCase):
+
+    def setUp(self):
+        super(TestListenerRepository, self).setUp()
+        engine = sa.create_engine('sqlite://')
+        base_models.BASE.metadata.create_all(engine, tables=TABLES)
+        self.session = orm.sessionmaker(bind=engine)()
+        self.addCleanup(self.session.close)
+        self.listener_repo = repositories.ListenerRepository()
+
+    def _add_lb(self, lb_id, ip_address, partition_name=None):
+        self.session.add(o_models.LoadBalancer(
+            id=lb_id, project_id=PROJECT_ID, provisioning_status='ACTIVE',
+            operating_status='ONLINE', enabled=True))
+        for role in ('MASTER', 'BACKUP'):
+            self.session.add(models.VThunder(
+                vthunder_id=lb_id + role, loadbalancer_id=lb_id, device_name='vthunder',
+                ip_address=ip_address, partition_name=partition_name, username='admin',
+                password='a10', role=role, last_udp_update=datetime.datetime.utcnow()))
+
+    def _add_listener(self, listener_id, lb_id, cert_ref, provisioning_status='ACTIVE'):
+        self.session.add(o_models.Listener(
+            id=listener_id, project_id=PROJECT_ID, load_balancer_id=lb_id,
+            protocol='TERMINATED_HTTPS', protocol_port=len(listener_id),
+            tls_certificate_id=cert_ref, provisioning_status=provisioning_status,
+            operating_status='ONLINE', enabled=True))
+
+    def _usage_count(self, ip_address, partition_name=None):
+        return self.listener_repo.get_certificate_usage_count(
+            self.session, 'listener-1', CERT_REF, ip_address, partition_name)
+
+    def test_get_certificate_usage_count(self):
+        self._add_lb('lb-1', '10.0.0.1')
+        self._add_lb('lb-2', '10.0.0.1', 'shared')
+        self._add_lb('lb-3', '10.0.0.1', 'p1')
+        self._add_lb('lb-4', '10.0.0.2')
+        self._add_listener('listener-1', 'lb-1', CERT_REF)
+        self._add_listener('listener-11', 'lb-1', CERT_REF)
+        self._add_listener('listener-111', 'lb-1', OTHER_CERT_REF)
+        self._add_listener('listener-2', 'lb-2', CERT_REF)
+        self._add_listener('listener-22', 'lb-2', CERT_REF, 'DELETED')
+        self._add_listener('listener-3', 'lb-3', CERT_REF)
+        self._add_listener('listener-4', 'lb-4', CERT_REF)
+        self.session.flush()
+        self.assertEqual(2, self._usage_count('10.0.0.1'))
+        self.assertEqual(1, self._usage_count('10.0.0.1', 'p1'))
+        self.assertEqual(1, self._usage_count('10.0.0.2'))
+        self.assertEqual(0, self._usage_count('10.0.0.3'))
+
+    def test_get_listeners_with_vthunder(self):
+        self._add_lb('lb-1', '10.0.0.1')
+        self._add_lb('lb-2', '10.0.0.2', 'p1')
+        self._add_lb('lb-3', '10.0.0.3')
+        self._add_listener('listener-1', 'lb-1', CERT_REF)
+        self._add_listener('listener-11', 'lb-1', None, 'DELETED')
+        self._add_listener('listener-2', 'lb-2', None)
+        self.session.flush()
+        rows = sorted(self.listener_repo.get_listeners_with_vthunder(self.session),
+                      key=lambda row: row[1])
+        self.assertEqual([('listener-1', 'lb-1', 'TERMINATED_HTTPS', 10),
+                          ('listener-2', 'lb-2', 'TERMINATED_HTTPS', 10)],
+                         [row[1:] for row in rows])
+        self.assertEqual([('10.0.0.1', None, 'MASTER'), ('10.0.0.2', 'p1', 'MASTER')],
+                         [(row[0].ip_address, row[0].partition_name, row[0].role)
+                          for row in rows])
+
+    def test_get_statistics(self):
+        for listener_id, amphora_id in (('listener-1', 'listener-1'),
+                                        ('listener-2', 'amphora-1'),
+                                        ('listener-3', 'listener-3')):
+            self.session.add(o_models.ListenerStatistics(
+                listener_id=listener_id, amphora_id=amphora_id, bytes_in=1, bytes_out=2,
+                active_connections=3, total_connections=4, request_errors=5))
+        self.session.flush()
+        self.assertEqual(
+            {'listener-1': {'bytes_in': 1, 'bytes_out': 2, 'active_connections': 3,
+                            'total_connections': 4, 'request_errors': 5}},
+            self.listener_repo.get_statistics(
+                self.session, ['listener-1', 'listener-2', 'listener-4']))
+        self.assertEqual({}, self.listener_repo.get_statistics(self.session, []))
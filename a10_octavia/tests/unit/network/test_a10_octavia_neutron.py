@@ -0,0 +1,121 @@
+#    Copyright 2020, A10 Networks
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from neutronclient.common import exceptions as neutron_client_exceptions
+
+from octavia.network import data_models as n_data_models
+from octavia.tests.unit import base
+
+from a10_octavia.network.drivers.neutron import a10_octavia_neutron
+
+NETWORK_11 = {'id': 'network-1', 'subnets': ['subnet-1'], 'provider:segmentation_id': 11}
+NETWORK_12 = {'id': 'network-2', 'subnets': ['subnet-2'], 'provider:segmentation_id': 12}
+NETWORK_NO_SUBNET = {'id': 'network-3', 'subnets': [], 'provider:segmentation_id': 13}
+PORT_1 = {'id': 'port-1', 'fixed_ips': [{'subnet_id': 'subnet-1', 'ip_address': '10.0.0.5'}]}
+PORT_2 = {'id': 'port-2', 'fixed_ips': [{'subnet_id': 'subnet-1', 'ip_address': '10.0.0.6'}]}
+
+
+class TestNetworkCache(base.TestCase):
+
+    def test_index_networks(self):
+        network_cache = a10_octavia_neutron.NetworkCache(ttl=10, max_size=8)
+        network = n_data_models.Network(id='network-1', subnets=['subnet-1'],
+                                        provider_segmentation_id=11)
+        self.assertEqual({'11': 'subnet-1'}, network_cache.index_networks([network]))
+        self.assertEqual(network, network_cache.networks.get('network-1'))
+        self.assertEqual({'11': 'subnet-1'}, network_cache.get_segmentation_index())
+
+
+class TestA10OctaviaNeutronDriver(base.TestCase):
+
+    @mock.patch('keystoneauth1.session.Session', mock.Mock())
+    @mock.patch('neutronclient.client.SessionClient', mock.Mock())
+    @mock.patch('neutronclient.v2_0.client.Client', mock.Mock())
+    def setUp(self):
+        super(TestA10OctaviaNeutronDriver, self).setUp()
+        self.driver = a10_octavia_neutron.A10OctaviaNeutronDriver()
+        self.driver.neutron_client = mock.Mock()
+        self.driver.neutron_client.list_networks.return_value = {
+            'networks': [NETWORK_11, NETWORK_NO_SUBNET]}
+        a10_octavia_neutron._network_cache = None
+        self.addCleanup(setattr, a10_octavia_neutron, '_network_cache', None)
+        a10_octavia_neutron._port_index = None
+        self.addCleanup(setattr, a10_octavia_neutron, '_port_index', None)
+
+    def test_get_vlan_subnet_map_lists_networks_once(self):
+        self.assertEqual({'11': 'subnet-1'}, self.driver.get_vlan_subnet_map(11))
+        self.assertEqual({'11': 'subnet-1'}, self.driver.get_vlan_subnet_map(11))
+        self.assertEqual(1, self.driver.neutron_client.list_networks.call_count)
+
+    def test_get_vlan_subnet_map_refreshes_unknown_segmentation_id(self):
+        self.driver.get_vlan_subnet_map(11)
+        self.driver.neutron_client.list_networks.return_value = {
+            'networks': [NETWORK_11, NETWORK_12]}
+        self.assertEqual({'11': 'subnet-1', '12': 'subnet-2'},
+                         self.driver.get_vlan_subnet_map(12))
+        self.assertEqual(2, self.driver.neutron_client.list_networks.call_count)
+
+    def test_get_network_is_cached(self):
+        self.driver.get_vlan_subnet_map()
+        network = self.driver.get_cached_network('network-1')
+        self.assertEqual(11, network.provider_segmentation_id)
+        self.driver.neutron_client.show_network.assert_not_called()
+
+    def test_get_subnet_is_cached(self):
+        self.driver.neutron_client.show_subnet.return_value = {
+            'subnet': {'id': 'subnet-1', 'network_id': 'network-1', 'cidr': '10.0.0.0/24'}}
+        self.driver.get_cached_subnet('subnet-1')
+        subnet = self.driver.get_cached_subnet('subnet-1')
+        self.assertEqual('10.0.0.0/24', subnet.cidr)
+        self.assertEqual(1, self.driver.neutron_client.show_subnet.call_count)
+
+    def test_get_subnet_is_not_cached(self):
+        self.driver.neutron_client.show_subnet.return_value = {
+            'subnet': {'id': 'subnet-1', 'network_id': 'network-1', 'cidr': '10.0.0.0/24'}}
+        self.driver.get_cached_subnet('subnet-1')
+        self.driver.get_subnet('subnet-1')
+        self.assertEqual(2, self.driver.neutron_client.show_subnet.call_count)
+
+    def test_get_port_id_from_ip_filters_on_server(self):
+        self.driver.neutron_client.list_ports.return_value = {'ports': [PORT_1]}
+        self.assertEqual('port-1', self.driver.get_port_id_from_ip('10.0.0.5'))
+        self.driver.neutron_client.list_ports.assert_called_once_with(
+            device_owner=a10_octavia_neutron.OCTAVIA_OWNER,
+            fixed_ips=['ip_address=10.0.0.5'])
+
+    def test_get_port_id_from_ip_falls_back_to_port_index(self):
+        self.driver.neutron_client.list_ports.side_effect = [
+            neutron_client_exceptions.BadRequest(), {'ports': [PORT_1, PORT_2]}]
+        self.assertEqual('port-2', self.driver.get_port_id_from_ip('10.0.0.6'))
+        self.assertEqual('port-1', self.driver.get_port_id_from_ip('10.0.0.5'))
+        self.assertIsNone(self.driver.get_port_id_from_ip('10.0.0.7'))
+        self.assertEqual(2, self.driver.neutron_client.list_ports.call_count)
+
+    @mock.patch('octavia.network.drivers.neutron.utils.convert_port_dict_to_model')
+    def test_port_index_follows_created_and_deleted_ports(self, mock_convert):
+        port_index = a10_octavia_neutron.get_port_index()
+        port_index.server_filtering = False
+        port_index.load([PORT_1])
+        mock_convert.return_value = n_data_models.Port(
+            id='port-2', fixed_ips=[n_data_models.FixedIP(ip_address='10.0.0.6')])
+        self.driver.create_port('network-1', subnet_id='subnet-1', fixed_ip='10.0.0.6')
+        self.assertEqual('port-2', self.driver.get_port_id_from_ip('10.0.0.6'))
+        self.driver.delete_port('port-1')
+        self.assertIsNone(port_index.get('10.0.0.5'))
+        self.driver.neutron_client.list_ports.assert_not_called()